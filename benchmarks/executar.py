@@ -0,0 +1,265 @@
+"""Benchmarks de carga, agregações, figuras e páginas do painel.
+
+Para cada escala (1 = os arquivos reais de ``dados/``; N = dados sintéticos
+de ``vinho.sintetico`` com N vezes mais países) um interpretador novo é
+aberto com ``VINHO_DADOS`` apontando para o diretório da escala, e mede:
+
+- ``carga``: leitura de cada CSV (em blocos, ``vinho.leitura``) e o
+  ``dados.carregar`` usado pelo painel;
+- ``agregacoes``: cada nó de ``vinho.agregacoes`` isolado (dependências já
+  calculadas);
+- ``figuras``: construção + serialização de cada gráfico, agrupada por página;
+- ``paginas``: a página inteira pelo ``AppTest`` do Streamlit, a frio (caches
+  vazios) e a quente (rerun).
+
+O resultado é um JSON único (``--saida`` ou stdout), com mínimo e mediana de
+cada medida e, por escala, quais páginas ainda rerodam dentro de
+``--limite-interativo``, para comparar versões::
+
+    python -m benchmarks.executar --escalas 1,10,100 --saida bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+APLICATIVO = RAIZ / "aplicativo.py"
+
+FIGURAS_POR_PAGINA = {
+    "Geral": [],
+    "Exportações": [
+        "exportacao_quantidade_crescimento",
+        "exportacao_valor_quantidade",
+        "exportacao_top5_valor",
+        "exportacao_top5_evolucao",
+    ],
+    "Importações": [
+        "importacao_evolucao",
+        "importacao_top5_evolucao",
+        "importacao_top5_quantidade",
+    ],
+    "Mercados futuros": ["mercados_consolidado", "mercados_continentes", "mercados_previsao"],
+}
+
+
+def _resumo(tempos: list[float]) -> dict:
+    return {
+        "min_s": round(min(tempos), 6),
+        "mediana_s": round(statistics.median(tempos), 6),
+        "n": len(tempos),
+    }
+
+
+def _cronometrar(funcao, repeticoes: int, preparar=None) -> dict:
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return _resumo(tempos)
+
+
+# -----------------------
+# Medições (processo filho, com VINHO_DADOS já definido)
+# -----------------------
+def _limpar_tudo() -> None:
+    from vinho import agregacoes, compartilhado, dados, figuras, tabelas
+
+    compartilhado.backend().limpar()
+    dados.limpar_cache()
+    agregacoes.limpar()
+    figuras.limpar()
+    tabelas.limpar()
+
+
+def medir_carga(repeticoes: int) -> dict:
+    from vinho import dados, leitura
+
+    resultado = {}
+    for fluxo in dados.ARQUIVOS:
+        arquivo = dados.caminho(fluxo)
+        resultado[f"{fluxo}.csv"] = _cronometrar(lambda: leitura.ler(arquivo), repeticoes)
+        resultado[f"{fluxo}.carregar"] = _cronometrar(
+            lambda: dados.carregar(fluxo), repeticoes, preparar=dados.limpar_cache)
+    return resultado
+
+
+def medir_agregacoes(repeticoes: int) -> dict:
+    from vinho import agregacoes as ag
+
+    resultado = {}
+    for nome in ag.nos():
+        dependencias = ag.dependencias(nome)
+
+        def preparar():
+            ag.limpar()
+            for dep in dependencias:
+                ag.obter(dep)
+
+        resultado[nome] = _cronometrar(lambda: ag.obter(nome), repeticoes, preparar)
+    return resultado
+
+
+def medir_figuras(repeticoes: int) -> dict:
+    from vinho import agregacoes as ag
+    from vinho import figuras
+
+    for nome in ag.nos():
+        ag.obter(nome)
+    resultado = {}
+    for pagina, graficos in FIGURAS_POR_PAGINA.items():
+        por_grafico = {
+            grafico: _cronometrar(lambda: figuras.json_figura(grafico), repeticoes,
+                                  preparar=figuras.limpar)
+            for grafico in graficos
+        }
+        total = sum(m["mediana_s"] for m in por_grafico.values())
+        resultado[pagina] = {"graficos": por_grafico, "total_mediana_s": round(total, 6)}
+    return resultado
+
+
+def medir_paginas(repeticoes: int) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    def renderizar(pagina: str) -> None:
+        at = AppTest.from_file(str(APLICATIVO), default_timeout=600)
+        at.query_params["pagina"] = pagina
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"{pagina}: {at.exception[0].message}")
+
+    renderizar("Sobre")  # importa streamlit e o próprio script fora da medição
+    resultado = {}
+    for pagina in FIGURAS_POR_PAGINA:
+        resultado[pagina] = {
+            "frio": _cronometrar(lambda: renderizar(pagina), repeticoes, preparar=_limpar_tudo),
+            "quente": _cronometrar(lambda: renderizar(pagina), repeticoes),
+        }
+    return resultado
+
+
+def medir(repeticoes: int, etapas: list[str]) -> dict:
+    from vinho import dados
+
+    medidores = {
+        "carga": medir_carga,
+        "agregacoes": medir_agregacoes,
+        "figuras": medir_figuras,
+        "paginas": medir_paginas,
+    }
+    resultado = {
+        "diretorio": str(dados.DIRETORIO_DADOS),
+        "versao_dados": dados.versao(),
+        "linhas": {
+            fluxo: sum(1 for _ in open(dados.caminho(fluxo), "rb")) - 1
+            for fluxo in dados.ARQUIVOS
+        },
+    }
+    for etapa in etapas:
+        resultado[etapa] = medidores[etapa](repeticoes)
+    return resultado
+
+
+# -----------------------
+# Dados escalados
+# -----------------------
+def _diretorio_escala(fator: int, base: Path, semente: int) -> Path:
+    """Diretório de dados da escala: os reais (1) ou sintéticos (``vinho.sintetico``)."""
+    from vinho import dados, sintetico
+
+    if fator == 1:
+        return dados.DIRETORIO_DADOS
+    destino = base / f"sintetico_{fator}x_s{semente}"
+    if not all(dados.caminho(f, destino).exists() for f in dados.ARQUIVOS):
+        sintetico.gerar_diretorio(destino, fator, semente)
+    return destino
+
+
+def interatividade(medidas: dict, limite_s: float) -> dict:
+    """Por página, se o rerun a quente ficou dentro de ``limite_s``."""
+    return {
+        pagina: tempos["quente"]["mediana_s"] <= limite_s
+        for pagina, tempos in medidas.get("paginas", {}).items()
+    }
+
+
+def _rodar_filho(diretorio: Path, repeticoes: int, etapas: list[str]) -> dict:
+    ambiente = {**os.environ, "VINHO_DADOS": str(diretorio)}
+    processo = subprocess.run(
+        [sys.executable, "-m", "benchmarks.executar", "--filho",
+         "--repeticoes", str(repeticoes), "--etapas", ",".join(etapas)],
+        capture_output=True, text=True, cwd=RAIZ, env=ambiente,
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"benchmark em {diretorio} falhou:\n{processo.stderr[-4000:]}")
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do painel")
+    parser.add_argument("--escalas", default="1,10,100,1000",
+                        help="fatores de escala separados por vírgula (1 = dados reais)")
+    parser.add_argument("--etapas", default="carga,agregacoes,figuras,paginas")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--dados-escalados", type=Path,
+                        default=Path(tempfile.gettempdir()) / "vinho-bench",
+                        help="onde ficam (e são reaproveitados) os dados sintéticos")
+    parser.add_argument("--semente", type=int, default=0, help="semente dos dados sintéticos")
+    parser.add_argument("--limite-interativo", type=float, default=1.0,
+                        help="segundos de rerun a quente aceitos como interativos")
+    parser.add_argument("--saida", type=Path, default=None, help="arquivo JSON (padrão: stdout)")
+    parser.add_argument("--filho", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    etapas = [e for e in args.etapas.split(",") if e]
+
+    if args.filho:
+        print(json.dumps(medir(args.repeticoes, etapas), ensure_ascii=False))
+        return 0
+
+    relatorio = {
+        "commit": _commit(),
+        "data": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticoes": args.repeticoes,
+        "semente": args.semente,
+        "limite_interativo_s": args.limite_interativo,
+        "escalas": {},
+    }
+    for fator in (int(e) for e in args.escalas.split(",")):
+        diretorio = _diretorio_escala(fator, args.dados_escalados, args.semente)
+        print(f"escala {fator}x: {diretorio}", file=sys.stderr)
+        medidas = _rodar_filho(diretorio, args.repeticoes, etapas)
+        medidas["interativo"] = interatividade(medidas, args.limite_interativo)
+        relatorio["escalas"][str(fator)] = medidas
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida is None:
+        print(texto)
+    else:
+        args.saida.write_text(texto + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Redução de pontos (LTTB) e baldes de anos das figuras."""
+import numpy as np
+import pandas as pd
+
+from vinho import amostragem
+
+
+def test_lttb_abaixo_do_limite_mantem_tudo():
+    np.testing.assert_array_equal(amostragem.lttb(np.arange(10), np.arange(10), 20), np.arange(10))
+
+
+def test_lttb_tamanho_extremos_e_ordem():
+    x = np.arange(5000)
+    y = np.sin(x / 50)
+    escolhidos = amostragem.lttb(x, y, 100)
+    assert len(escolhidos) == 100
+    assert escolhidos[0] == 0 and escolhidos[-1] == len(x) - 1
+    assert (np.diff(escolhidos) > 0).all()
+
+
+def test_lttb_mantem_picos():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[[137, 612]] = [50, -80]
+    escolhidos = amostragem.lttb(x, y, 20)
+    assert {137, 612} <= set(escolhidos.tolist())
+
+
+def test_reduzir_por_serie():
+    df = pd.DataFrame({
+        "ano": np.tile(np.arange(800), 2),
+        "valor": np.random.default_rng(0).random(1600),
+        "pais": np.repeat(["chile", "franca"], 800),
+    })
+    reduzido = amostragem.reduzir(df, "ano", "valor", "pais", limite=50)
+    assert reduzido.groupby("pais").size().tolist() == [50, 50]
+    # séries curtas voltam iguais
+    assert len(amostragem.reduzir(df.head(30), "ano", "valor", "pais", limite=50)) == 30
+
+
+def test_baldes_de_anos_preserva_totais():
+    df = pd.DataFrame({"ano": np.arange(1970, 2024), "valor": np.arange(54)})
+    baldes = amostragem.baldes_de_anos(df, maximo=10)
+    assert len(baldes) <= 10
+    assert baldes["valor"].sum() == df["valor"].sum()
+    assert baldes["ano"].iloc[0] == "1970–1975"
+    assert len(amostragem.baldes_de_anos(df.head(8), maximo=10)) == 8
@@ -0,0 +1,63 @@
+"""Prontidão de ``vinho.aquecimento``: aquecido e com o Streamlit respondendo."""
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from vinho import aquecimento
+
+
+class _Saude(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200 if self.path == "/_stcore/health" else 404)
+        self.end_headers()
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def _status(url):
+    try:
+        with urllib.request.urlopen(url, timeout=2) as resposta:
+            return resposta.status, json.loads(resposta.read())
+    except urllib.error.HTTPError as erro:
+        return erro.code, json.loads(erro.read())
+
+
+@pytest.fixture
+def painel():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Saude)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_url_saude_painel():
+    assert aquecimento.url_saude_painel(["--server.port", "8502", "--server.address=0.0.0.0"]) \
+        == "http://127.0.0.1:8502/_stcore/health"
+    assert aquecimento.url_saude_painel(["--server.port=9000", "--server.baseUrlPath", "/vinho/"]) \
+        == "http://127.0.0.1:9000/vinho/_stcore/health"
+
+
+def test_pronto_espera_aquecimento_e_painel(painel, monkeypatch):
+    url_painel = f"http://127.0.0.1:{painel.server_address[1]}/_stcore/health"
+    saude = aquecimento.servir_saude(0, saude_painel=url_painel)
+    pronto = f"http://127.0.0.1:{saude.server_address[1]}/pronto"
+
+    monkeypatch.setitem(aquecimento._estado, "pronto", False)
+    assert _status(pronto)[0] == 503
+
+    monkeypatch.setitem(aquecimento._estado, "pronto", True)
+    status, corpo = _status(pronto)
+    assert status == 200 and corpo["pronto"] and corpo["painel"]
+
+    # aquecido, mas o Streamlit não responde mais
+    painel.shutdown()
+    painel.server_close()
+    status, corpo = _status(pronto)
+    assert status == 503 and corpo["painel"] is False
+    assert _status(f"http://127.0.0.1:{saude.server_address[1]}/saude")[0] == 200
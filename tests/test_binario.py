@@ -0,0 +1,34 @@
+"""Formato binário: regravação sem tocar nos arquivos já mapeados."""
+import numpy as np
+import pandas as pd
+
+from vinho import binario
+
+
+def _dados(linhas, deslocamento=0):
+    return pd.DataFrame({
+        "pais": pd.Categorical(["chile", "franca"] * (linhas // 2)),
+        "ano": np.arange(linhas, dtype="int16") + 2000,
+        "quantidade_kg": np.arange(1, linhas + 1, dtype="int64") + deslocamento,
+        "quantidade_dolar": pd.array(np.arange(linhas) * 10, dtype="Int64"),
+    })
+
+
+def test_regravar_mantem_o_mapeamento_antigo(tmp_path):
+    binario.converter(_dados(10), tmp_path, "a")
+    antigo = binario.ler(tmp_path, "a")
+    kg = antigo["quantidade_kg"].to_numpy().copy()
+
+    binario.converter(_dados(20, deslocamento=100), tmp_path, "b")
+    np.testing.assert_array_equal(antigo["quantidade_kg"].to_numpy(), kg)
+    assert binario.ler(tmp_path, "a") is None
+    novo = binario.ler(tmp_path, "b")
+    assert len(novo) == 20 and novo["quantidade_kg"].iloc[0] == 101
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_sem_meta_nao_le(tmp_path):
+    binario.converter(_dados(10), tmp_path, "a")
+    binario.invalidar(tmp_path)
+    assert binario.ler(tmp_path) is None
+    assert binario.ler_meta(tmp_path) is None
@@ -0,0 +1,46 @@
+"""Testes do backend em disco do cache compartilhado."""
+import os
+
+from vinho import compartilhado
+
+
+def _envelhecer(disco, chave, segundos):
+    arquivo = disco._arquivo(chave)
+    instante = os.stat(arquivo).st_mtime - segundos
+    os.utime(arquivo, (instante, instante))
+
+
+def test_disco_despeja_os_lidos_ha_mais_tempo(tmp_path):
+    disco = compartilhado.Disco(tmp_path, limite_bytes=1000)
+    for i in range(4):
+        disco.gravar(f"chave{i}", b"x" * 200)
+        _envelhecer(disco, f"chave{i}", 100 - i)
+    assert disco.ler("chave0") == b"x" * 200  # lido agora: passa a ser o mais novo
+
+    disco.gravar("chave4", b"x" * 300)  # 1100 bytes: a gravação poda até 800
+
+    restantes = {f"chave{i}" for i in range(5) if disco.ler(f"chave{i}") is not None}
+    assert restantes == {"chave0", "chave3", "chave4"}
+    tamanho = sum(p.stat().st_size for p in tmp_path.iterdir())
+    assert tamanho <= 1000 * compartilhado.FRACAO_APOS_PODA
+
+
+def test_disco_abaixo_do_limite_nao_apaga(tmp_path):
+    disco = compartilhado.Disco(tmp_path, limite_bytes=10_000)
+    for i in range(5):
+        disco.gravar(f"chave{i}", b"x" * 100)
+    assert disco.podar() == 0
+    assert all(disco.ler(f"chave{i}") == b"x" * 100 for i in range(5))
+
+
+def test_disco_remove_temporarios_abandonados(tmp_path):
+    disco = compartilhado.Disco(tmp_path, limite_bytes=10_000)
+    abandonado = tmp_path / "abc.1.2.tmp"
+    abandonado.write_bytes(b"meio")
+    antigo = os.stat(abandonado).st_mtime - 2 * compartilhado.IDADE_TEMPORARIO_S
+    os.utime(abandonado, (antigo, antigo))
+    recente = tmp_path / "def.1.2.tmp"
+    recente.write_bytes(b"meio")
+    disco.podar()
+    assert not abandonado.exists()
+    assert recente.exists()
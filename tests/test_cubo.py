@@ -0,0 +1,92 @@
+"""Índice de somas acumuladas (``cubo.Acumulado``) contra o groupby do pandas."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from vinho import cubo as cubo_mod
+
+PAISES = ["alemanha", "argentina", "brasil", "chile", "china", "espanha", "franca", "japao"]
+
+
+def _csv(gerador, linhas):
+    """DataFrame no formato dos CSVs, com linhas repetidas por (país, ano) e empates."""
+    return pd.DataFrame({
+        "pais": pd.Categorical(gerador.choice(PAISES, linhas), categories=PAISES),
+        "ano": gerador.integers(1990, 2010, linhas).astype("int16"),
+        # valores em múltiplos de 100 para provocar empates nos totais
+        "quantidade_kg": gerador.integers(0, 5, linhas).astype("int64") * 100,
+        "quantidade_dolar": pd.array(gerador.integers(0, 5, linhas) * 100, dtype="Int64"),
+    })
+
+
+@pytest.fixture(scope="module")
+def brutos():
+    gerador = np.random.default_rng(0)
+    return {"exportacao": _csv(gerador, 300), "importacao": _csv(gerador, 200)}
+
+
+@pytest.fixture(scope="module")
+def acumulado(brutos):
+    return cubo_mod.acumular(cubo_mod.construir(brutos["exportacao"], brutos["importacao"], "teste"))
+
+
+def _top_pandas(df, janela, medida, n):
+    """O ranking pedido, direto das linhas: soma por país, sem zeros, empates em ordem alfabética."""
+    na_janela = df[df["ano"].between(*janela)]
+    totais = na_janela.groupby("pais", observed=True)[medida].sum().astype("float64")
+    totais = totais[totais != 0].reset_index()
+    totais = totais.sort_values(["pais"]).sort_values(medida, ascending=False, kind="stable")
+    return totais.head(n)
+
+
+@pytest.mark.parametrize("fluxo", cubo_mod.FLUXOS)
+@pytest.mark.parametrize("medida", cubo_mod.MEDIDAS)
+def test_top_igual_ao_groupby(brutos, acumulado, fluxo, medida):
+    gerador = np.random.default_rng(1)
+    for _ in range(50):
+        inicio, fim = sorted(gerador.integers(1985, 2015, 2))
+        n = int(gerador.integers(1, len(PAISES) + 2))
+        top = acumulado.top(fluxo, (inicio, fim), medida, n)
+        esperado = _top_pandas(brutos[fluxo], (inicio, fim), medida, n)
+        assert list(top.index) == list(esperado["pais"].astype(str))
+        np.testing.assert_allclose(top.to_numpy(dtype="float64"), esperado[medida].to_numpy())
+
+
+def test_totais_iguais_ao_groupby(brutos, acumulado):
+    df = brutos["exportacao"]
+    totais = acumulado.totais("exportacao", (1995, 2000), "quantidade_kg")
+    esperado = df[df["ano"].between(1995, 2000)].groupby("pais", observed=False)["quantidade_kg"].sum()
+    assert totais.tolist() == esperado.reindex(acumulado.paises, fill_value=0).tolist()
+
+
+def test_janela_sem_dados_fica_vazia(acumulado):
+    assert acumulado.top("exportacao", (1800, 1801), "quantidade_dolar", 5).empty
+    assert acumulado.top("importacao", (2050, 2060), "quantidade_kg", 5).empty
+
+
+def test_medida_desconhecida(acumulado):
+    with pytest.raises(ValueError):
+        acumulado.top("exportacao", (1990, 2000), "litros", 5)
+
+
+def test_regravar_nao_mexe_no_cubo_mapeado(brutos, tmp_path):
+    primeiro = cubo_mod.construir(brutos["exportacao"], brutos["importacao"], "v1")
+    cubo_mod.salvar(primeiro, tmp_path)
+    mapeado = cubo_mod.ler(tmp_path)
+    kg = np.array(mapeado.kg)
+
+    # uma versão com outro número de células, gravada por cima
+    segundo = cubo_mod.construir(brutos["exportacao"].head(50), brutos["importacao"], "v2")
+    cubo_mod.salvar(segundo, tmp_path)
+    np.testing.assert_array_equal(mapeado.kg, kg)
+    relido = cubo_mod.ler(tmp_path)
+    assert relido.versao == "v2"
+    np.testing.assert_array_equal(relido.kg, segundo.kg)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_regravacao_em_andamento_nao_e_lida(brutos, tmp_path):
+    cubo_mod.salvar(cubo_mod.construir(brutos["exportacao"], brutos["importacao"], "v1"), tmp_path)
+    # como no início de salvar(): sem meta.json, os arrays podem estar misturados
+    (tmp_path / "meta.json").unlink()
+    assert cubo_mod.ler(tmp_path) is None
@@ -0,0 +1,125 @@
+"""Ingestão incremental contra o servidor local (``vinho.fonte_local``), sem rede."""
+import json
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from vinho import binario, compartilhado, dados, ingestao, leitura
+from vinho.fonte_local import ServidorLocal, gerar_planilha
+
+FLUXO = "exportacao"
+
+
+def _completo():
+    """Dados de 2018 a 2022 no formato de ``dados/``, com zeros e um US$ ausente."""
+    linhas = []
+    for ano in range(2018, 2023):
+        for i, pais in enumerate(["africa_do_sul", "chile", "paraguai"]):
+            kg = 0 if (pais == "chile" and ano == 2019) else 1000 * (i + 1) + ano
+            linhas.append((pais, ano, kg, kg * 3))
+    df = pd.DataFrame(linhas, columns=["pais", "ano", "quantidade_kg", "quantidade_dolar"])
+    df["quantidade_dolar"] = df["quantidade_dolar"].astype("Int64")
+    df.loc[(df["pais"] == "paraguai") & (df["ano"] == 2022), "quantidade_dolar"] = pd.NA
+    return df
+
+
+def _publicar(fonte, df):
+    """Grava a planilha do fluxo na fonte, com um mtime novo a cada publicação."""
+    destino = fonte / ingestao.FONTES[FLUXO].rsplit("/", 1)[-1]
+    destino.write_text(gerar_planilha(df), encoding="utf-8")
+    mtime = destino.stat().st_mtime + 10
+    os.utime(destino, (mtime, mtime))
+
+
+def _ordenado(df):
+    df = df.assign(pais=df["pais"].astype(str), quantidade_dolar=df["quantidade_dolar"].astype("Int64"))
+    return df.sort_values(["ano", "pais"], ignore_index=True)
+
+
+@pytest.fixture
+def diretorios(tmp_path):
+    local, fonte = tmp_path / "dados", tmp_path / "fonte"
+    local.mkdir()
+    fonte.mkdir()
+    completo = _completo()
+    # dados locais até 2020; a fonte publica até 2022
+    completo[completo["ano"] <= 2020].to_csv(dados.caminho(FLUXO, local), index=False)
+    _publicar(fonte, completo)
+    return local, fonte, completo
+
+
+def test_acrescenta_e_depois_responde_304(diretorios):
+    local, fonte, completo = diretorios
+    arquivo = dados.caminho(FLUXO, local)
+    original = arquivo.read_bytes()
+
+    with ServidorLocal(fonte) as servidor:
+        primeiro = ingestao.atualizar(FLUXO, url_base=servidor.url_base, diretorio=local)
+        assert (primeiro.status, primeiro.linhas_novas) == ("atualizado", 6)
+        # só acrescenta: as linhas que já existiam ficam iguais, byte a byte
+        assert arquivo.read_bytes().startswith(original)
+        pd.testing.assert_frame_equal(_ordenado(pd.read_csv(arquivo)), _ordenado(completo))
+
+        # validadores guardados e reenviados: a fonte responde 304
+        estado = json.loads((local / "ingestao.json").read_text(encoding="utf-8"))
+        assert estado[FLUXO]["etag"] and estado[FLUXO]["last_modified"]
+        segundo = ingestao.atualizar(FLUXO, url_base=servidor.url_base, diretorio=local)
+        assert (segundo.status, segundo.linhas_novas) == ("inalterado", 0)
+        assert json.loads((local / "ingestao.json").read_text(encoding="utf-8")) == estado
+
+
+def test_nova_publicacao_traz_so_o_que_e_novo(diretorios):
+    local, fonte, completo = diretorios
+    with ServidorLocal(fonte) as servidor:
+        ingestao.atualizar(FLUXO, url_base=servidor.url_base, diretorio=local)
+        etag = json.loads((local / "ingestao.json").read_text(encoding="utf-8"))[FLUXO]["etag"]
+
+        # a fonte ganha um país novo e revisa um ano antigo; o país novo vem
+        # com todos os anos da planilha (zerados onde não há comércio)
+        novo = pd.DataFrame({"pais": "uruguai", "ano": [2021, 2022], "quantidade_kg": [5, 6],
+                             "quantidade_dolar": pd.array([50, 60], dtype="Int64")})
+        revisado = pd.concat([completo, novo], ignore_index=True)
+        revisado.loc[(revisado["pais"] == "chile") & (revisado["ano"] == 2018), "quantidade_kg"] = 1
+        _publicar(fonte, revisado)
+
+        resultado = ingestao.atualizar(FLUXO, url_base=servidor.url_base, diretorio=local)
+        assert (resultado.status, resultado.linhas_novas) == ("atualizado", 5)
+        estado = json.loads((local / "ingestao.json").read_text(encoding="utf-8"))
+        assert estado[FLUXO]["etag"] != etag
+
+    gravado = pd.read_csv(dados.caminho(FLUXO, local))
+    # a revisão de um ano já guardado não reescreve a linha existente
+    chile_2018 = gravado[(gravado["pais"] == "chile") & (gravado["ano"] == 2018)]
+    assert chile_2018["quantidade_kg"].tolist() == [completo.loc[1, "quantidade_kg"]]
+    uruguai = gravado[gravado["pais"] == "uruguai"]
+    assert uruguai["ano"].tolist() == list(range(2018, 2023))
+    assert uruguai["quantidade_kg"].tolist() == [0, 0, 0, 5, 6]
+
+
+def test_sem_novidades_avanca_o_estado(diretorios):
+    local, fonte, completo = diretorios
+    completo.to_csv(dados.caminho(FLUXO, local), index=False)
+    with ServidorLocal(fonte) as servidor:
+        resultado = ingestao.atualizar(FLUXO, url_base=servidor.url_base, diretorio=local)
+    assert (resultado.status, resultado.linhas_novas) == ("sem novidades", 0)
+    assert json.loads((local / "ingestao.json").read_text(encoding="utf-8"))[FLUXO]["etag"]
+
+
+def test_derivados_esperam_a_trava_do_fluxo(diretorios):
+    local, _, completo = diretorios
+    arquivo = dados.caminho(FLUXO, local)
+    destino = dados.caminho_binario(FLUXO, local)
+    binario.converter(leitura.ler(arquivo), destino, dados.hash_conteudo(arquivo))
+    completo.to_csv(arquivo, index=False)
+
+    # um processo do painel convertendo: a ingestão espera a trava dele
+    with compartilhado.exclusivo(destino.with_name(f"{FLUXO}.trava")):
+        thread = threading.Thread(target=ingestao.atualizar_derivados, args=(local,))
+        thread.start()
+        thread.join(0.5)
+        assert thread.is_alive()
+        assert binario.ler(destino, dados.hash_conteudo(arquivo)) is None
+    thread.join()
+    assert len(binario.ler(destino, dados.hash_conteudo(arquivo))) == len(leitura.ler(arquivo))
@@ -0,0 +1,112 @@
+"""Regras de rejeição e coerção do esquema de ``vinho.leitura``."""
+import pandas as pd
+import pytest
+
+from vinho import leitura
+
+CSV = """pais,ano,quantidade_kg,quantidade_dolar
+chile,2000,100,250
+ chile ,2000,50,30
+,2000,10,10
+franca,abc,10,10
+franca,2001,-5,10
+franca,2002,10,-1
+franca,2001,1.6,10
+argentina,2001,,40
+argentina,2002,7,
+argentina,2003,8,x
+"""
+
+# sem valores fora do tipo declarado: o pyarrow lê tudo sem recorrer ao pandas
+CSV_LIMPO = """pais,ano,quantidade_kg,quantidade_dolar
+chile,2000,100,250
+argentina,2000,7,
+ chile ,2000,50,30
+franca,2001,,10
+chile,2001,3,4
+,2001,1,1
+argentina,2002,8,80
+franca,2001,5,nan
+chile,2000,1,1
+uruguai,2003,9,90
+franca,2002,-2,20
+argentina,2000,2,3
+"""
+
+MOTORES = ["pandas", pytest.param("pyarrow", marks=pytest.mark.skipif(
+    leitura.motor_padrao() != "pyarrow", reason="pyarrow não instalado"))]
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    caminho = tmp_path / "exportacao.csv"
+    caminho.write_text(CSV, encoding="utf-8")
+    return caminho
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+def test_rejeicoes_e_coercoes(arquivo, motor):
+    df, relatorio = leitura.ler_validado(arquivo, motor=motor)
+    assert relatorio.linhas == 10
+    assert relatorio.aceitas == 6
+    assert dict(relatorio.rejeitadas) == {"pais_vazio": 1, "ano_invalido": 1, "valor_negativo": 2}
+    assert dict(relatorio.coagidos) == {
+        "quantidade_kg_arredondado": 1,
+        "quantidade_kg_nulo_para_zero": 1,
+        "quantidade_dolar_invalido_para_nulo": 1,
+    }
+    assert dict(relatorio.nulos) == {"quantidade_dolar": 1}
+    if motor == "pyarrow":
+        # "abc" no ano não cabe no tipo declarado: o arquivo é relido pelo pandas
+        assert relatorio.motor == "pandas" and relatorio.aviso
+    # linhas do arquivo contando o cabeçalho
+    assert relatorio.exemplos[:2] == [(4, "pais_vazio"), (5, "ano_invalido")]
+
+    linhas = df.assign(pais=df["pais"].astype(str)).set_index(["pais", "ano"])
+    # " chile " vira chile e as duas linhas de 2000 são somadas
+    assert linhas.loc[("chile", 2000)].tolist() == [150, 280]
+    assert linhas.loc[("franca", 2001), "quantidade_kg"] == 2
+    assert linhas.loc[("argentina", 2001), "quantidade_kg"] == 0
+    assert pd.isna(linhas.loc[("argentina", 2002), "quantidade_dolar"])
+    assert pd.isna(linhas.loc[("argentina", 2003), "quantidade_dolar"])
+
+
+@pytest.fixture
+def limpo(tmp_path, monkeypatch):
+    # blocos de poucos bytes: o arquivo de 12 linhas passa por vários lotes do pyarrow
+    monkeypatch.setattr(leitura, "BLOCO_MINIMO_PYARROW", 0)
+    caminho = tmp_path / "limpo.csv"
+    caminho.write_text(CSV_LIMPO, encoding="utf-8")
+    return caminho
+
+
+@pytest.mark.parametrize("motor", MOTORES)
+def test_blocos_pequenos_dao_o_mesmo_resultado(limpo, motor):
+    assert len(list(leitura.blocos(limpo, linhas=1, motor=motor))) > 1
+    inteiro = leitura.ler(limpo, motor=motor)
+    em_blocos = leitura.ler(limpo, linhas=1, motor=motor)
+    pd.testing.assert_frame_equal(inteiro, em_blocos)
+
+
+@pytest.mark.skipif(leitura.motor_padrao() != "pyarrow", reason="pyarrow não instalado")
+def test_pyarrow_igual_ao_pandas(limpo):
+    esperado, relatorio_pandas = leitura.ler_validado(limpo, linhas=1, motor="pandas")
+    df, relatorio = leitura.ler_validado(limpo, linhas=1, motor="pyarrow")
+    assert relatorio.motor == "pyarrow" and not relatorio.aviso
+    pd.testing.assert_frame_equal(df, esperado)
+    assert relatorio.aceitas == relatorio_pandas.aceitas == 10
+    assert dict(relatorio.rejeitadas) == dict(relatorio_pandas.rejeitadas)
+    assert dict(relatorio.coagidos) == dict(relatorio_pandas.coagidos)
+    assert dict(relatorio.nulos) == dict(relatorio_pandas.nulos)
+
+
+def test_filtro_de_anos(arquivo):
+    df = leitura.ler(arquivo, anos=(2001, 2002), motor="pandas")
+    assert set(df["ano"]) == {2001, 2002}
+
+
+def test_colunas_faltando(tmp_path):
+    caminho = tmp_path / "quebrado.csv"
+    caminho.write_text("pais,ano,quantidade_kg\nchile,2000,1\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        leitura.ler(caminho, motor="pandas")
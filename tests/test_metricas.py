@@ -0,0 +1,51 @@
+"""Divisão segura das métricas derivadas: NaN no lugar de inf e de erros."""
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vinho import metricas
+
+
+@pytest.fixture(autouse=True)
+def sem_avisos():
+    # divisão por zero não pode nem avisar
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        yield
+
+
+def test_dividir_zero_e_nulo():
+    resultado = metricas.dividir([10, 5, 3, 0], [2, 0, np.nan, 0])
+    np.testing.assert_array_equal(resultado, [5, np.nan, np.nan, np.nan])
+
+
+def test_dividir_aceita_nulos_do_pandas():
+    resultado = metricas.dividir(pd.array([4, pd.NA, 6], dtype="Int64"), pd.Series([2, 1, 0]))
+    np.testing.assert_array_equal(resultado, [2, np.nan, np.nan])
+
+
+def test_preco_unitario_sem_inf():
+    df = metricas.com_preco(pd.DataFrame({
+        "quantidade_kg": [100, 0],
+        "quantidade_dolar": pd.array([250, 80], dtype="Int64"),
+    }))
+    np.testing.assert_array_equal(df["preco_kg"], [2.5, np.nan])
+    assert not np.isinf(df["preco_kg"]).any()
+
+
+def test_crescimento_depois_de_zero():
+    resultado = metricas.crescimento(np.array([[100, 150, 0, 50], [0, 10, 20, 20]]))
+    np.testing.assert_array_equal(resultado, [[np.nan, 50, -100, np.nan], [np.nan, np.nan, 100, 0]])
+
+
+def test_cagr():
+    np.testing.assert_allclose(metricas.cagr(100, 121, 2), 10)
+    resultado = metricas.cagr([0, -5, 100, 100], [50, 50, -1, 200], [3, 3, 3, 0])
+    assert np.isnan(resultado).all()
+
+
+def test_participacao_total_zero():
+    resultado = metricas.participacao(np.array([[1, 3], [0, 0]]))
+    np.testing.assert_array_equal(resultado, [[25, 75], [np.nan, np.nan]])
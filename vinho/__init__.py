@@ -0,0 +1 @@
+"""Código de apoio ao painel de vitivinicultura (``aplicativo.py``)."""
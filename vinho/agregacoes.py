@@ -0,0 +1,453 @@
+"""Agregações do painel declaradas como nós preguiçosos e memorizados.
+
+Cada nó é uma função pura registrada com ``@no``; os nomes dos parâmetros
+são os nomes dos nós de que ela depende. ``obter(nome)`` calcula apenas o nó
+pedido e suas dependências, guarda o resultado e o reaproveita em todos os
+reruns e sessões até que a versão dos dados (``dados.versao()``) mude.
+Assim cada página paga só pelas agregações que de fato exibe.
+
+A janela de análise (``vinho.janela``) é um parâmetro do grafo: um nó que
+declara ``janela`` recebe o par ``(inicio, fim)`` pedido em
+``obter(nome, janela)``, e ele e os nós que dependem dele são memorizados por
+janela. Os demais (leitura, índices, cubo) continuam calculados uma vez só.
+Só as ``JANELAS_EM_MEMORIA`` janelas usadas mais recentemente ficam guardadas.
+
+Os nós por janela também vão para o cache compartilhado entre processos
+(``vinho.compartilhado``), quando houver um: um processo reaproveita o que
+outro já calculou. Fatias de tabelas (``@no(compartilhar=False)``) ficam de
+fora, porque recortá-las é mais barato que serializá-las.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from vinho import compartilhado, dados
+from vinho import cubo as cubo_mod
+from vinho import instrumentacao as instr
+from vinho import janela as janela_mod
+from vinho import metricas, previsao
+
+JANELAS_EM_MEMORIA = 8
+
+# parâmetro do grafo; não é um nó
+PARAMETRO = "janela"
+
+_NOS: dict[str, Callable[..., Any]] = {}
+# nós por janela que não vão para o cache compartilhado
+_LOCAIS: set[str] = set()
+
+# nome ou (nome, janela) -> valor
+_memo: dict[Any, Any] = {}
+# janelas com valores na memória, da menos para a mais recente
+_janelas: OrderedDict[tuple[int, int], None] = OrderedDict()
+_versao_memo: str | None = None
+_trava = threading.RLock()
+
+
+def no(funcao: Callable[..., Any] | None = None, *, compartilhar: bool = True):
+    """Registra ``funcao`` como nó do grafo de agregações.
+
+    Uso: ``@no`` ou ``@no(compartilhar=False)``.
+    """
+    def registrar(funcao):
+        _NOS[funcao.__name__] = funcao
+        if not compartilhar:
+            _LOCAIS.add(funcao.__name__)
+        return funcao
+    return registrar if funcao is None else registrar(funcao)
+
+
+def obter(nome: str, janela: tuple[int, int] | None = None) -> Any:
+    """Valor do nó ``nome`` na janela pedida, calculado na primeira vez.
+
+    Sem ``janela``, vale a padrão (nó ``janela_padrao``: os últimos
+    ``janela.ANOS_PADRAO`` anos). Os objetos devolvidos são compartilhados
+    entre sessões: não os altere no lugar.
+    """
+    global _versao_memo
+    versao = dados.versao()
+    with _trava:
+        if versao != _versao_memo:
+            _memo.clear()
+            _janelas.clear()
+            _versao_memo = versao
+        if janela is None:
+            janela = _calcular("janela_padrao", None)
+        return _calcular(nome, janela_mod.validar(janela))
+
+
+def _calcular(nome: str, janela: tuple[int, int] | None) -> Any:
+    try:
+        funcao = _NOS[nome]
+    except KeyError:
+        raise ValueError(f"agregação desconhecida: {nome!r}") from None
+    chave = (nome, janela) if _usa_janela(nome) else nome
+    if chave in _memo:
+        if chave is not nome:
+            _janelas.move_to_end(janela)
+        return _memo[chave]
+    compartilhar = chave is not nome and nome not in _LOCAIS
+    chave_compartilhada = f"agregacao/{_versao_memo}/{nome}/{janela[0]}-{janela[1]}" if compartilhar else ""
+    valor = compartilhado.obter(chave_compartilhada) if compartilhar else None
+    if valor is None:
+        argumentos = [
+            janela if dep == PARAMETRO else _calcular(dep, janela)
+            for dep in _parametros(funcao)
+        ]
+        with instr.etapa("agregacao", nome):
+            valor = funcao(*argumentos)
+        if compartilhar:
+            compartilhado.guardar(chave_compartilhada, valor)
+    if chave is not nome:
+        _lembrar_janela(janela)
+    _memo[chave] = valor
+    return valor
+
+
+def _lembrar_janela(janela: tuple[int, int]) -> None:
+    _janelas[janela] = None
+    _janelas.move_to_end(janela)
+    while len(_janelas) > JANELAS_EM_MEMORIA:
+        antiga, _ = _janelas.popitem(last=False)
+        for chave in [c for c in _memo if isinstance(c, tuple) and c[1] == antiga]:
+            del _memo[chave]
+
+
+def nos() -> list[str]:
+    """Nomes de todos os nós registrados."""
+    return list(_NOS)
+
+
+def dependencias(nome: str) -> list[str]:
+    """Nós de que ``nome`` depende diretamente (sem o parâmetro ``janela``)."""
+    try:
+        return [dep for dep in _parametros(_NOS[nome]) if dep != PARAMETRO]
+    except KeyError:
+        raise ValueError(f"agregação desconhecida: {nome!r}") from None
+
+
+@functools.lru_cache(maxsize=None)
+def _usa_janela(nome: str) -> bool:
+    """Se ``nome`` depende, direta ou indiretamente, da janela."""
+    return any(
+        dep == PARAMETRO or _usa_janela(dep) for dep in _parametros(_NOS[nome])
+    )
+
+
+def _parametros(funcao: Callable[..., Any]) -> list[str]:
+    return list(inspect.signature(funcao).parameters)
+
+
+def calculados() -> list[str]:
+    """Nós já presentes na memória (na ordem em que foram calculados)."""
+    with _trava:
+        return list(_memo)
+
+
+def limpar() -> None:
+    """Descarta todos os resultados memorizados."""
+    global _versao_memo
+    with _trava:
+        _memo.clear()
+        _janelas.clear()
+        _versao_memo = None
+
+
+# -----------------------
+# Dados de base
+# -----------------------
+@no
+def export() -> pd.DataFrame:
+    return dados.carregar('exportacao')
+
+
+@no
+def imp() -> pd.DataFrame:
+    return dados.carregar('importacao')
+
+
+# Cubo fluxo × país × ano (vinho/cubo.py): base de todos os gráficos
+@no
+def cubo():
+    return cubo_mod.carregar()
+
+
+# Somas acumuladas por país ao longo dos anos: totais e rankings de qualquer
+# janela sem percorrer as células
+@no
+def acumulado(cubo):
+    return cubo_mod.acumular(cubo)
+
+
+# Tabelas completas com o preço por kg (vinho/metricas.py), uma vez por versão
+@no
+def export_precos(export):
+    return metricas.com_preco(export)
+
+
+@no
+def imp_precos(imp):
+    return metricas.com_preco(imp)
+
+
+# Índices ano -> faixa de linhas das tabelas (ordenadas por ano)
+@no
+def indice_export(export):
+    return janela_mod.indexar(export['ano'].to_numpy())
+
+
+@no
+def indice_imp(imp):
+    return janela_mod.indexar(imp['ano'].to_numpy())
+
+
+# -----------------------
+# Janela de análise
+# -----------------------
+@no
+def anos_disponiveis(cubo):
+    return [int(a) for a in cubo.anos]
+
+
+# últimos 15 anos
+@no
+def janela_padrao(cubo):
+    return janela_mod.ultimos(cubo.anos)
+
+
+@no
+def anos_validos(cubo, janela):
+    return cubo.anos_entre(janela)
+
+
+# Linhas brutas da janela, para as tabelas: uma fatia, sem cópia
+@no(compartilhar=False)
+def export_janela(export_precos, indice_export, janela):
+    return export_precos.iloc[indice_export.fatia(janela)]
+
+
+@no(compartilhar=False)
+def imp_janela(imp_precos, indice_imp, janela):
+    return imp_precos.iloc[indice_imp.fatia(janela)]
+
+
+# -----------------------
+# Agregações principais
+# -----------------------
+@no
+def imp_grouped(cubo, anos_validos):
+    return cubo.por_ano('importacao', anos_validos)
+
+
+@no
+def exp_grouped(cubo, anos_validos):
+    return cubo.por_ano('exportacao', anos_validos)
+
+
+# -----------------------
+# Métricas derivadas (vinho/metricas.py)
+# -----------------------
+# Por ano, os dois fluxos empilhados (linha 0 = exportação, 1 = importação):
+# totais, preço por kg, crescimento ano a ano (%) e saldo
+@no
+def metricas_anuais(exp_grouped, imp_grouped):
+    kg = np.vstack([exp_grouped['quantidade_kg'], imp_grouped['quantidade_kg']])
+    dolar = np.vstack([exp_grouped['quantidade_dolar'], imp_grouped['quantidade_dolar']])
+    preco = metricas.preco_unitario(dolar, kg)
+    crescimento_kg = metricas.crescimento(kg)
+    crescimento_dolar = metricas.crescimento(dolar)
+    colunas = {'ano': exp_grouped['ano'].to_numpy()}
+    for i, sufixo in enumerate(('exp', 'imp')):
+        colunas[f'quantidade_kg_{sufixo}'] = kg[i]
+        colunas[f'quantidade_dolar_{sufixo}'] = dolar[i]
+        colunas[f'preco_kg_{sufixo}'] = preco[i]
+        colunas[f'crescimento_kg_{sufixo}'] = crescimento_kg[i]
+        colunas[f'crescimento_dolar_{sufixo}'] = crescimento_dolar[i]
+    colunas['saldo_kg'] = metricas.saldo(kg[0], kg[1])
+    colunas['saldo_dolar'] = metricas.saldo(dolar[0], dolar[1])
+    return pd.DataFrame(colunas)
+
+
+# Por fluxo e país, na janela: totais, preço por kg, participação no valor do
+# fluxo (%) e CAGR do valor entre o primeiro e o último ano. Só países com
+# comércio na janela.
+@no
+def metricas_paises(cubo, anos_validos):
+    blocos = {
+        (fluxo, medida): cubo.densificar(fluxo, anos_validos, medida)[1]
+        for fluxo in cubo_mod.FLUXOS for medida in cubo_mod.MEDIDAS
+    }
+    kg = np.stack([blocos[f, 'quantidade_kg'] for f in cubo_mod.FLUXOS])
+    dolar = np.stack([blocos[f, 'quantidade_dolar'] for f in cubo_mod.FLUXOS])
+    total_kg, total_dolar = kg.sum(axis=2), dolar.sum(axis=2)
+    if len(anos_validos):
+        cagr = metricas.cagr(dolar[..., 0], dolar[..., -1], len(anos_validos) - 1)
+    else:
+        cagr = np.full(total_dolar.shape, np.nan)
+    df = pd.DataFrame({
+        'fluxo': np.repeat(cubo_mod.FLUXOS, len(cubo.paises)),
+        'pais': np.tile(cubo.paises, len(cubo_mod.FLUXOS)),
+        'quantidade_kg': total_kg.ravel(),
+        'quantidade_dolar': total_dolar.ravel(),
+        'preco_kg': metricas.preco_unitario(total_dolar, total_kg).ravel(),
+        'participacao_dolar': metricas.participacao(total_dolar).ravel(),
+        'cagr_dolar': cagr.ravel(),
+    })
+    df = df[(df['quantidade_kg'] != 0) | (df['quantidade_dolar'] != 0)]
+    return df.sort_values(['fluxo', 'quantidade_dolar'], ascending=[True, False], ignore_index=True)
+
+
+# saldo (exportação - importação)
+@no
+def saldo(metricas_anuais):
+    return metricas_anuais[[
+        'ano', 'quantidade_kg_exp', 'quantidade_dolar_exp',
+        'quantidade_kg_imp', 'quantidade_dolar_imp', 'saldo_kg', 'saldo_dolar',
+    ]]
+
+
+# -----------------------
+# Exportações
+# -----------------------
+@no
+def top_paises_export(acumulado, janela):
+    return acumulado.top('exportacao', janela, 'quantidade_dolar', 5).index
+
+
+# por país, só os Top 5 (para linha)
+@no
+def df_top_export(cubo, anos_validos, top_paises_export):
+    return cubo.por_ano_pais('exportacao', anos_validos, 'quantidade_dolar', top_paises_export)
+
+
+# Top 5 países por VALOR acumulado (barras)
+@no
+def top_paises_valor_df(acumulado, janela):
+    return acumulado.top('exportacao', janela, 'quantidade_dolar', 5).reset_index()
+
+
+# agregado anual (valor x quantidade) para barras
+@no
+def df_agg(exp_grouped):
+    return exp_grouped[["ano", "quantidade_dolar", "quantidade_kg"]]
+
+
+# === (Quantidade + Crescimento %) ===
+@no
+def df_ano_geral(exp_grouped):
+    df_ano_geral = (
+        exp_grouped[['ano', 'quantidade_kg']]
+        .rename(columns={'ano': 'Ano', 'quantidade_kg': 'Quantidade'})
+    )
+    df_ano_geral['Crescimento_%'] = metricas.crescimento(df_ano_geral['Quantidade'])
+    return df_ano_geral
+
+
+# -----------------------
+# Importações
+# -----------------------
+@no
+def df_ano(imp_grouped):
+    return imp_grouped
+
+
+# Seleciona os top 5 países pelo valor total no período
+@no
+def top_paises_valor(acumulado, janela):
+    return acumulado.top('importacao', janela, 'quantidade_dolar', 5).index
+
+
+# Valor por ano, só os top 5
+@no
+def df_top_imp_valor(cubo, anos_validos, top_paises_valor):
+    return cubo.por_ano_pais('importacao', anos_validos, 'quantidade_dolar', top_paises_valor)
+
+
+# Top 5 por quantidade (barras)
+@no
+def top_paises_imp_kg(acumulado, janela):
+    return acumulado.top('importacao', janela, 'quantidade_kg', 5).reset_index()
+
+
+@no
+def evolucao(cubo, anos_validos):
+    return cubo.por_ano_pais('importacao', anos_validos, 'quantidade_kg')
+
+
+# -----------------------
+# Mercados futuros
+# -----------------------
+# Totais por continente, ordenados por valor monetário
+@no
+def df_agg_cont_15years(cubo, anos_validos):
+    return cubo.por_continente('exportacao', anos_validos)
+
+
+# Totais monetários anuais de exportação e importação, lado a lado
+@no
+def df_consolidado(exp_grouped, imp_grouped):
+    df_export_anual = exp_grouped[['ano', 'quantidade_dolar']].rename(
+        columns={'quantidade_dolar': 'Total_Exportacao'})
+    df_import_anual = imp_grouped[['ano', 'quantidade_dolar']].rename(
+        columns={'quantidade_dolar': 'Total_Importacao'})
+    return pd.merge(df_export_anual, df_import_anual, on='ano')
+
+
+# -----------------------
+# Previsões (vinho/previsao.py)
+# -----------------------
+# série dos totais de cada fluxo, ajustada junto com as dos países
+TOTAL = "(total)"
+
+
+# Parâmetros dos modelos do valor (US$) de cada país com comércio na janela,
+# nos dois fluxos, mais os totais: um só lote país × ano
+@no
+def modelos_previsao(cubo, anos_validos):
+    blocos, fluxos, paises = [], [], []
+    for fluxo in cubo_mod.FLUXOS:
+        sel, bloco = cubo.densificar(fluxo, anos_validos, 'quantidade_dolar')
+        ativos = bloco.any(axis=1)
+        blocos += [bloco[ativos], bloco.sum(axis=0, keepdims=True)]
+        fluxos += [fluxo] * (int(ativos.sum()) + 1)
+        paises += [*cubo.paises[sel[ativos]], TOTAL]
+    rotulos = pd.DataFrame({'fluxo': fluxos, 'pais': paises})
+    parametros = previsao.ajustar(np.vstack(blocos), anos_validos[-1] if anos_validos else 0)
+    if parametros.empty:
+        rotulos = rotulos.iloc[:0]
+    return pd.concat([rotulos, parametros], axis=1)
+
+
+# Previsão e faixa de confiança de cada série, em formato longo
+@no
+def previsoes(modelos_previsao):
+    df = previsao.prever(modelos_previsao)
+    rotulos = modelos_previsao[['fluxo', 'pais']].iloc[df['serie']].reset_index(drop=True)
+    return pd.concat([rotulos, df.drop(columns='serie')], axis=1)
+
+
+@no
+def previsao_consolidado(previsoes):
+    return previsoes[previsoes['pais'] == TOTAL].reset_index(drop=True)
+
+
+# Destinos de exportação com maior valor previsto no fim do horizonte, com o
+# crescimento anual previsto a partir do último ano da janela; só países com
+# exportação regular e recente (previsao.elegivel)
+@no
+def previsao_destinos(modelos_previsao, previsoes):
+    exportacao = previsoes[(previsoes['fluxo'] == 'exportacao') & (previsoes['pais'] != TOTAL)]
+    final = exportacao[exportacao['ano'] == exportacao['ano'].max()]
+    modelos = modelos_previsao[previsao.elegivel(modelos_previsao)]
+    df = final.merge(modelos[['fluxo', 'pais', 'modelo', 'ultimo_valor']], on=['fluxo', 'pais'])
+    df['cagr_previsto'] = metricas.cagr(df['ultimo_valor'], df['previsao'], previsao.HORIZONTE)
+    return df.nlargest(10, 'previsao')[[
+        'pais', 'modelo', 'ultimo_valor', 'previsao', 'inferior', 'superior', 'cagr_previsto',
+    ]].reset_index(drop=True)
@@ -0,0 +1,95 @@
+"""Nível de detalhe das figuras: menos pontos quando o intervalo é longo.
+
+Séries de linha com mais de ``PONTOS_POR_SERIE`` pontos são reduzidas com
+LTTB (*Largest-Triangle-Three-Buckets*), que mantém picos e vales; barras
+anuais além de ``BARRAS_MAXIMAS`` anos são somadas em baldes de vários anos.
+A redução é feita depois do recorte de anos pedido à figura, então um
+intervalo estreito (o slider de anos, a janela de análise) volta à
+resolução completa. Acima de ``LIMITE_WEBGL`` pontos os traços usam WebGL
+(``Scattergl``). Com os dados anuais de hoje nada disso é acionado; os
+limites podem ser ajustados por variáveis de ambiente.
+"""
+from __future__ import annotations
+
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+PONTOS_POR_SERIE = int(os.environ.get("VINHO_PONTOS_POR_SERIE", "500"))
+BARRAS_MAXIMAS = int(os.environ.get("VINHO_BARRAS_MAXIMAS", "40"))
+LIMITE_WEBGL = int(os.environ.get("VINHO_LIMITE_WEBGL", "1000"))
+
+
+def lttb(x, y, limite: int = PONTOS_POR_SERIE) -> np.ndarray:
+    """Posições dos ``limite`` pontos escolhidos por LTTB (sempre o primeiro e o último).
+
+    ``x`` precisa estar em ordem crescente; y nulo conta como zero na escolha.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.nan_to_num(np.asarray(y, dtype="float64"))
+    n = len(x)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+    escolhidos = np.empty(limite, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    # limite - 2 baldes entre o primeiro e o último ponto
+    bordas = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    bordas = np.append(bordas, n)
+    anterior = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        # média do balde seguinte (o último ponto, para o último balde)
+        x_medio = x[fim:bordas[i + 2]].mean()
+        y_medio = y[fim:bordas[i + 2]].mean()
+        area = np.abs(
+            (x[anterior] - x_medio) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (y_medio - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(area))
+        escolhidos[i + 1] = anterior
+    return escolhidos
+
+
+def reduzir(df: pd.DataFrame, x: str, y: str, serie: str | None = None,
+            limite: int = PONTOS_POR_SERIE) -> pd.DataFrame:
+    """Linhas de ``df`` que sobram depois de aplicar LTTB a cada série."""
+    if serie is None:
+        if len(df) <= limite:
+            return df
+        df = df.sort_values(x, kind="stable")
+        return df.iloc[lttb(df[x], df[y], limite)]
+    tamanhos = df.groupby(serie, observed=True).size()
+    if tamanhos.empty or tamanhos.max() <= limite:
+        return df
+    partes = [reduzir(grupo, x, y, None, limite) for _, grupo in df.groupby(serie, observed=True, sort=False)]
+    return pd.concat(partes)
+
+
+def baldes_de_anos(df: pd.DataFrame, coluna: str = "ano",
+                   maximo: int = BARRAS_MAXIMAS) -> pd.DataFrame:
+    """Soma as demais colunas em baldes de anos quando há mais de ``maximo`` anos.
+
+    Os baldes são rotulados "1970–1971"; abaixo do limite ``df`` volta igual.
+    """
+    anos = df[coluna].to_numpy()
+    if len(anos) == 0 or len(np.unique(anos)) <= maximo:
+        return df
+    primeiro, ultimo = int(anos.min()), int(anos.max())
+    largura = math.ceil((ultimo - primeiro + 1) / maximo)
+    inicio = primeiro + (anos - primeiro) // largura * largura
+    fim = np.minimum(inicio + largura - 1, ultimo)
+    rotulo = pd.Series([f"{a}–{b}" if a != b else str(a) for a, b in zip(inicio, fim)], index=df.index)
+    somas = df.drop(columns=coluna).groupby(rotulo, sort=False).sum()
+    return somas.rename_axis(coluna).reset_index()
+
+
+def webgl(pontos: int) -> bool:
+    """Se ``pontos`` pontos pedem traços WebGL."""
+    return pontos > LIMITE_WEBGL
+
+
+def modo_render(pontos: int) -> str:
+    """``render_mode`` do plotly express para ``pontos`` pontos."""
+    return "webgl" if webgl(pontos) else "svg"
@@ -0,0 +1,266 @@
+"""API HTTP/JSON, sem Streamlit, sobre as agregações do painel.
+
+Servidor asyncio mínimo (HTTP/1.1 com keep-alive, só ``GET``) para outros
+consumidores lerem os mesmos números do painel sem abrir uma sessão
+Streamlit. O cálculo roda em threads (``asyncio.to_thread``) sobre os nós
+memorizados de ``vinho.agregacoes``; o laço de eventos só trata E/S. Cada
+resposta leva ``ETag`` com a versão dos dados e responde ``304`` a um
+``If-None-Match`` igual.
+
+Rotas::
+
+    GET /agregacoes                      nós disponíveis e versão dos dados
+    GET /agregacoes/<nó>                 tabela em JSON (lista de registros)
+    GET /tabelas/<nó>?pagina=2&ordenar_por=ano&crescente=0&pais=chi
+    GET /figuras/<gráfico>               figura Plotly em JSON
+    GET /ranking/<fluxo>?medida=quantidade_kg&n=10
+                                         os n países de maior total
+    GET /metricas                        etapas e contadores (texto do Prometheus)
+
+As rotas de nó, tabela, figura e ranking aceitam ``?inicio=2005&fim=2012`` para a
+janela de análise; o lado omitido fica o da janela padrão (últimos 15 anos).
+``tamanho`` (linhas por página das tabelas) vai de 1 a ``tabelas.TAMANHO_MAXIMO``.
+
+Uso::
+
+    python -m vinho.api --porta 8000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from vinho import agregacoes, dados, figuras, tabelas
+from vinho import janela as janela_mod
+from vinho import instrumentacao as instr
+
+logger = logging.getLogger(__name__)
+
+# nós de entrada (tabelas completas, índices e o cubo) não são expostos
+PRIVADOS = {
+    "export", "imp", "export_precos", "imp_precos", "cubo", "acumulado", "indice_export", "indice_imp",
+}
+# países por ranking, no máximo
+TOP_MAXIMO = 1000
+
+TEMPO_OCIOSO_S = 30
+LIMITE_CABECALHOS = 64 * 1024
+
+
+class ErroHttp(Exception):
+    def __init__(self, status: HTTPStatus, mensagem: str = ""):
+        super().__init__(mensagem or status.phrase)
+        self.status = status
+
+
+def publicos() -> list[str]:
+    return [nome for nome in agregacoes.nos() if nome not in PRIVADOS]
+
+
+def para_json(valor) -> str:
+    """Texto JSON de um resultado de agregação."""
+    if isinstance(valor, pd.DataFrame):
+        return valor.to_json(orient="records", force_ascii=False)
+    if isinstance(valor, (pd.Series, pd.Index, np.ndarray)):
+        return pd.Series(valor).to_json(orient="values", force_ascii=False)
+    return json.dumps(valor, ensure_ascii=False, default=str)
+
+
+# -----------------------
+# Rotas (síncronas, executadas fora do laço de eventos)
+# -----------------------
+def _um(parametros: dict, nome: str, padrao=None):
+    return parametros.get(nome, [padrao])[-1]
+
+
+def _janela(parametros: dict) -> tuple[int, int] | None:
+    inicio, fim = _um(parametros, "inicio"), _um(parametros, "fim")
+    if inicio is None and fim is None:
+        return None
+    padrao = agregacoes.obter("janela_padrao")
+    try:
+        return janela_mod.validar((inicio or padrao[0], fim or padrao[1]))
+    except ValueError as erro:
+        raise ErroHttp(HTTPStatus.BAD_REQUEST, str(erro)) from None
+
+
+def _rota_agregacoes() -> str:
+    return json.dumps({"versao": dados.versao(), "agregacoes": publicos()}, ensure_ascii=False)
+
+
+def _rota_agregacao(nome: str, parametros: dict) -> str:
+    if nome not in publicos():
+        raise ErroHttp(HTTPStatus.NOT_FOUND, f"agregação desconhecida: {nome}")
+    return para_json(agregacoes.obter(nome, _janela(parametros)))
+
+
+def _rota_tabela(nome: str, parametros: dict) -> str:
+    if nome not in publicos():
+        raise ErroHttp(HTTPStatus.NOT_FOUND, f"agregação desconhecida: {nome}")
+    janela = _janela(parametros)
+    df = agregacoes.obter(nome, janela)
+    if not isinstance(df, pd.DataFrame):
+        raise ErroHttp(HTTPStatus.BAD_REQUEST, f"{nome} não é uma tabela")
+    try:
+        tamanho = int(_um(parametros, "tamanho", tabelas.TAMANHO_PAGINA))
+    except ValueError:
+        raise ErroHttp(HTTPStatus.BAD_REQUEST, "tamanho deve ser um inteiro") from None
+    if not 1 <= tamanho <= tabelas.TAMANHO_MAXIMO:
+        raise ErroHttp(HTTPStatus.BAD_REQUEST, f"tamanho deve estar entre 1 e {tabelas.TAMANHO_MAXIMO}")
+    try:
+        pagina = tabelas.paginar(
+            (nome, janela), df,
+            ordenar_por=_um(parametros, "ordenar_por"),
+            crescente=_um(parametros, "crescente", "1") not in ("0", "false"),
+            pais=_um(parametros, "pais", ""),
+            pagina=int(_um(parametros, "pagina", 1)),
+            tamanho=tamanho,
+        )
+    except ValueError as erro:
+        raise ErroHttp(HTTPStatus.BAD_REQUEST, str(erro)) from None
+    return json.dumps({
+        "pagina": pagina.numero,
+        "paginas": pagina.paginas,
+        "total": pagina.total,
+        "linhas": json.loads(para_json(pagina.linhas)),
+    }, ensure_ascii=False)
+
+
+def _rota_figura(nome: str, parametros: dict) -> str:
+    if nome not in figuras.graficos():
+        raise ErroHttp(HTTPStatus.NOT_FOUND, f"gráfico desconhecido: {nome}")
+    return figuras.json_figura(nome, janela=_janela(parametros))
+
+
+def _rota_ranking(fluxo: str, parametros: dict) -> str:
+    medida = _um(parametros, "medida", "quantidade_dolar")
+    try:
+        n = int(_um(parametros, "n", 5))
+    except ValueError:
+        raise ErroHttp(HTTPStatus.BAD_REQUEST, "n deve ser um inteiro") from None
+    if not 1 <= n <= TOP_MAXIMO:
+        raise ErroHttp(HTTPStatus.BAD_REQUEST, f"n deve estar entre 1 e {TOP_MAXIMO}")
+    janela = _janela(parametros) or agregacoes.obter("janela_padrao")
+    try:
+        top = agregacoes.obter("acumulado").top(fluxo, janela, medida, n)
+    except ValueError as erro:
+        raise ErroHttp(HTTPStatus.BAD_REQUEST, str(erro)) from None
+    return para_json(top.reset_index())
+
+
+def responder(caminho: str) -> str:
+    """Corpo JSON para ``GET caminho`` (levanta ``ErroHttp``)."""
+    partes = urlsplit(caminho)
+    segmentos = [unquote(s) for s in partes.path.strip("/").split("/") if s]
+    parametros = parse_qs(partes.query)
+    if segmentos == ["agregacoes"]:
+        return _rota_agregacoes()
+    if len(segmentos) == 2 and segmentos[0] == "agregacoes":
+        return _rota_agregacao(segmentos[1], parametros)
+    if len(segmentos) == 2 and segmentos[0] == "tabelas":
+        return _rota_tabela(segmentos[1], parametros)
+    if len(segmentos) == 2 and segmentos[0] == "figuras":
+        return _rota_figura(segmentos[1], parametros)
+    if len(segmentos) == 2 and segmentos[0] == "ranking":
+        return _rota_ranking(segmentos[1], parametros)
+    raise ErroHttp(HTTPStatus.NOT_FOUND)
+
+
+# -----------------------
+# Servidor
+# -----------------------
+def _resposta(status: HTTPStatus, corpo: bytes = b"", cabecalhos: dict | None = None) -> bytes:
+    linhas = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    cabecalhos = {"Content-Length": str(len(corpo)), **(cabecalhos or {})}
+    linhas += [f"{nome}: {valor}" for nome, valor in cabecalhos.items()]
+    return ("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1") + corpo
+
+
+async def _atender(leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            try:
+                bruto = await asyncio.wait_for(leitor.readuntil(b"\r\n\r\n"), TEMPO_OCIOSO_S)
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.LimitOverrunError):
+                return
+            linha, *resto = bruto.decode("latin-1").split("\r\n")
+            cabecalhos = {}
+            for item in resto:
+                if ":" in item:
+                    nome, valor = item.split(":", 1)
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+            try:
+                metodo, caminho, versao_http = linha.split(" ", 2)
+            except ValueError:
+                escritor.write(_resposta(HTTPStatus.BAD_REQUEST))
+                return
+            manter = (versao_http == "HTTP/1.1"
+                      and cabecalhos.get("connection", "").lower() != "close")
+            escritor.write(await _processar(metodo, caminho, cabecalhos))
+            await escritor.drain()
+            if not manter:
+                return
+    finally:
+        escritor.close()
+
+
+async def _processar(metodo: str, caminho: str, cabecalhos: dict) -> bytes:
+    if metodo != "GET":
+        return _resposta(HTTPStatus.METHOD_NOT_ALLOWED, cabecalhos={"Allow": "GET"})
+    if urlsplit(caminho).path == "/metricas":
+        corpo = instr.texto_prometheus().encode("utf-8")
+        return _resposta(HTTPStatus.OK, corpo, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+    try:
+        versao = await asyncio.to_thread(dados.versao)
+        etag = '"%s-%s"' % (versao, hashlib.sha1(caminho.encode()).hexdigest()[:12])
+        if cabecalhos.get("if-none-match") == etag:
+            return _resposta(HTTPStatus.NOT_MODIFIED, cabecalhos={"ETag": etag})
+        corpo = (await asyncio.to_thread(responder, caminho)).encode("utf-8")
+    except ErroHttp as erro:
+        corpo = json.dumps({"erro": str(erro)}, ensure_ascii=False).encode("utf-8")
+        return _resposta(erro.status, corpo, {"Content-Type": "application/json; charset=utf-8"})
+    except Exception:
+        logger.exception("erro em GET %s", caminho)
+        return _resposta(HTTPStatus.INTERNAL_SERVER_ERROR)
+    return _resposta(HTTPStatus.OK, corpo, {
+        "Content-Type": "application/json; charset=utf-8",
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+    })
+
+
+async def servir(host: str = "127.0.0.1", porta: int = 8000) -> asyncio.AbstractServer:
+    """Inicia o servidor no laço de eventos atual e o devolve."""
+    return await asyncio.start_server(_atender, host, porta, limit=LIMITE_CABECALHOS)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="API JSON das agregações do painel")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8000)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    async def rodar():
+        servidor = await servir(args.host, args.porta)
+        host, porta = servidor.sockets[0].getsockname()[:2]
+        print(f"API em http://{host}:{porta}/agregacoes (Ctrl+C para sair)")
+        async with servidor:
+            await servidor.serve_forever()
+
+    try:
+        asyncio.run(rodar())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Aquecimento dos caches no início do processo e prontidão para o balanceador.
+
+Sem aquecimento, o primeiro visitante depois de um deploy paga a leitura dos
+CSVs e todas as agregações e figuras da página que abrir. ``iniciar()``
+dispara, numa thread de fundo, o cálculo de tudo o que as páginas do menu
+(``PAGINAS``) mostram no estado padrão (janela dos últimos 15 anos, widgets
+nos valores iniciais): primeiro os conjuntos de dados, depois os nós e as
+figuras de cada página num ``ThreadPoolExecutor``. Os nós do grafo são
+calculados um de cada vez (a trava de ``vinho.agregacoes``); a montagem das
+figuras roda em paralelo. Com ``VINHO_CACHE`` compartilhado, um processo
+aproveita o que outro já aqueceu.
+
+``servir_saude()`` responde em ``/saude`` (processo vivo, sempre 200) e em
+``/pronto`` (200 depois do aquecimento e com o servidor do Streamlit
+respondendo em ``/_stcore/health``, 503 antes), os dois com ``estado()`` em
+JSON. Para subir um processo do painel já aquecendo::
+
+    python -m vinho.aquecimento --porta-saude 8601 --server.port 8501
+
+Os argumentos que não são deste módulo vão para ``streamlit run
+aplicativo.py``, no mesmo processo (os caches são os mesmos do painel).
+O balanceador deve checar ``/pronto`` antes de mandar tráfego ao processo,
+como faz ``vinho.lancador``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from vinho import instrumentacao as instr
+
+logger = logging.getLogger(__name__)
+
+ag = instr.tardio("vinho.agregacoes")
+figuras = instr.tardio("vinho.figuras")
+
+APLICATIVO = Path(__file__).resolve().parent.parent / "aplicativo.py"
+
+PORTA_SAUDE = int(os.environ.get("VINHO_SAUDE_PORTA", "0") or 0)
+THREADS = int(os.environ.get("VINHO_AQUECIMENTO_THREADS", str(min(8, os.cpu_count() or 2))))
+
+# conjuntos de dados de que todas as páginas dependem
+DADOS = ["export", "imp", "cubo", "acumulado", "anos_disponiveis", "janela_padrao"]
+
+# página do menu -> (nós lidos pela própria página, figuras exibidas)
+PAGINAS = {
+    "Geral": (["export_janela", "imp_janela"], []),
+    "Exportações": (["export_janela"], [
+        "exportacao_quantidade_crescimento",
+        "exportacao_valor_quantidade",
+        "exportacao_top5_valor",
+        "exportacao_top5_evolucao",
+    ]),
+    "Importações": (["imp_grouped", "df_top_imp_valor", "imp_janela"], [
+        "importacao_evolucao",
+        "importacao_top5_evolucao",
+        "importacao_top5_quantidade",
+    ]),
+    "Mercados futuros": (["previsao_destinos"], [
+        "mercados_consolidado",
+        "mercados_previsao",
+        "mercados_continentes",
+    ]),
+}
+
+_trava = threading.Lock()
+_estado = {
+    "pronto": False,
+    "iniciado": None,
+    "concluido": None,
+    "tarefas": 0,
+    "feitas": 0,
+    "erros": [],
+}
+_thread: threading.Thread | None = None
+_servidor_saude = None
+# URL de saúde do Streamlit que /pronto consulta (None: não há painel)
+_saude_painel: str | None = None
+
+
+# -----------------------
+# Parâmetros padrão das figuras
+# -----------------------
+# Os fragmentos de importação de aplicativo.py passam à figura os limites do
+# slider de anos; no estado inicial, o slider cobre todo o intervalo abaixo.
+def _anos_importacao(janela) -> dict:
+    df = ag.obter("imp_grouped", janela)
+    anos = df.loc[df["quantidade_kg"].notna() & (df["quantidade_kg"] > 0), "ano"]
+    if anos.empty:
+        return {}
+    return {"metrica": "Quantidade (kg)", "anos": (int(anos.min()), int(anos.max()))}
+
+
+def _anos_top5_importacao(janela) -> dict:
+    df = ag.obter("df_top_imp_valor", janela)
+    if df.empty:
+        return {}
+    return {"anos": (int(df["ano"].min()), int(df["ano"].max()))}
+
+
+_PARAMETROS = {
+    "importacao_evolucao": _anos_importacao,
+    "importacao_top5_evolucao": _anos_top5_importacao,
+}
+
+
+def _figura(grafico: str, janela) -> None:
+    parametros = _PARAMETROS[grafico](janela) if grafico in _PARAMETROS else {}
+    if grafico in _PARAMETROS and not parametros:
+        return  # a página mostra um aviso em vez da figura
+    figuras.json_figura(grafico, **parametros, janela=janela)
+
+
+# -----------------------
+# Aquecimento
+# -----------------------
+def tarefas(janela) -> list[tuple[str, Callable[[], Any]]]:
+    """(nome, função) de cada nó e figura das páginas, sem repetições."""
+    lista, vistos = [], set()
+    for nos, graficos in PAGINAS.values():
+        for nome in nos:
+            if nome not in vistos:
+                vistos.add(nome)
+                lista.append((nome, lambda nome=nome: ag.obter(nome, janela)))
+        for grafico in graficos:
+            if grafico not in vistos:
+                vistos.add(grafico)
+                lista.append((f"figura:{grafico}", lambda grafico=grafico: _figura(grafico, janela)))
+    return lista
+
+
+def _executar(nome: str, funcao: Callable[[], Any]) -> None:
+    try:
+        funcao()
+    except Exception as erro:
+        logger.exception("aquecimento: %s falhou", nome)
+        with _trava:
+            _estado["erros"].append(f"{nome}: {erro}")
+    with _trava:
+        _estado["feitas"] += 1
+
+
+def aquecer(threads: int = THREADS) -> dict:
+    """Calcula dados, nós e figuras de todas as páginas; devolve ``estado()``.
+
+    Falhas são registradas em ``erros`` e não impedem o processo de ficar
+    pronto: a página que falhar mostraria o mesmo erro ao visitante.
+    """
+    with _trava:
+        _estado.update(pronto=False, iniciado=time.time(), concluido=None,
+                       tarefas=len(DADOS), feitas=0, erros=[])
+    with instr.etapa("aquecimento", "dados"):
+        for nome in DADOS:
+            _executar(nome, lambda nome=nome: ag.obter(nome))
+    janela = ag.obter("janela_padrao")
+    lista = tarefas(janela)
+    with _trava:
+        _estado["tarefas"] += len(lista)
+    with instr.etapa("aquecimento", "paginas"), ThreadPoolExecutor(threads, "aquecimento") as executor:
+        for nome, funcao in lista:
+            executor.submit(_executar, nome, funcao)
+    with _trava:
+        _estado.update(pronto=True, concluido=time.time())
+    atual = estado()
+    logger.info("aquecimento: %d tarefas em %.1f s, %d erro(s)",
+                atual["tarefas"], atual["segundos"], len(atual["erros"]))
+    return atual
+
+
+def iniciar(threads: int = THREADS) -> threading.Thread:
+    """Roda ``aquecer()`` numa thread de fundo (uma vez por processo)."""
+    global _thread
+    with _trava:
+        if _thread is None:
+            _thread = threading.Thread(target=aquecer, args=(threads,), name="aquecimento", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def pronto() -> bool:
+    with _trava:
+        return _estado["pronto"]
+
+
+def estado() -> dict:
+    """Progresso do aquecimento: pronto, tarefas, feitas, erros e segundos."""
+    with _trava:
+        atual = {**_estado, "erros": list(_estado["erros"])}
+    inicio, fim = atual.pop("iniciado"), atual.pop("concluido")
+    atual["segundos"] = round((fim or time.time()) - inicio, 3) if inicio else 0.0
+    return atual
+
+
+# -----------------------
+# Saúde e prontidão
+# -----------------------
+def _opcao(argumentos: list[str], nome: str, padrao: str) -> str:
+    """Valor de ``--nome valor`` ou ``--nome=valor`` (o último vence, como no click)."""
+    valor = padrao
+    for i, argumento in enumerate(argumentos):
+        if argumento == nome and i + 1 < len(argumentos):
+            valor = argumentos[i + 1]
+        elif argumento.startswith(nome + "="):
+            valor = argumento.split("=", 1)[1]
+    return valor
+
+
+def url_saude_painel(argumentos: list[str]) -> str:
+    """``/_stcore/health`` do servidor que ``streamlit run`` sobe com esses argumentos."""
+    porta = _opcao(argumentos, "--server.port", os.environ.get("STREAMLIT_SERVER_PORT", "8501"))
+    host = _opcao(argumentos, "--server.address", os.environ.get("STREAMLIT_SERVER_ADDRESS", ""))
+    base = _opcao(argumentos, "--server.baseUrlPath", os.environ.get("STREAMLIT_SERVER_BASE_URL_PATH", ""))
+    if host in ("", "0.0.0.0", "::"):
+        host = "127.0.0.1"
+    base = "/".join(parte for parte in base.split("/") if parte)
+    return f"http://{host}:{porta}/{base + '/' if base else ''}_stcore/health"
+
+
+def painel_no_ar(url: str, timeout: float = 1.0) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resposta:
+            return resposta.status == 200
+    except OSError:
+        return False
+
+
+def servir_saude(porta: int, host: str = "127.0.0.1", saude_painel: str | None = None):
+    """Serve ``/saude`` e ``/pronto`` numa thread (uma vez por processo).
+
+    Com ``saude_painel``, ``/pronto`` só responde 200 se essa URL também
+    responder: o aquecimento pode terminar antes de o Streamlit abrir a porta.
+    """
+    global _saude_painel
+    global _servidor_saude
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    with _trava:
+        _saude_painel = saude_painel
+        if _servidor_saude is not None:
+            return _servidor_saude
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                caminho = self.path.split("?")[0]
+                if caminho not in ("/saude", "/pronto"):
+                    self.send_error(404)
+                    return
+                atual = estado()
+                if caminho == "/pronto" and _saude_painel is not None:
+                    # só consulta o painel depois do aquecimento
+                    atual["painel"] = atual["pronto"] and painel_no_ar(_saude_painel)
+                    atual["pronto"] = atual["painel"]
+                ok = caminho == "/saude" or atual["pronto"]
+                corpo = json.dumps(atual).encode("utf-8")
+                self.send_response(200 if ok else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        _servidor_saude = ThreadingHTTPServer((host, porta), Manipulador)
+        threading.Thread(target=_servidor_saude.serve_forever, daemon=True).start()
+        return _servidor_saude
+
+
+# -----------------------
+# Linha de comando
+# -----------------------
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Aquece os caches e sobe o painel (demais argumentos vão para o streamlit run)")
+    parser.add_argument("--porta-saude", type=int, default=PORTA_SAUDE,
+                        help="porta de /saude e /pronto (VINHO_SAUDE_PORTA; 0 desliga)")
+    parser.add_argument("--host-saude", default="127.0.0.1")
+    parser.add_argument("--threads", type=int, default=THREADS)
+    parser.add_argument("--so-aquecer", action="store_true",
+                        help="só aquece e mostra o estado, sem subir o painel")
+    args, resto = parser.parse_known_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.so_aquecer:
+        print(json.dumps(aquecer(args.threads), ensure_ascii=False, indent=2))
+        return
+    # importado antes da thread de aquecimento: importações concorrentes de
+    # pandas/plotly podem ver um módulo inicializado pela metade
+    from streamlit.web import cli
+
+    resto = [argumento for argumento in resto if argumento != "--"]
+    if args.porta_saude:
+        servir_saude(args.porta_saude, args.host_saude, url_saude_painel(resto))
+    iniciar(args.threads)
+    cli.main(["run", str(APLICATIVO), *resto], prog_name="streamlit")
+
+
+if __name__ == "__main__":
+    main()
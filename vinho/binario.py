@@ -0,0 +1,174 @@
+"""Formato binário compacto e mapeável em memória para os dados de ``dados/``.
+
+Cada fluxo vira um diretório com um ``.npy`` por coluna, em tipos enxutos:
+
+* ``pais``: códigos inteiros de uma categoria (int8/int16) + lista de nomes;
+* ``ano``: int16;
+* ``quantidade_kg``: int64;
+* ``quantidade_dolar``: int64 + máscara de nulos (tipo ``Int64`` do pandas).
+
+Os CSVs são uma grade completa país × ano em que a maior parte das linhas é
+``0,0``; só as linhas com comércio são guardadas (``podar``), o que corta
+memória e o trabalho de cada filtro na mesma proporção. Zeros explícitos,
+quando um gráfico precisa deles, vêm de ``Cubo.densificar``. As linhas ficam
+ordenadas por ano, para que uma janela de anos seja uma fatia contígua
+(``vinho.janela``).
+
+O valor em US$ fica em int64 com máscara, e não em float32, porque há totais
+acima de 2**24 (≈16,7 milhões) que o float32 arredondaria. Os arrays são
+abertos com ``mmap_mode="r"``: vários processos do Streamlit lendo o mesmo
+arquivo compartilham as mesmas páginas do cache do sistema operacional em vez
+de cada um manter sua própria cópia. Por isso nada é sobrescrito no lugar:
+cada arquivo é gravado ao lado e trocado (``gravar``), quem já mapeou a
+versão antiga continua lendo-a, e ``meta.json`` sai antes da regravação e
+volta por último; ``ler`` confere que ele não mudou enquanto mapeava.
+
+Para converter os CSVs::
+
+    python -m vinho.binario
+
+``dados.carregar()`` usa o formato binário automaticamente quando ele
+corresponde ao conteúdo atual do CSV, e volta ao CSV caso contrário.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# versão do layout gravado; conversões de outro formato são ignoradas
+FORMATO = 3
+
+
+def compactar(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte um DataFrame no formato dos CSVs para os tipos compactos.
+
+    Só ficam as linhas com comércio (``podar``), em ordem de ano (estável:
+    dentro do ano, a ordem do arquivo); todos os países continuam nas
+    categorias de ``pais``.
+    """
+    df = podar(pd.DataFrame({
+        "pais": df["pais"].astype("category"),
+        "ano": df["ano"].astype("int16"),
+        "quantidade_kg": df["quantidade_kg"].astype("int64"),
+        "quantidade_dolar": df["quantidade_dolar"].astype("Int64"),
+    }))
+    if not df["ano"].is_monotonic_increasing:
+        df = df.sort_values("ano", kind="stable", ignore_index=True)
+    return df
+
+
+def podar(df: pd.DataFrame) -> pd.DataFrame:
+    """Descarta as linhas ``0,0`` da grade país × ano.
+
+    Linhas com US$ nulo ficam: o valor é desconhecido, não zero.
+    """
+    vivas = (df["quantidade_kg"] != 0) | (df["quantidade_dolar"] != 0).fillna(True)
+    return df[vivas.to_numpy(dtype=bool)].reset_index(drop=True)
+
+
+def gravar(arquivo: Path, array: np.ndarray) -> None:
+    """Grava ``array`` ao lado e troca: quem já mapeou o arquivo antigo continua lendo-o."""
+    temporario = arquivo.with_name(arquivo.name + ".tmp")
+    with open(temporario, "wb") as f:
+        np.save(f, array)
+    os.replace(temporario, arquivo)
+
+
+def invalidar(destino: Path) -> None:
+    """Tira o ``meta.json`` de ``destino`` antes de regravar os arrays."""
+    (Path(destino) / "meta.json").unlink(missing_ok=True)
+
+
+def gravar_meta(destino: Path, meta: dict) -> None:
+    """``meta.json`` gravado ao lado e trocado; vai por último, depois dos arrays."""
+    arquivo = Path(destino) / "meta.json"
+    temporario = arquivo.with_name(arquivo.name + ".tmp")
+    temporario.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(temporario, arquivo)
+
+
+def ler_meta(origem: Path) -> dict | None:
+    try:
+        return json.loads((Path(origem) / "meta.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def converter(df: pd.DataFrame, destino: Path, origem_sha1: str) -> int:
+    """Grava ``df`` em ``destino`` e devolve as linhas gravadas.
+
+    ``origem_sha1`` identifica o CSV de origem.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    df = compactar(df)
+    pais = df["pais"].array
+    dolar = df["quantidade_dolar"].array
+    invalidar(destino)
+    gravar(destino / "pais.npy", np.asarray(pais.codes))
+    gravar(destino / "paises.npy", np.asarray(pais.categories, dtype=str))
+    gravar(destino / "ano.npy", df["ano"].to_numpy())
+    gravar(destino / "quantidade_kg.npy", df["quantidade_kg"].to_numpy())
+    gravar(destino / "quantidade_dolar.npy", dolar.to_numpy(dtype="int64", na_value=0))
+    gravar(destino / "quantidade_dolar_nulo.npy", np.asarray(dolar.isna()))
+    # meta.json por último: só um conjunto completo é considerado válido
+    gravar_meta(destino, {"origem_sha1": origem_sha1, "linhas": len(df), "formato": FORMATO})
+    return len(df)
+
+
+def ler(origem: Path, origem_sha1: str | None = None) -> pd.DataFrame | None:
+    """DataFrame mapeado em memória, ou None se não houver conversão em dia.
+
+    Com ``origem_sha1``, só aceita arquivos convertidos daquele CSV. O
+    DataFrame é somente leitura: faça ``.copy()`` antes de alterá-lo.
+    """
+    origem = Path(origem)
+    meta = ler_meta(origem)
+    if meta is None or meta.get("formato") != FORMATO:
+        return None
+    if origem_sha1 is not None and meta.get("origem_sha1") != origem_sha1:
+        return None
+
+    def mapa(nome):
+        return np.load(origem / f"{nome}.npy", mmap_mode="r")
+
+    try:
+        categorias = pd.CategoricalDtype(pd.Index(np.load(origem / "paises.npy")))
+        colunas = {
+            "pais": pd.Categorical.from_codes(mapa("pais"), dtype=categorias, validate=False),
+            "ano": mapa("ano"),
+            "quantidade_kg": mapa("quantidade_kg"),
+            "quantidade_dolar": pd.arrays.IntegerArray(
+                mapa("quantidade_dolar"), mapa("quantidade_dolar_nulo")
+            ),
+        }
+    except (FileNotFoundError, ValueError):
+        return None  # regravação em andamento
+    # meta.json mudou (ou sumiu) enquanto os arrays eram mapeados: mistura de versões
+    if ler_meta(origem) != meta:
+        return None
+    return pd.DataFrame(colunas, copy=False)
+
+
+def main(argv=None) -> None:
+    from vinho import dados, leitura
+
+    parser = argparse.ArgumentParser(description="Converte dados/*.csv para o formato binário")
+    parser.add_argument("--dados", type=Path, default=None, help="diretório dos CSVs")
+    args = parser.parse_args(argv)
+    for fluxo in dados.ARQUIVOS:
+        arquivo = dados.caminho(fluxo, args.dados)
+        destino = dados.caminho_binario(fluxo, args.dados)
+        df, relatorio = leitura.ler_validado(arquivo)
+        gravadas = converter(df, destino, dados.hash_conteudo(arquivo))
+        print(f"{fluxo}: {gravadas} linhas com comércio -> {destino}")
+        print(f"  {relatorio.resumo()}")
+
+
+if __name__ == "__main__":
+    main()
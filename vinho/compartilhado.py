@@ -0,0 +1,236 @@
+"""Cache compartilhado entre processos do painel.
+
+Cada processo do Streamlit guarda suas agregações (``vinho.agregacoes``) e
+figuras (``vinho.figuras``) na própria memória; com vários processos atrás de
+uma porta (``vinho.lancador``), cada um refaria o mesmo trabalho. Com
+``VINHO_CACHE`` apontando para um backend compartilhado, o primeiro processo
+que calcula um resultado o grava lá e os outros o leem:
+
+* ``local`` (padrão): nada é compartilhado, só a memória de cada processo;
+* ``disco:/caminho``: um arquivo por chave num diretório comum (em
+  ``/dev/shm`` ele fica em memória compartilhada), limitado a
+  ``LIMITE_DISCO_MB`` (``VINHO_CACHE_LIMITE_MB``): acima disso saem os
+  arquivos lidos há mais tempo. As chaves levam versão dos dados, janela e
+  parâmetros, então sem o limite o diretório só cresceria;
+* ``redis://host:porta/0``: um servidor Redis (ou compatível), se o pacote
+  ``redis`` estiver instalado.
+
+Qualquer objeto com ``ler``, ``gravar`` e ``limpar`` serve de backend
+(``Backend``); ``Redis`` aceita qualquer cliente com ``get``/``set``/
+``scan_iter``/``delete``. Os valores vão serializados com ``pickle``: use só
+backends em que os processos do painel confiam.
+
+As tabelas lidas e o cubo não passam por aqui: num backend compartilhado, o
+primeiro processo grava a conversão binária e o cubo em ``dados/`` (sob
+``exclusivo``) e todos os mapeiam em memória, compartilhando as páginas.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator, Protocol
+
+from vinho import instrumentacao as instr
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+LIMITE_DISCO_MB = float(os.environ.get("VINHO_CACHE_LIMITE_MB", "512"))
+# a poda deixa o diretório nesta fração do limite, para não rodar a cada gravação
+FRACAO_APOS_PODA = 0.8
+# temporários mais antigos que isso são de gravações interrompidas
+IDADE_TEMPORARIO_S = 60
+
+
+class Backend(Protocol):
+    def ler(self, chave: str) -> bytes | None: ...
+    def gravar(self, chave: str, valor: bytes) -> None: ...
+    def limpar(self) -> None: ...
+
+
+class Local:
+    """Nada compartilhado: cada processo fica só com a própria memória."""
+
+    def ler(self, chave: str) -> bytes | None:
+        return None
+
+    def gravar(self, chave: str, valor: bytes) -> None:
+        pass
+
+    def limpar(self) -> None:
+        pass
+
+
+class Disco:
+    """Um arquivo por chave (nome = sha1 da chave) em ``diretorio``.
+
+    Ler um arquivo atualiza seu mtime; quando o total passa de
+    ``limite_bytes``, os de mtime mais antigo são apagados (LRU
+    aproximado, compartilhado por todos os processos).
+    """
+
+    def __init__(self, diretorio: Path, limite_bytes: int = int(LIMITE_DISCO_MB * 2**20)):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.limite_bytes = limite_bytes
+        # bytes gravados por este processo desde a última poda; None = nunca podou
+        self._desde_poda: int | None = None
+        self._trava = threading.Lock()
+
+    def _arquivo(self, chave: str) -> Path:
+        return self.diretorio / hashlib.sha1(chave.encode("utf-8")).hexdigest()
+
+    def ler(self, chave: str) -> bytes | None:
+        arquivo = self._arquivo(chave)
+        try:
+            valor = arquivo.read_bytes()
+            os.utime(arquivo)
+        except FileNotFoundError:
+            return None
+        return valor
+
+    def gravar(self, chave: str, valor: bytes) -> None:
+        arquivo = self._arquivo(chave)
+        # grava ao lado e troca: quem lê nunca vê um arquivo pela metade
+        temporario = arquivo.with_name(f"{arquivo.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporario.write_bytes(valor)
+        os.replace(temporario, arquivo)
+        with self._trava:
+            # o diretório só é percorrido depois de a folga da última poda se esgotar
+            folga = self.limite_bytes * (1 - FRACAO_APOS_PODA)
+            self._desde_poda = None if self._desde_poda is None else self._desde_poda + len(valor)
+            if self._desde_poda is not None and self._desde_poda < folga:
+                return
+            self._desde_poda = 0
+        self.podar()
+
+    def podar(self) -> int:
+        """Apaga os arquivos lidos há mais tempo até caber no limite; devolve quantos."""
+        agora = time.time()
+        arquivos = []
+        for entrada in os.scandir(self.diretorio):
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            if entrada.name.endswith(".tmp"):
+                if agora - info.st_mtime > IDADE_TEMPORARIO_S:
+                    Path(entrada.path).unlink(missing_ok=True)
+                continue
+            arquivos.append((info.st_mtime, info.st_size, entrada.path))
+        total = sum(tamanho for _, tamanho, _ in arquivos)
+        if total <= self.limite_bytes:
+            return 0
+        apagados = 0
+        alvo = self.limite_bytes * FRACAO_APOS_PODA
+        for _, tamanho, caminho in sorted(arquivos):
+            if total <= alvo:
+                break
+            Path(caminho).unlink(missing_ok=True)
+            total -= tamanho
+            apagados += 1
+        instr.contar("compartilhado.despejos", apagados)
+        return apagados
+
+    def limpar(self) -> None:
+        for arquivo in self.diretorio.iterdir():
+            arquivo.unlink(missing_ok=True)
+
+
+class Redis:
+    """Adaptador para um cliente do Redis (``redis.Redis`` ou compatível)."""
+
+    def __init__(self, cliente, prefixo: str = "vinho:"):
+        self.cliente = cliente
+        self.prefixo = prefixo
+
+    def ler(self, chave: str) -> bytes | None:
+        return self.cliente.get(self.prefixo + chave)
+
+    def gravar(self, chave: str, valor: bytes) -> None:
+        self.cliente.set(self.prefixo + chave, valor)
+
+    def limpar(self) -> None:
+        chaves = list(self.cliente.scan_iter(match=self.prefixo + "*"))
+        if chaves:
+            self.cliente.delete(*chaves)
+
+
+def de_url(url: str) -> Backend:
+    """Backend descrito por ``url`` (formato de ``VINHO_CACHE``)."""
+    if url in ("", "local"):
+        return Local()
+    if url.startswith("disco:"):
+        return Disco(Path(url[len("disco:"):]))
+    if url.startswith("redis://"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("VINHO_CACHE=redis://... requer o pacote redis") from None
+        return Redis(redis.Redis.from_url(url))
+    raise ValueError(f"VINHO_CACHE desconhecido: {url!r} (use local, disco:/caminho ou redis://...)")
+
+
+_backend: Backend | None = None
+_trava = threading.Lock()
+
+
+def backend() -> Backend:
+    """Backend do processo, criado a partir de ``VINHO_CACHE`` no primeiro uso."""
+    global _backend
+    with _trava:
+        if _backend is None:
+            _backend = de_url(os.environ.get("VINHO_CACHE", "local"))
+        return _backend
+
+
+def usar(novo: Backend) -> None:
+    """Troca o backend do processo (testes e benchmarks)."""
+    global _backend
+    with _trava:
+        _backend = novo
+
+
+def ativo() -> bool:
+    """Se há um backend compartilhado de fato (não ``local``)."""
+    return not isinstance(backend(), Local)
+
+
+def obter(chave: str) -> Any | None:
+    """Objeto guardado em ``chave`` por qualquer processo, ou None."""
+    if not ativo():
+        return None
+    bruto = backend().ler(chave)
+    if bruto is None:
+        instr.contar("compartilhado.falhas")
+        return None
+    instr.contar("compartilhado.acertos")
+    return pickle.loads(bruto)
+
+
+def guardar(chave: str, valor: Any) -> None:
+    if ativo():
+        backend().gravar(chave, pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+@contextlib.contextmanager
+def exclusivo(arquivo: Path) -> Iterator[None]:
+    """Trava de arquivo entre processos (sem efeito onde não há ``fcntl``)."""
+    if fcntl is None:
+        yield
+        return
+    arquivo = Path(arquivo)
+    arquivo.parent.mkdir(parents=True, exist_ok=True)
+    with open(arquivo, "a+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
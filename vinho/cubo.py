@@ -0,0 +1,344 @@
+"""Cubo pré-agregado fluxo × país × ano, guardado em formato esparso.
+
+Os dois CSVs de ``dados/`` são convertidos, numa etapa de build, em células
+(fluxo, país, ano) com suas somas, em coordenadas (COO): só as células com
+algum comércio são guardadas, e a grade densa país × ano, quase toda zerada,
+nunca é materializada inteira. Os arrays vão como ``.npy`` para
+``dados/cubo/``. As células ficam ordenadas por (fluxo, ano, país), com o
+início de cada (fluxo, ano) em ``limites``: as células de uma janela de anos
+são uma fatia contígua. Os gráficos são respondidos com ``np.bincount`` sobre
+essa fatia; só ``por_ano_pais`` densifica, e apenas o bloco pedido, porque as
+linhas dos gráficos precisam dos zeros explícitos. Totais e rankings por
+país vêm de ``Acumulado`` (somas acumuladas ao longo dos anos), que responde
+qualquer janela com duas colunas e o top N com seleção parcial.
+
+Para gerar (ou atualizar) o cubo::
+
+    python -m vinho.cubo
+
+Se o cubo gravado não corresponder à versão atual dos CSVs, ``carregar()``
+o reconstrói em memória, então o painel continua correto mesmo sem o build.
+Os arrays gravados são mapeados em memória (somente leitura), compartilhando
+páginas entre processos, e regravados sem tocar nos mapeamentos existentes,
+como no formato binário de ``vinho/binario.py``.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from vinho import binario, compartilhado, dados
+from vinho import paises as dim_paises
+
+FLUXOS = ("exportacao", "importacao")
+MEDIDAS = ("quantidade_kg", "quantidade_dolar")
+
+DIRETORIO_CUBO = dados.DIRETORIO_DADOS / "cubo"
+# versão do layout gravado; cubos de outro formato são reconstruídos
+FORMATO = 3
+_ARRAYS = ("anos", "paises", "continentes", "fluxo", "pais", "ano", "kg", "dolar", "limites")
+
+
+@dataclass(frozen=True)
+class Cubo:
+    """Medidas por fluxo, país e ano, em células esparsas.
+
+    ``anos`` (crescentes) e ``paises`` (alfabéticos) são os eixos; cada célula
+    ``i`` guarda posições ``fluxo[i]``, ``pais[i]``, ``ano[i]`` nesses eixos e
+    as somas ``kg[i]``, ``dolar[i]``. Células ausentes valem zero; valores
+    ausentes nos CSVs contam como zero (como no ``groupby().sum()``). As
+    células do fluxo ``f`` no ano de posição ``a`` são
+    ``limites[f * len(anos) + a]:limites[f * len(anos) + a + 1]``.
+    """
+
+    anos: np.ndarray
+    paises: np.ndarray
+    continentes: np.ndarray
+    fluxo: np.ndarray
+    pais: np.ndarray
+    ano: np.ndarray
+    kg: np.ndarray
+    dolar: np.ndarray
+    limites: np.ndarray
+    versao: str
+
+    def _fluxo(self, fluxo: str) -> int:
+        try:
+            return FLUXOS.index(fluxo)
+        except ValueError:
+            raise ValueError(f"fluxo desconhecido: {fluxo!r} (use um de {FLUXOS})") from None
+
+    def _valores(self, medida: str) -> np.ndarray:
+        if medida == "quantidade_kg":
+            return self.kg
+        if medida == "quantidade_dolar":
+            return self.dolar
+        raise ValueError(f"medida desconhecida: {medida!r} (use um de {MEDIDAS})")
+
+    def _janela(self, anos) -> np.ndarray:
+        """Posições, no eixo de anos, dos anos pedidos."""
+        return np.flatnonzero(np.isin(self.anos, np.asarray(anos)))
+
+    def _celulas(self, fluxo: str, j: np.ndarray) -> slice | np.ndarray:
+        """Células do fluxo cujos anos estão nas posições ``j``.
+
+        Uma janela contígua vira uma fatia; anos salteados, a união das faixas.
+        """
+        base = self._fluxo(fluxo) * len(self.anos)
+        if len(j) == 0:
+            return slice(0, 0)
+        if j[-1] - j[0] + 1 == len(j):
+            return slice(int(self.limites[base + j[0]]), int(self.limites[base + j[-1] + 1]))
+        return np.concatenate([
+            np.arange(self.limites[base + a], self.limites[base + a + 1]) for a in j
+        ])
+
+    def _somar(self, celulas: np.ndarray, eixo: np.ndarray, n: int, medida: str) -> np.ndarray:
+        valores = self._valores(medida)
+        somas = np.bincount(eixo, weights=valores[celulas], minlength=n)
+        # bincount soma em float64; kg volta para inteiro
+        return somas.astype(valores.dtype) if valores.dtype.kind == "i" else somas
+
+    def anos_entre(self, janela: tuple[int, int]) -> list[int]:
+        """Anos do eixo dentro da janela ``(inicio, fim)``."""
+        i, j = np.searchsorted(self.anos, janela[0]), np.searchsorted(self.anos, janela[1], "right")
+        return [int(a) for a in self.anos[i:j]]
+
+    def por_ano(self, fluxo: str, anos) -> pd.DataFrame:
+        """Totais anuais do fluxo: colunas ``ano``, ``quantidade_kg``, ``quantidade_dolar``."""
+        j = self._janela(anos)
+        c = self._celulas(fluxo, j)
+        # posição do ano da célula dentro da janela
+        pos = np.searchsorted(j, self.ano[c])
+        return pd.DataFrame({
+            "ano": self.anos[j].astype("int64"),
+            "quantidade_kg": self._somar(c, pos, len(j), "quantidade_kg"),
+            "quantidade_dolar": self._somar(c, pos, len(j), "quantidade_dolar"),
+        })
+
+    def densificar(self, fluxo: str, anos, medida: str, paises=None) -> tuple[np.ndarray, np.ndarray]:
+        """Bloco denso ``(país, ano)`` da medida para os países pedidos (todos se None).
+
+        Devolve as posições dos países no eixo e o bloco; anos sem comércio
+        aparecem como zero.
+        """
+        j = self._janela(anos)
+        sel = np.arange(len(self.paises))
+        if paises is not None:
+            sel = sel[np.isin(self.paises, np.asarray(list(paises)))]
+        c = self._celulas(fluxo, j)
+        linha = np.full(len(self.paises), -1, dtype=np.int64)
+        linha[sel] = np.arange(len(sel))
+        linha = linha[self.pais[c]]
+        manter = linha >= 0
+        valores = self._valores(medida)
+        bloco = np.zeros((len(sel), len(j)), dtype=valores.dtype)
+        bloco[linha[manter], np.searchsorted(j, self.ano[c][manter])] = valores[c][manter]
+        return sel, bloco
+
+    def por_ano_pais(self, fluxo: str, anos, medida: str, paises=None) -> pd.DataFrame:
+        """Formato longo ``ano``, ``pais``, ``medida`` (ordenado por ano e país)."""
+        j = self._janela(anos)
+        sel, bloco = self.densificar(fluxo, anos, medida, paises)
+        return pd.DataFrame({
+            "ano": np.repeat(self.anos[j].astype("int64"), len(sel)),
+            "pais": np.tile(self.paises[sel], len(j)),
+            medida: bloco.T.ravel(),
+        })
+
+    def _por_pais(self, fluxo: str, anos, medida: str) -> np.ndarray:
+        c = self._celulas(fluxo, self._janela(anos))
+        return self._somar(c, self.pais[c], len(self.paises), medida)
+
+    def total_por_pais(self, fluxo: str, anos, medida: str) -> pd.Series:
+        """Total de cada país na janela, em ordem decrescente."""
+        totais = self._por_pais(fluxo, anos, medida)
+        serie = pd.Series(totais, index=pd.Index(self.paises, name="pais"), name=medida)
+        return serie.sort_values(ascending=False)
+
+    def por_continente(self, fluxo: str, anos) -> pd.DataFrame:
+        """Totais por continente na janela, ordenados pelo valor em US$.
+
+        Países sem nenhum comércio na janela (por exemplo os que só aparecem
+        no outro fluxo) não entram, para não criar continentes zerados.
+        """
+        df = pd.DataFrame({
+            "continente": self.continentes,
+            "quantidade_dolar": self._por_pais(fluxo, anos, "quantidade_dolar"),
+            "quantidade_kg": self._por_pais(fluxo, anos, "quantidade_kg"),
+        })
+        df = df[(df["quantidade_dolar"] != 0) | (df["quantidade_kg"] != 0)]
+        df = df.groupby("continente")[["quantidade_dolar", "quantidade_kg"]].sum().reset_index()
+        return df.sort_values(by="quantidade_dolar", ascending=False)
+
+
+@dataclass(frozen=True)
+class Acumulado:
+    """Somas acumuladas de cada país ao longo dos anos, por fluxo e medida.
+
+    ``somas[fluxo, medida]`` é uma matriz ``(país, len(anos) + 1)`` cuja
+    coluna ``a`` soma os anos de posição ``< a``: o total de todos os países
+    numa janela contígua é a diferença de duas colunas, sem percorrer as
+    células. As matrizes são densas, mas só país × ano (sem as linhas dos
+    CSVs), e são montadas uma vez por versão dos dados.
+    """
+
+    anos: np.ndarray
+    paises: np.ndarray
+    somas: dict[tuple[str, str], np.ndarray]
+
+    def totais(self, fluxo: str, janela: tuple[int, int], medida: str) -> np.ndarray:
+        """Total de cada país (na ordem do eixo) na janela ``(inicio, fim)``."""
+        try:
+            somas = self.somas[fluxo, medida]
+        except KeyError:
+            raise ValueError(f"fluxo ou medida desconhecidos: {fluxo!r}, {medida!r}") from None
+        i = np.searchsorted(self.anos, janela[0])
+        j = np.searchsorted(self.anos, janela[1], "right")
+        return somas[:, max(j, i)] - somas[:, i]
+
+    def top(self, fluxo: str, janela: tuple[int, int], medida: str, n: int) -> pd.Series:
+        """Os ``n`` países de maior total na janela, em ordem decrescente.
+
+        Seleção parcial (``np.partition``) em vez de ordenar todos os países;
+        empates ficam em ordem alfabética. Países sem comércio na janela
+        (total zero) não entram: numa janela sem dados o resultado é vazio.
+        """
+        todos = self.totais(fluxo, janela, medida)
+        candidatos = np.flatnonzero(todos != 0)
+        totais = todos[candidatos]
+        n = max(0, min(n, len(totais)))
+        if 0 < n < len(totais):
+            corte = np.partition(totais, len(totais) - n)[len(totais) - n]
+            acima = np.flatnonzero(totais > corte)
+            escolhidos = np.concatenate([acima, np.flatnonzero(totais == corte)[:n - len(acima)]])
+        else:
+            escolhidos = np.arange(n)
+        escolhidos = escolhidos[np.lexsort((escolhidos, -totais[escolhidos]))]
+        return pd.Series(totais[escolhidos], index=pd.Index(self.paises[candidatos[escolhidos]], name="pais"),
+                         name=medida)
+
+
+def acumular(cubo: Cubo) -> Acumulado:
+    """Índice de somas acumuladas por país a partir das células do cubo."""
+    A = len(cubo.anos)
+    somas = {}
+    for f, fluxo in enumerate(FLUXOS):
+        c = slice(int(cubo.limites[f * A]), int(cubo.limites[(f + 1) * A]))
+        for medida in MEDIDAS:
+            valores = cubo._valores(medida)
+            grade = np.zeros((len(cubo.paises), A + 1), dtype=valores.dtype)
+            # uma célula por (país, ano): a coluna a + 1 recebe o ano a
+            grade[cubo.pais[c], cubo.ano[c].astype(np.int64) + 1] = valores[c]
+            somas[fluxo, medida] = np.cumsum(grade, axis=1, out=grade)
+    return Acumulado(anos=np.asarray(cubo.anos), paises=np.asarray(cubo.paises), somas=somas)
+
+
+def construir(export: pd.DataFrame, imp: pd.DataFrame, versao: str) -> Cubo:
+    """Monta o cubo a partir dos DataFrames no formato dos CSVs."""
+    brutos = dict(zip(FLUXOS, (export, imp)))
+    anos = np.unique(np.concatenate([df["ano"].to_numpy() for df in brutos.values()]))
+    # o eixo de países vem das categorias: um país cujas linhas foram todas
+    # podadas (sem comércio) continua no eixo, com zeros
+    paises = np.unique(np.concatenate([
+        np.asarray(pd.Categorical(df["pais"]).categories, dtype=str) for df in brutos.values()
+    ]))
+    chaves, kg, dolar = [], [], []
+    for f, df in enumerate(brutos.values()):
+        p = np.searchsorted(paises, df["pais"].to_numpy(dtype=str))
+        a = np.searchsorted(anos, df["ano"].to_numpy())
+        chaves.append((f * len(anos) + a) * len(paises) + p)
+        kg.append(df["quantidade_kg"].to_numpy(dtype="int64"))
+        dolar.append(df["quantidade_dolar"].to_numpy(dtype="float64", na_value=0.0))
+    # soma as linhas repetidas de cada célula, já em ordem (fluxo, ano, país)
+    celulas, inverso = np.unique(np.concatenate(chaves), return_inverse=True)
+    soma_kg = np.zeros(len(celulas), dtype="int64")
+    np.add.at(soma_kg, inverso, np.concatenate(kg))
+    soma_dolar = np.bincount(inverso, weights=np.concatenate(dolar), minlength=len(celulas))
+    vivas = (soma_kg != 0) | (soma_dolar != 0)
+    celulas = celulas[vivas]
+    fluxo_ano, pais = np.divmod(celulas, len(paises))
+    fluxo, ano = np.divmod(fluxo_ano, len(anos))
+    # início das células de cada (fluxo, ano), mais o fim da última faixa
+    limites = np.searchsorted(fluxo_ano, np.arange(len(FLUXOS) * len(anos) + 1))
+    continentes = dim_paises.continente(paises).astype(str)
+    return Cubo(
+        anos=anos.astype("int16"), paises=paises, continentes=continentes,
+        fluxo=fluxo.astype("int8"), pais=pais.astype("int32"), ano=ano.astype("int16"),
+        kg=soma_kg[vivas], dolar=soma_dolar[vivas], limites=limites.astype("int64"),
+        versao=versao,
+    )
+
+
+def construir_dos_csvs(diretorio: Path | None = None) -> Cubo:
+    return construir(
+        dados.carregar("exportacao", diretorio),
+        dados.carregar("importacao", diretorio),
+        dados.versao(diretorio),
+    )
+
+
+def salvar(cubo: Cubo, destino: Path = DIRETORIO_CUBO) -> None:
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    binario.invalidar(destino)
+    for nome in _ARRAYS:
+        binario.gravar(destino / f"{nome}.npy", getattr(cubo, nome))
+    # meta.json por último: só um cubo completo é considerado válido
+    binario.gravar_meta(destino, {"versao": cubo.versao, "fluxos": list(FLUXOS), "formato": FORMATO})
+
+
+def ler(origem: Path = DIRETORIO_CUBO) -> Cubo | None:
+    """Cubo gravado em ``origem``, ou None se ele não existir."""
+    origem = Path(origem)
+    meta = binario.ler_meta(origem)
+    if meta is None or meta.get("formato") != FORMATO:
+        return None
+    try:
+        arrays = {nome: np.load(origem / f"{nome}.npy", mmap_mode="r") for nome in _ARRAYS}
+    except (FileNotFoundError, ValueError):
+        return None  # regravação em andamento
+    # meta.json mudou (ou sumiu) enquanto os arrays eram mapeados: mistura de versões
+    if binario.ler_meta(origem) != meta:
+        return None
+    return Cubo(versao=meta["versao"], **arrays)
+
+
+def carregar(diretorio: Path | None = None, origem: Path = DIRETORIO_CUBO) -> Cubo:
+    """Cubo da versão atual dos dados: o gravado, se estiver em dia, ou um novo.
+
+    Com cache compartilhado entre processos, o cubo novo é gravado (por um
+    processo só) e mapeado por todos.
+    """
+    versao = dados.versao(diretorio)
+    gravado = ler(origem)
+    if gravado is not None and gravado.versao == versao:
+        return gravado
+    if not compartilhado.ativo():
+        return construir_dos_csvs(diretorio)
+    with compartilhado.exclusivo(Path(origem).with_name("cubo.trava")):
+        gravado = ler(origem)
+        if gravado is None or gravado.versao != versao:
+            salvar(construir_dos_csvs(diretorio), origem)
+            gravado = ler(origem)
+    return gravado
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Gera o cubo pré-agregado a partir de dados/*.csv")
+    parser.add_argument("--dados", type=Path, default=None, help="diretório dos CSVs")
+    parser.add_argument("--saida", type=Path, default=DIRETORIO_CUBO, help="diretório do cubo")
+    args = parser.parse_args(argv)
+    cubo = construir_dos_csvs(args.dados)
+    salvar(cubo, args.saida)
+    grade = len(FLUXOS) * len(cubo.paises) * len(cubo.anos)
+    print(f"cubo {cubo.versao}: {len(cubo.kg)} células com comércio de {grade} "
+          f"({len(FLUXOS)} fluxos × {len(cubo.paises)} países × {len(cubo.anos)} anos) -> {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
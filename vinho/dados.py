@@ -0,0 +1,164 @@
+"""Camada de acesso aos arquivos de ``dados/``.
+
+Cada arquivo é lido uma única vez por processo e a mesma cópia é
+compartilhada entre todas as sessões do Streamlit. A cópia em memória é
+descartada quando a assinatura do arquivo (mtime + tamanho) muda, então uma
+atualização dos CSVs aparece no próximo rerun sem reiniciar o servidor.
+``versao()`` resume o conteúdo atual dos arquivos e serve de chave para os
+caches derivados.
+
+Quando existe uma conversão em dia no formato binário (``vinho/binario.py``),
+ela é mapeada em memória no lugar do CSV; em qualquer caso as colunas chegam
+com os tipos compactos de ``binario.compactar`` e só com as linhas que têm
+comércio (as ``0,0`` da grade país × ano são descartadas). O CSV é lido em
+blocos (``vinho/leitura.py``), com memória limitada qualquer que seja o
+tamanho do arquivo, e validado contra o esquema declarado: linhas rejeitadas
+e valores coagidos vão para o log. Com um cache compartilhado entre
+processos (``vinho.compartilhado``), uma conversão ausente ou vencida é
+gravada pelo primeiro processo e mapeada pelos demais.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, TypeVar
+
+import pandas as pd
+
+from vinho import binario, compartilhado, leitura
+from vinho import instrumentacao as instr
+
+logger = logging.getLogger(__name__)
+
+# VINHO_DADOS aponta o processo inteiro para outro diretório (benchmarks)
+DIRETORIO_DADOS = Path(
+    os.environ.get("VINHO_DADOS") or Path(__file__).resolve().parent.parent / "dados"
+)
+
+ARQUIVOS = {
+    "exportacao": "exportacao_vinho_ready.csv",
+    "importacao": "importacao_vinho_ready.csv",
+}
+
+# Dimensão de países (vinho/paises.py); entra na versão dos dados porque
+# muda o continente atribuído a cada linha.
+ARQUIVO_PAISES = DIRETORIO_DADOS / "paises.csv"
+
+T = TypeVar("T")
+
+# caminho -> (assinatura do arquivo, objeto carregado)
+_cache: dict[Path, tuple[tuple[int, int], object]] = {}
+# caminho -> (assinatura do arquivo, sha1 do conteúdo)
+_hashes: dict[Path, tuple[tuple[int, int], str]] = {}
+_trava = threading.RLock()
+
+
+def caminho(fluxo: str, diretorio: Path | None = None) -> Path:
+    """Caminho do arquivo de um fluxo ("exportacao" ou "importacao")."""
+    try:
+        nome = ARQUIVOS[fluxo]
+    except KeyError:
+        raise ValueError(
+            f"fluxo desconhecido: {fluxo!r} (use um de {sorted(ARQUIVOS)})"
+        ) from None
+    return Path(diretorio or DIRETORIO_DADOS) / nome
+
+
+def caminho_binario(fluxo: str, diretorio: Path | None = None) -> Path:
+    """Diretório da conversão binária de um fluxo."""
+    return caminho(fluxo, diretorio).parent / "bin" / fluxo
+
+
+def assinatura(arquivo: Path) -> tuple[int, int]:
+    """(mtime em ns, tamanho) do arquivo — muda sempre que ele é regravado."""
+    info = arquivo.stat()
+    return info.st_mtime_ns, info.st_size
+
+
+def carregar(fluxo: str, diretorio: Path | None = None) -> pd.DataFrame:
+    """DataFrame do fluxo, lido do disco só quando o arquivo mudou.
+
+    O objeto devolvido é compartilhado entre sessões: não o altere no lugar,
+    faça ``.copy()`` antes de acrescentar colunas.
+    """
+    arquivo = caminho(fluxo, diretorio)
+    return em_cache(arquivo, lambda: _ler(fluxo, arquivo, diretorio))
+
+
+def em_cache(arquivo: Path, ler: Callable[[], T]) -> T:
+    """Resultado de ``ler()`` para ``arquivo``, refeito só quando ele muda."""
+    atual = assinatura(arquivo)
+    # A leitura acontece dentro da trava para que vários usuários chegando
+    # juntos não disparem a mesma leitura em paralelo.
+    with _trava:
+        guardado = _cache.get(arquivo)
+        if guardado is None or guardado[0] != atual:
+            guardado = (atual, ler())
+            _cache[arquivo] = guardado
+    return guardado[1]
+
+
+def _ler(fluxo: str, arquivo: Path, diretorio: Path | None) -> pd.DataFrame:
+    destino, origem_sha1 = caminho_binario(fluxo, diretorio), hash_conteudo(arquivo)
+    with instr.etapa("leitura", fluxo):
+        df = binario.ler(destino, origem_sha1)
+        if df is None and compartilhado.ativo():
+            # vários processos: o primeiro converte, os demais mapeiam a conversão
+            with compartilhado.exclusivo(destino.with_name(f"{fluxo}.trava")):
+                df = binario.ler(destino, origem_sha1)
+                if df is None:
+                    binario.converter(_validado(arquivo), destino, origem_sha1)
+                    df = binario.ler(destino, origem_sha1)
+        if df is None:
+            df = _validado(arquivo)
+    return df
+
+
+def _validado(arquivo: Path) -> pd.DataFrame:
+    """CSV lido em blocos; rejeições e coerções vão para o log e os contadores."""
+    df, relatorio = leitura.ler_validado(arquivo)
+    rejeitadas, coagidos = sum(relatorio.rejeitadas.values()), sum(relatorio.coagidos.values())
+    instr.contar("leitura.rejeitadas", rejeitadas)
+    instr.contar("leitura.coagidos", coagidos)
+    if rejeitadas or coagidos or relatorio.aviso:
+        logger.warning("%s", relatorio.resumo())
+    return df
+
+
+def hash_conteudo(arquivo: Path) -> str:
+    """sha1 do conteúdo do arquivo, recalculado só quando a assinatura muda."""
+    atual = assinatura(arquivo)
+    with _trava:
+        guardado = _hashes.get(arquivo)
+    if guardado is None or guardado[0] != atual:
+        h = hashlib.sha1()
+        with open(arquivo, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloco)
+        guardado = (atual, h.hexdigest())
+        with _trava:
+            _hashes[arquivo] = guardado
+    return guardado[1]
+
+
+def versao(diretorio: Path | None = None) -> str:
+    """Identificador curto da versão atual do conjunto de arquivos.
+
+    Depende só do conteúdo, então é estável entre máquinas e pode ser gravado
+    junto de artefatos derivados (cubo, formatos binários) para validá-los.
+    """
+    h = hashlib.sha1()
+    for fluxo in sorted(ARQUIVOS):
+        h.update(f"{fluxo}:{hash_conteudo(caminho(fluxo, diretorio))};".encode())
+    h.update(f"paises:{hash_conteudo(ARQUIVO_PAISES)};".encode())
+    return h.hexdigest()[:12]
+
+
+def limpar_cache() -> None:
+    """Esquece todos os arquivos carregados (útil em testes e benchmarks)."""
+    with _trava:
+        _cache.clear()
+        _hashes.clear()
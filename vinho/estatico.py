@@ -0,0 +1,201 @@
+"""Exportação estática das páginas do painel (HTML + JSON do Plotly).
+
+Quase todo o conteúdo do painel é igual para qualquer visitante. Este build
+roda cada página de ``aplicativo.py`` pelo ``AppTest`` do Streamlit, no
+estado padrão (janela dos últimos 15 anos, widgets nos valores iniciais), e
+grava um HTML por página com as figuras embutidas como JSON do Plotly, a
+primeira página de cada tabela e o texto em markdown. O resultado pode ser
+servido por qualquer servidor de arquivos, sem Python::
+
+    python -m vinho.estatico
+    python -m http.server -d dados/estatico
+
+O build só refaz as páginas quando a versão dos dados (``dados.versao()``)
+ou o código do painel mudam (``--forcar`` refaz sempre). Widgets não são
+exportados: cada página aponta para a mesma página no painel interativo
+(``--painel-url``).
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import json
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+from vinho import dados
+
+RAIZ = Path(__file__).resolve().parent.parent
+APLICATIVO = RAIZ / "aplicativo.py"
+DIRETORIO_ESTATICO = dados.DIRETORIO_DADOS / "estatico"
+
+# página do painel -> arquivo (a primeira também vira index.html)
+PAGINAS = {
+    "Geral": "geral.html",
+    "Exportações": "exportacoes.html",
+    "Importações": "importacoes.html",
+    "Mercados futuros": "mercados-futuros.html",
+    "Sobre": "sobre.html",
+}
+
+# código que muda o que as páginas mostram
+FONTES = [APLICATIVO, *sorted((RAIZ / "vinho").glob("*.py"))]
+
+MARKED = "https://cdn.jsdelivr.net/npm/marked@12/marked.min.js"
+
+ESTILO = """
+body{font-family:"Source Sans Pro",sans-serif;margin:0;color:#31333f}
+nav{background:#f0f2f6;padding:.75rem 2rem;display:flex;gap:1.5rem;flex-wrap:wrap}
+nav a{color:#31333f;text-decoration:none}nav a.atual{font-weight:700}
+main{max-width:1200px;margin:0 auto;padding:1rem 2rem 3rem}
+.colunas{display:flex;gap:1.5rem}.colunas>div{flex:1;min-width:0}
+table{border-collapse:collapse;font-size:.85rem;width:100%}
+th,td{border-bottom:1px solid #e6e9ef;padding:.25rem .5rem;text-align:right}
+th:first-child,td:first-child{text-align:left}
+.legenda{color:#808495;font-size:.85rem}.aviso{background:#e8f0fe;padding:.75rem 1rem;border-radius:.5rem}
+footer{color:#808495;font-size:.8rem;margin-top:3rem}
+"""
+
+
+def assinatura() -> str:
+    """Versão dos dados + hash do código do painel."""
+    h = hashlib.sha1(dados.versao().encode())
+    for fonte in FONTES:
+        h.update(fonte.read_bytes())
+    return h.hexdigest()[:12]
+
+
+# -----------------------
+# Renderização
+# -----------------------
+def renderizar_pagina(pagina: str):
+    """Árvore de elementos da página, executada pelo ``AppTest``."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APLICATIVO), default_timeout=600)
+    at.query_params["pagina"] = pagina
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{pagina}: {at.exception[0].message}")
+    return at.main
+
+
+class _Html:
+    """Converte os elementos do ``AppTest`` em HTML."""
+
+    def __init__(self):
+        self.figuras = 0
+
+    def bloco(self, no) -> str:
+        filhos = list(getattr(no, "children", {}).values())
+        partes = [self.elemento(filho) for filho in filhos]
+        if filhos and all(filho.type == "column" for filho in filhos):
+            return '<div class="colunas">' + "".join(f"<div>{p}</div>" for p in partes) + "</div>"
+        return "".join(partes)
+
+    def elemento(self, no) -> str:
+        tipo = no.type
+        if tipo in ("flex_container", "column", "vertical", "horizontal"):
+            return self.bloco(no)
+        if tipo == "title":
+            return f"<h1>{html.escape(no.value)}</h1>"
+        if tipo == "header":
+            return f"<h2>{html.escape(no.value)}</h2>"
+        if tipo == "subheader":
+            return f"<h3>{html.escape(no.value)}</h3>"
+        if tipo == "markdown":
+            # convertido no navegador (marked), como faz o Streamlit
+            return f'<div class="md">{html.escape(no.value)}</div>'
+        if tipo == "caption":
+            return f'<p class="legenda">{html.escape(no.value)}</p>'
+        if tipo == "alert":
+            return f'<p class="aviso">{html.escape(no.proto.body)}</p>'
+        if tipo == "dataframe":
+            return no.value.to_html(index=False, na_rep="", border=0)
+        if tipo == "plotly_chart":
+            self.figuras += 1
+            figura = no.proto.spec.replace("</", "<\\/")
+            return (f'<div class="figura" id="figura-{self.figuras}"></div>'
+                    f'<script type="application/json" data-figura="figura-{self.figuras}">{figura}</script>')
+        # widgets (rádio, slider, entradas) e o menu não têm versão estática
+        return ""
+
+
+def documento(pagina: str, corpo: str, versao: str, painel_url: str) -> str:
+    from plotly.offline import get_plotlyjs_version
+
+    plotly_js = f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+    menu = "".join(
+        f'<a href="{arquivo}"{" class=atual" if nome == pagina else ""}>{html.escape(nome)}</a>'
+        for nome, arquivo in PAGINAS.items()
+    )
+    interativo = f"{painel_url.rstrip('/')}/?pagina={quote(pagina)}"
+    return f"""<!doctype html>
+<html lang="pt-BR"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(pagina)} · FIAP - Tech Challenge 1</title>
+<style>{ESTILO}</style>
+<script src="{plotly_js}"></script><script src="{MARKED}"></script>
+</head><body>
+<nav>{menu}</nav>
+<main>{corpo}
+<footer>Versão estática (dados {versao}) ·
+<a href="{html.escape(interativo, quote=True)}">abrir no painel interativo</a></footer>
+</main>
+<script>
+document.querySelectorAll(".md").forEach(function (el) {{
+  el.innerHTML = marked.parse(el.textContent);
+}});
+document.querySelectorAll("script[data-figura]").forEach(function (el) {{
+  var fig = JSON.parse(el.textContent);
+  Plotly.newPlot(el.dataset.figura, fig.data, fig.layout, {{responsive: true}});
+}});
+</script>
+</body></html>
+"""
+
+
+def _gravar(arquivo: Path, texto: str) -> None:
+    temporario = arquivo.with_name(arquivo.name + ".tmp")
+    temporario.write_text(texto, encoding="utf-8")
+    os.replace(temporario, arquivo)
+
+
+def exportar(destino: Path = DIRETORIO_ESTATICO, painel_url: str = "http://localhost:8501",
+             forcar: bool = False) -> bool:
+    """Grava as páginas em ``destino``; devolve False se já estavam em dia."""
+    destino = Path(destino)
+    atual = assinatura()
+    meta = destino / "estatico.json"
+    if not forcar and meta.exists():
+        if json.loads(meta.read_text(encoding="utf-8")).get("assinatura") == atual:
+            return False
+    destino.mkdir(parents=True, exist_ok=True)
+    versao = dados.versao()
+    for i, (pagina, arquivo) in enumerate(PAGINAS.items()):
+        texto = documento(pagina, _Html().bloco(renderizar_pagina(pagina)), versao, painel_url)
+        _gravar(destino / arquivo, texto)
+        if i == 0:
+            _gravar(destino / "index.html", texto)
+    # meta por último: só um conjunto completo é considerado em dia
+    _gravar(meta, json.dumps({"assinatura": atual, "versao": versao, "paginas": list(PAGINAS)}))
+    return True
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Exporta as páginas do painel para HTML estático")
+    parser.add_argument("--saida", type=Path, default=DIRETORIO_ESTATICO)
+    parser.add_argument("--painel-url", default="http://localhost:8501",
+                        help="endereço do painel interativo, para os links")
+    parser.add_argument("--forcar", action="store_true", help="refaz mesmo se estiver em dia")
+    args = parser.parse_args(argv)
+    if exportar(args.saida, args.painel_url, args.forcar):
+        print(f"{len(PAGINAS)} páginas -> {args.saida}")
+    else:
+        print(f"{args.saida} já está em dia com os dados ({dados.versao()})")
+
+
+if __name__ == "__main__":
+    main()
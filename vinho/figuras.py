@@ -0,0 +1,455 @@
+"""Figuras do painel, construídas uma vez e servidas de um cache de JSON.
+
+Cada gráfico é uma função registrada com ``@grafico("id")`` que recebe seus
+parâmetros (janela de análise, métrica, intervalo de anos...) e monta a
+figura a partir dos nós de ``vinho.agregacoes``. ``obter(id, **parametros)`` procura o JSON já
+serializado pela chave (versão dos dados, id, parâmetros) num LRU limitado a
+``VINHO_CACHE_FIGURAS`` entradas; numa falha, tenta o cache compartilhado
+entre processos (``vinho.compartilhado``) e só então monta a figura.
+Acertos e falhas ficam nos contadores de ``vinho.instrumentacao``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from vinho import amostragem, compartilhado, dados, previsao
+from vinho import instrumentacao as instr
+
+px = instr.tardio("plotly.express")
+go = instr.tardio("plotly.graph_objects")
+ag = instr.tardio("vinho.agregacoes")
+
+CAPACIDADE = int(os.environ.get("VINHO_CACHE_FIGURAS", "128"))
+
+_GRAFICOS: dict[str, Callable[..., object]] = {}
+
+# (versão, id, parâmetros) -> JSON da figura, do menos para o mais recente
+_lru: OrderedDict[tuple, str] = OrderedDict()
+_trava = threading.Lock()
+
+
+def grafico(identificador: str):
+    """Registra a função decorada como construtora do gráfico ``identificador``."""
+    def registrar(funcao):
+        _GRAFICOS[identificador] = funcao
+        return funcao
+    return registrar
+
+
+def graficos() -> list[str]:
+    return list(_GRAFICOS)
+
+
+def _chave(identificador: str, parametros: dict) -> tuple:
+    return (dados.versao(), identificador, tuple(sorted(parametros.items())))
+
+
+def json_figura(identificador: str, **parametros) -> str:
+    """JSON da figura, do cache quando possível."""
+    if identificador not in _GRAFICOS:
+        raise ValueError(f"gráfico desconhecido: {identificador!r}")
+    chave = _chave(identificador, parametros)
+    with _trava:
+        texto = _lru.get(chave)
+        if texto is not None:
+            _lru.move_to_end(chave)
+            instr.contar("figuras.acertos")
+            return texto
+    instr.contar("figuras.falhas")
+    # outro processo pode já ter montado a figura (vinho/compartilhado.py)
+    chave_compartilhada = f"figura/{chave!r}"
+    texto = compartilhado.obter(chave_compartilhada)
+    if texto is None:
+        with instr.etapa("figura", identificador):
+            texto = _GRAFICOS[identificador](**parametros).to_json()
+        compartilhado.guardar(chave_compartilhada, texto)
+    with _trava:
+        _lru[chave] = texto
+        _lru.move_to_end(chave)
+        while len(_lru) > CAPACIDADE:
+            _lru.popitem(last=False)
+            instr.contar("figuras.despejos")
+    return texto
+
+
+def obter(identificador: str, **parametros):
+    """``go.Figure`` pronta para ``st.plotly_chart``.
+
+    O JSON do cache já veio de uma figura validada, então a reconstrução pula
+    a validação do plotly (``_validate=False``), que custaria quase tanto
+    quanto montar a figura de novo.
+    """
+    texto = json_figura(identificador, **parametros)
+    instr.tamanho("figura", identificador, len(texto.encode("utf-8")))
+    return go.Figure(json.loads(texto), _validate=False)
+
+
+def estatisticas() -> dict:
+    with _trava:
+        tamanho = len(_lru)
+    contadores = instr.contadores()
+    return {
+        "tamanho": tamanho,
+        "capacidade": CAPACIDADE,
+        "acertos": contadores.get("figuras.acertos", 0),
+        "falhas": contadores.get("figuras.falhas", 0),
+        "despejos": contadores.get("figuras.despejos", 0),
+    }
+
+
+def limpar() -> None:
+    with _trava:
+        _lru.clear()
+
+
+def _periodo(janela, padrao: str) -> str:
+    """Período da janela para títulos: ``padrao`` na janela padrão, senão "2005–2012"."""
+    if janela is None or tuple(janela) == ag.obter('janela_padrao'):
+        return padrao
+    return str(janela[0]) if janela[0] == janela[1] else f"{janela[0]}–{janela[1]}"
+
+
+# -----------------------
+# Exportações
+# -----------------------
+# --- Evolução da Quantidade + Crescimento (%) (Plotly, 2 eixos) ---
+@grafico("exportacao_quantidade_crescimento")
+def _exportacao_quantidade_crescimento(janela=None):
+    df_ano_geral = amostragem.reduzir(ag.obter('df_ano_geral', janela), 'Ano', 'Quantidade')
+    Scatter = go.Scattergl if amostragem.webgl(len(df_ano_geral)) else go.Scatter
+    fig_q = go.Figure()
+    fig_q.add_trace(Scatter(
+        x=df_ano_geral['Ano'], y=df_ano_geral['Quantidade'],
+        mode='lines+markers', name='Quantidade (kg)'
+    ))
+    fig_q.add_trace(Scatter(
+        x=df_ano_geral['Ano'], y=df_ano_geral['Crescimento_%'],
+        mode='lines+markers', name='Crescimento (%)', yaxis='y2',
+        line=dict(dash='dash')
+    ))
+    fig_q.update_layout(
+        title='Evolução das Exportações (Quantidade) e Crescimento (%) ano a ano',
+        xaxis=dict(title='Ano', tickmode='linear'),
+        yaxis=dict(title='Quantidade (kg)'),
+        yaxis2=dict(title='Crescimento (%)', overlaying='y', side='right'),
+        template='plotly_white', height=480
+    )
+    return fig_q
+
+
+# --- Barras agrupadas: Valor x Quantidade ---
+@grafico("exportacao_valor_quantidade")
+def _exportacao_valor_quantidade(janela=None):
+    # janelas longas: barras somadas em baldes de anos
+    df_agg = amostragem.baldes_de_anos(ag.obter('df_agg', janela))
+    fig_export_most_amount = go.Figure(data=[
+        go.Bar(name='Valor (US$)',     x=df_agg['ano'], y=df_agg['quantidade_dolar']),
+        go.Bar(name='Quantidade (kg)', x=df_agg['ano'], y=df_agg['quantidade_kg'])
+    ])
+    fig_export_most_amount.update_layout(
+        barmode='group', xaxis_title='Ano', yaxis_title='Valores',
+        title='Exportações por Ano: Valor x Quantidade',
+        legend_title='Indicador',
+        xaxis=dict(type='category'),
+        template='plotly_white', height=500
+    )
+    return fig_export_most_amount
+
+
+# Top 5 países por VALOR acumulado
+@grafico("exportacao_top5_valor")
+def _exportacao_top5_valor(janela=None):
+    fig_top_valor = px.bar(
+        ag.obter('top_paises_valor_df', janela),
+        x='pais',
+        y='quantidade_dolar',
+        title='Top 5 Países que Mais Compraram Vinho Brasileiro (Total Acumulado)',
+        text='quantidade_dolar',
+        color='pais'
+    )
+
+    # formatação bonita: sem legenda repetida, rótulos fora e valores com separador
+    fig_top_valor.update_traces(
+        texttemplate='US$ %{text:,.0f}',  # 1.234.567
+        textposition='outside',
+        hovertemplate='%{x}<br>US$ %{y:,.0f}'
+    )
+    fig_top_valor.update_layout(
+        showlegend=False,
+        xaxis_tickangle=-45,
+        yaxis_title='Valor (US$)',
+        template='plotly_white',
+        height=450
+    )
+    return fig_top_valor
+
+
+# --- Linha: Top 5 países por valor ao longo do tempo ---
+@grafico("exportacao_top5_evolucao")
+def _exportacao_top5_evolucao(janela=None):
+    df_top_export = amostragem.reduzir(ag.obter('df_top_export', janela), 'ano', 'quantidade_dolar', 'pais')
+    fig = px.line(
+        df_top_export,
+        x="ano", y="quantidade_dolar", color="pais", markers=True,
+        render_mode=amostragem.modo_render(len(df_top_export)),
+        labels={"ano": "Ano", "quantidade_dolar": "Quantidade (dólar)", "pais": "País"},
+        title="Exportação de Vinho por País ao Longo do Tempo (Top 5)"
+    )
+    fig.update_layout(xaxis=dict(tickmode='linear'),
+                      legend_title="País", hovermode="x unified",
+                      template='plotly_white')
+    return fig
+
+
+# -----------------------
+# Importações
+# -----------------------
+@grafico("importacao_evolucao")
+def _importacao_evolucao(metrica="Quantidade (kg)", anos=None, janela=None):
+    y_col = "quantidade_kg" if metrica == "Quantidade (kg)" else "quantidade_dolar"
+    y_label = "Quantidade Total (kg)" if y_col == "quantidade_kg" else "Valor Total (US$)"
+
+    # ---- Dataframe para plot
+    df_plot = ag.obter('imp_grouped', janela)[['ano', y_col]].copy()
+    df_plot = df_plot[(df_plot[y_col].notna()) & (df_plot[y_col] > 0)]
+    df_plot = df_plot.sort_values('ano')
+    if anos is not None:
+        df_plot = df_plot.query('@anos[0] <= ano <= @anos[1]')
+    # nível de detalhe do intervalo pedido: estreitar o slider devolve todos os pontos
+    df_plot = amostragem.reduzir(df_plot, 'ano', y_col)
+
+    # ---- Gráfico
+    fig = px.line(
+        df_plot,
+        x='ano',
+        y=y_col,
+        markers=True,
+        render_mode=amostragem.modo_render(len(df_plot)),
+        title=f"Evolução da {metrica} de Vinho Importado no Brasil",
+        color_discrete_sequence=['royalblue']
+    )
+
+    fig.update_traces(
+        line=dict(width=3),
+        hovertemplate=(
+            "Ano: %{x}<br>" +
+            (f"{y_label.split(' (')[0]}: " + ("%{y:,.0f} kg" if y_col == "quantidade_kg" else "US$ %{y:,.0f}")) +
+            "<extra></extra>"
+        )
+    )
+
+    fig.update_layout(
+        title_font=dict(size=20, family='Arial', color='black'),
+        xaxis_title='Ano',
+        yaxis_title=y_label,
+        xaxis=dict(showgrid=True, gridcolor='lightgray', griddash='dot', tickmode='linear'),
+        yaxis=dict(showgrid=True, gridcolor='lightgray', griddash='dot',
+                tickformat=',.0f' if y_col == 'quantidade_kg' else '$,.0f'),
+        plot_bgcolor='white',
+        hovermode='x unified',
+        height=520,
+        margin=dict(l=40, r=20, t=60, b=40)
+    )
+
+    # Range slider/botões no próprio gráfico (além do slider Streamlit)
+    fig.update_layout(
+        xaxis=dict(
+            rangeslider=dict(visible=True),
+            rangeselector=dict(
+                buttons=list([
+                    dict(count=5, label='5a', step='year', stepmode='backward'),
+                    dict(count=10, label='10a', step='year', stepmode='backward'),
+                    dict(step='all', label='Tudo')
+                ])
+            )
+        )
+    )
+    return fig
+
+
+@grafico("importacao_top5_evolucao")
+def _importacao_top5_evolucao(anos=None, janela=None):
+    df_top_imp_valor = ag.obter('df_top_imp_valor', janela)
+    if anos is not None:
+        df_top_imp_valor = df_top_imp_valor.query('@anos[0] <= ano <= @anos[1]')
+    df_top_imp_valor = amostragem.reduzir(df_top_imp_valor, 'ano', 'quantidade_dolar', 'pais')
+
+    fig = px.line(
+        df_top_imp_valor,
+        x='ano', y='quantidade_dolar', color='pais',
+        markers=True,
+        render_mode=amostragem.modo_render(len(df_top_imp_valor)),
+        title='Importação de vinho: evolução por país (Top 5)',
+        labels={'quantidade_dolar': 'Valor Monetário', 'ano': 'Ano'}
+    )
+
+    # Personalizações (sem grid e fundo branco)
+    fig.update_traces(hovertemplate='ano: %{x}<br>quantidade_dolar: %{y:,.0f} kg<extra></extra>')
+    fig.update_xaxes(showgrid=False, dtick=1)
+    fig.update_yaxes(showgrid=False, tickformat=',.0f')
+    fig.update_layout(
+        legend_title_text='País',
+        plot_bgcolor='white',   # fundo do gráfico
+        paper_bgcolor='white',  # fundo externo
+        title_font=dict(size=20, family='Arial', color='black'),
+        hovermode='x unified',
+        height=520,
+        margin=dict(l=40, r=20, t=60, b=40)
+    )
+    return fig
+
+
+# --- Gráfico de barras
+@grafico("importacao_top5_quantidade")
+def _importacao_top5_quantidade(janela=None):
+    fig_bar = px.bar(
+        ag.obter('top_paises_imp_kg', janela),
+        x='pais',
+        y='quantidade_kg',
+        title='Top 5 Países Exportadores de Vinho para o Brasil (em Quantidade)',
+        text='quantidade_kg',
+        color='pais'
+    )
+
+    fig_bar.update_traces(
+        texttemplate='%{text:,.0f}',  # formata com separador de milhar
+        textposition='outside'
+    )
+
+    fig_bar.update_layout(
+        xaxis_tickangle=-45,
+        showlegend=False,
+        yaxis_title="Quantidade (kg)",
+        xaxis_title="País",
+        template="plotly_white",
+        height=500
+    )
+    return fig_bar
+
+
+# -----------------------
+# Mercados futuros
+# -----------------------
+@grafico("mercados_consolidado")
+def _mercados_consolidado(janela=None):
+    df_consolidado = ag.obter('df_consolidado', janela)
+    df_export = amostragem.reduzir(df_consolidado, 'ano', 'Total_Exportacao')
+    df_import = amostragem.reduzir(df_consolidado, 'ano', 'Total_Importacao')
+    Scatter = go.Scattergl if amostragem.webgl(len(df_export) + len(df_import)) else go.Scatter
+    fig = go.Figure()
+
+    # Exportação
+    fig.add_trace(Scatter(
+        x=df_export['ano'],
+        y=df_export['Total_Exportacao'],
+        mode='lines+markers',
+        name='Total Exportação (US$)',
+        line=dict(color='green', width=3),
+        marker=dict(size=7),
+        hovertemplate='Ano: %{x}<br>Exportação: US$ %{y:,.0f}<extra></extra>'
+    ))
+
+    # Importação
+    fig.add_trace(Scatter(
+        x=df_import['ano'],
+        y=df_import['Total_Importacao'],
+        mode='lines+markers',
+        name='Total Importação (US$)',
+        line=dict(color='red', width=3),
+        marker=dict(size=7),
+        hovertemplate='Ano: %{x}<br>Importação: US$ %{y:,.0f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=f'Comparação Anual de Exportação e Importação de Vinho ({_periodo(janela, "Últimos 15 anos")})',
+        xaxis_title='Ano',
+        yaxis_title='Valor Monetário (em Milhões de US$)',
+        template='plotly_white',
+        hovermode='x unified',
+        xaxis=dict(tickmode='linear'),
+        yaxis=dict(tickformat='$,.2s'),  # mostra em K/M/B
+        legend_title_text='Fluxo Comercial',
+        height=520,
+        margin=dict(l=40, r=20, t=60, b=40)
+    )
+    return fig
+
+
+@grafico("mercados_continentes")
+def _mercados_continentes(janela=None):
+    fig = px.bar(
+        ag.obter('df_agg_cont_15years', janela),
+        x="continente",
+        y="quantidade_dolar",
+        title=f"Exportações por Continente ({_periodo(janela, '15 anos')})",
+        labels={"continente": "Continente", "quantidade_dolar": "Valor Monetário Exportado"},
+        color="continente",
+        text="quantidade_dolar"
+    )
+
+    # Personalização extra
+    fig.update_traces(texttemplate='%{text:,.0f}', textposition='outside')  # formata números sem casas decimais
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        template='plotly_white',
+        showlegend=False
+    )
+    return fig
+
+
+@grafico("mercados_previsao")
+def _mercados_previsao(janela=None):
+    df_consolidado = ag.obter('df_consolidado', janela)
+    previsoes = ag.obter('previsao_consolidado', janela)
+    fig = go.Figure()
+    series = [
+        ('exportacao', 'Total_Exportacao', 'Exportação', 'green', 'rgba(0,128,0,0.15)'),
+        ('importacao', 'Total_Importacao', 'Importação', 'red', 'rgba(255,0,0,0.15)'),
+    ]
+    for fluxo, coluna, nome, cor, faixa in series:
+        historico = amostragem.reduzir(df_consolidado, 'ano', coluna)
+        fig.add_trace(go.Scatter(
+            x=historico['ano'], y=historico[coluna],
+            mode='lines+markers', name=f'{nome} (US$)',
+            line=dict(color=cor, width=3), marker=dict(size=7),
+            hovertemplate=f'Ano: %{{x}}<br>{nome}: US$ %{{y:,.0f}}<extra></extra>'
+        ))
+        df = previsoes[previsoes['fluxo'] == fluxo]
+        if df.empty:
+            continue
+        # faixa de confiança: limite superior, depois o inferior preenchendo até ele
+        fig.add_trace(go.Scatter(
+            x=df['ano'], y=df['superior'], mode='lines', line=dict(width=0),
+            showlegend=False, hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=df['ano'], y=df['inferior'], mode='lines', line=dict(width=0),
+            fill='tonexty', fillcolor=faixa,
+            name=f'{nome}: faixa de {previsao.NIVEL_CONFIANCA:.0%}', hoverinfo='skip'
+        ))
+        # a linha prevista parte do último ano observado
+        x = [*df_consolidado['ano'].tail(1), *df['ano']]
+        y = [*df_consolidado[coluna].tail(1), *df['previsao']]
+        fig.add_trace(go.Scatter(
+            x=x, y=y, mode='lines+markers', name=f'{nome} prevista (US$)',
+            line=dict(color=cor, width=2, dash='dash'), marker=dict(size=6, symbol='circle-open'),
+            hovertemplate=f'Ano: %{{x}}<br>{nome} prevista: US$ %{{y:,.0f}}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title=f'Previsão de Exportação e Importação de Vinho (próximos {previsao.HORIZONTE} anos; '
+              f'ajuste: {_periodo(janela, "últimos 15 anos")})',
+        xaxis_title='Ano',
+        yaxis_title='Valor Monetário (US$)',
+        template='plotly_white',
+        hovermode='x unified',
+        yaxis=dict(tickformat='$,.2s'),
+        legend_title_text='Fluxo Comercial',
+        height=520,
+        margin=dict(l=40, r=20, t=60, b=40)
+    )
+    return fig
@@ -0,0 +1,148 @@
+"""Servidor HTTP local que imita os downloads do Vitibrasil.
+
+Serve os arquivos de um diretório com ``ETag`` e ``Last-Modified`` e responde
+``304 Not Modified`` às requisições condicionais, como a fonte real. Serve
+para exercitar ``vinho.ingestao`` sem rede::
+
+    python -m vinho.fonte_local /tmp/vitibrasil --gerar-de dados --ate 2022
+    python -m vinho.fonte_local /tmp/vitibrasil --porta 8765
+    python -m vinho.ingestao --url-base http://127.0.0.1:8765/
+
+Também pode ser usado como gerenciador de contexto::
+
+    with ServidorLocal(diretorio) as servidor:
+        ingestao.atualizar("exportacao", url_base=servidor.url_base)
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+import pandas as pd
+
+
+def _manipulador(diretorio: Path):
+    class Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            nome = unquote(urlsplit(self.path).path).lstrip("/")
+            arquivo = (diretorio / nome).resolve()
+            if diretorio not in arquivo.parents or not arquivo.is_file():
+                self.send_error(404)
+                return
+            conteudo = arquivo.read_bytes()
+            etag = '"%s"' % hashlib.sha1(conteudo).hexdigest()
+            mtime = int(arquivo.stat().st_mtime)
+            if self._nao_modificado(etag, mtime):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv; charset=utf-8")
+            self.send_header("Content-Length", str(len(conteudo)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+            self.end_headers()
+            self.wfile.write(conteudo)
+
+        def _nao_modificado(self, etag: str, mtime: int) -> bool:
+            if "If-None-Match" in self.headers:
+                return etag in (t.strip() for t in self.headers["If-None-Match"].split(","))
+            desde = self.headers.get("If-Modified-Since")
+            if desde:
+                try:
+                    return mtime <= parsedate_to_datetime(desde).timestamp()
+                except (TypeError, ValueError):
+                    return False
+            return False
+
+        def log_message(self, formato, *args):
+            pass
+
+    return Manipulador
+
+
+class ServidorLocal:
+    """Servidor de arquivos em segundo plano (porta 0 = escolhida pelo sistema)."""
+
+    def __init__(self, diretorio: Path, porta: int = 0, host: str = "127.0.0.1"):
+        self.diretorio = Path(diretorio).resolve()
+        self._servidor = ThreadingHTTPServer((host, porta), _manipulador(self.diretorio))
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url_base(self) -> str:
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}/"
+
+    def __enter__(self) -> "ServidorLocal":
+        self._thread = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+def gerar_planilha(df: pd.DataFrame) -> str:
+    """Planilha no layout do Vitibrasil a partir do formato de ``dados/``.
+
+    Uma linha por país e, para cada ano, duas colunas com o mesmo rótulo:
+    quantidade (kg) e valor (US$), separadas por ponto e vírgula.
+    """
+    anos = sorted(int(a) for a in df["ano"].unique())
+    # min_count=1: US$ ausente continua célula vazia, não vira 0
+    largo = (
+        df.groupby(["pais", "ano"], observed=True)[["quantidade_kg", "quantidade_dolar"]]
+        .sum(min_count=1)
+        .unstack("ano")
+    )
+    linhas = [";".join(["Id", "País"] + [str(a) for a in anos for _ in (0, 1)])]
+    for i, pais in enumerate(largo.index, start=1):
+        celulas = [str(i), str(pais).replace("_", " ").title()]
+        for ano in anos:
+            for medida in ("quantidade_kg", "quantidade_dolar"):
+                valor = largo.at[pais, (medida, ano)]
+                celulas.append("" if pd.isna(valor) else str(int(valor)))
+        linhas.append(";".join(celulas))
+    return "\n".join(linhas) + "\n"
+
+
+def main(argv=None) -> None:
+    from vinho import dados, ingestao
+
+    parser = argparse.ArgumentParser(description="Servidor local no lugar do Vitibrasil")
+    parser.add_argument("diretorio", type=Path)
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--gerar-de", type=Path, default=None,
+                        help="gera as planilhas a partir dos CSVs deste diretório e sai")
+    parser.add_argument("--ate", type=int, default=None, help="último ano incluído ao gerar")
+    args = parser.parse_args(argv)
+
+    if args.gerar_de is not None:
+        args.diretorio.mkdir(parents=True, exist_ok=True)
+        for fluxo, url in ingestao.FONTES.items():
+            df = pd.read_csv(dados.caminho(fluxo, args.gerar_de))
+            if args.ate is not None:
+                df = df[df["ano"] <= args.ate]
+            destino = args.diretorio / url.rsplit("/", 1)[-1]
+            destino.write_text(gerar_planilha(df), encoding="utf-8")
+            print(f"{fluxo}: {destino}")
+        return
+
+    with ServidorLocal(args.diretorio, args.porta) as servidor:
+        print(f"servindo {servidor.diretorio} em {servidor.url_base} (Ctrl+C para sair)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Ingestão incremental dos dados de comércio do Vitibrasil (Embrapa).
+
+A fonte publica uma planilha por fluxo (um país por linha, duas colunas por
+ano: kg e US$). A cada execução:
+
+1. a planilha é pedida com ``If-None-Match``/``If-Modified-Since`` a partir
+   do ``ETag``/``Last-Modified`` guardados em ``dados/ingestao.json``; um
+   ``304`` encerra o fluxo sem baixar nada;
+2. se veio conteúdo novo, só as células de anos posteriores ao último ano
+   guardado, ou de países ainda ausentes, são acrescentadas ao fim do CSV de
+   ``dados/``. Linhas já existentes nunca são reescritas;
+3. os artefatos derivados que existirem em disco (formato binário e cubo)
+   são regenerados, e o painel percebe a nova versão no próximo rerun.
+
+Uso::
+
+    python -m vinho.ingestao
+    python -m vinho.ingestao --url-base http://127.0.0.1:8765/   # vinho.fonte_local
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import re
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+from vinho import dados
+
+FONTES = {
+    "exportacao": "http://vitibrasil.cnpuv.embrapa.br/download/ExpVinho.csv",
+    "importacao": "http://vitibrasil.cnpuv.embrapa.br/download/ImpVinhos.csv",
+}
+
+TEMPO_LIMITE_S = 60
+
+
+@dataclass
+class Resultado:
+    fluxo: str
+    status: str  # "inalterado" (304), "sem novidades" ou "atualizado"
+    linhas_novas: int = 0
+
+
+def slug(nome: str) -> str:
+    """Identificador usado em ``dados/``: "África do Sul" -> "africa_do_sul"."""
+    sem_acento = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", sem_acento.lower()).strip("_")
+
+
+def ler_planilha(texto: str) -> pd.DataFrame:
+    """Converte a planilha larga do Vitibrasil para o formato longo de ``dados/``."""
+    texto = texto.lstrip("\ufeff")
+    delimitador = csv.Sniffer().sniff(texto.split("\n", 1)[0], delimiters=";\t,").delimiter
+    bruto = pd.read_csv(io.StringIO(texto), sep=delimitador, dtype=str)
+    coluna_pais = next(c for c in bruto.columns if slug(c) == "pais")
+    # rótulos repetidos viram "1970" (kg) e "1970.1" (US$) no pandas
+    anos = [c for c in bruto.columns if re.fullmatch(r"\d{4}", c)]
+    paises = bruto[coluna_pais].map(slug)
+    partes = []
+    for ano in anos:
+        partes.append(pd.DataFrame({
+            "pais": paises,
+            "ano": int(ano),
+            "quantidade_kg": pd.to_numeric(bruto[ano], errors="coerce"),
+            "quantidade_dolar": pd.to_numeric(bruto.get(f"{ano}.1", pd.NA), errors="coerce"),
+        }))
+    longo = pd.concat(partes, ignore_index=True)
+    longo = longo[longo["pais"] != ""]
+    longo["quantidade_kg"] = longo["quantidade_kg"].fillna(0).astype("int64")
+    longo["quantidade_dolar"] = longo["quantidade_dolar"].astype("Int64")
+    return longo.sort_values(["ano", "pais"], ignore_index=True)
+
+
+def novas_linhas(existente: pd.DataFrame, baixado: pd.DataFrame) -> pd.DataFrame:
+    """Linhas de ``baixado`` de anos posteriores ou de países ainda ausentes."""
+    if existente.empty:
+        return baixado
+    ultimo_ano = int(existente["ano"].max())
+    conhecidos = set(existente["pais"].astype(str))
+    novas = (baixado["ano"] > ultimo_ano) | ~baixado["pais"].isin(conhecidos)
+    return baixado[novas]
+
+
+def baixar(url: str, anterior: dict, sessao: requests.Session) -> tuple[str | None, dict]:
+    """Conteúdo da planilha (ou None se não mudou) e os novos validadores."""
+    cabecalhos = {}
+    if anterior.get("etag"):
+        cabecalhos["If-None-Match"] = anterior["etag"]
+    if anterior.get("last_modified"):
+        cabecalhos["If-Modified-Since"] = anterior["last_modified"]
+    resposta = sessao.get(url, headers=cabecalhos, timeout=TEMPO_LIMITE_S)
+    if resposta.status_code == 304:
+        return None, anterior
+    resposta.raise_for_status()
+    validadores = {
+        "etag": resposta.headers.get("ETag"),
+        "last_modified": resposta.headers.get("Last-Modified"),
+    }
+    resposta.encoding = resposta.encoding or "utf-8"
+    return resposta.text, validadores
+
+
+def _caminho_estado(diretorio: Path | None) -> Path:
+    return Path(diretorio or dados.DIRETORIO_DADOS) / "ingestao.json"
+
+
+def _ler_estado(diretorio: Path | None) -> dict:
+    try:
+        return json.loads(_caminho_estado(diretorio).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def _gravar_estado(estado: dict, diretorio: Path | None) -> None:
+    _caminho_estado(diretorio).write_text(json.dumps(estado, indent=2), encoding="utf-8")
+
+
+def atualizar(
+    fluxo: str,
+    url_base: str | None = None,
+    sessao: requests.Session | None = None,
+    diretorio: Path | None = None,
+) -> Resultado:
+    """Busca a planilha de um fluxo e acrescenta o que for novo ao CSV."""
+    url = FONTES[fluxo]
+    if url_base is not None:
+        url = url_base.rstrip("/") + "/" + url.rsplit("/", 1)[-1]
+    estado = _ler_estado(diretorio)
+    texto, validadores = baixar(url, estado.get(fluxo, {}), sessao or requests.Session())
+    if texto is None:
+        return Resultado(fluxo, "inalterado")
+
+    arquivo = dados.caminho(fluxo, diretorio)
+    novas = novas_linhas(pd.read_csv(arquivo, sep=","), ler_planilha(texto))
+    if len(novas):
+        with open(arquivo, "a", encoding="utf-8", newline="") as f:
+            novas.to_csv(f, header=False, index=False, na_rep="nan")
+    # o estado só avança depois que o CSV foi gravado
+    estado[fluxo] = validadores
+    _gravar_estado(estado, diretorio)
+    return Resultado(fluxo, "atualizado" if len(novas) else "sem novidades", len(novas))
+
+
+def atualizar_derivados(diretorio: Path | None = None) -> None:
+    """Regenera o formato binário e o cubo que já existirem em disco.
+
+    Usa as mesmas travas de ``dados.carregar`` e ``cubo.carregar``: um
+    processo do painel não converte ao mesmo tempo que a ingestão.
+    """
+    from vinho import binario, compartilhado, cubo, leitura
+
+    for fluxo in dados.ARQUIVOS:
+        destino = dados.caminho_binario(fluxo, diretorio)
+        if destino.exists():
+            arquivo = dados.caminho(fluxo, diretorio)
+            df = leitura.ler(arquivo)
+            with compartilhado.exclusivo(destino.with_name(f"{fluxo}.trava")):
+                binario.converter(df, destino, dados.hash_conteudo(arquivo))
+    if diretorio is None and cubo.DIRETORIO_CUBO.exists():
+        with compartilhado.exclusivo(cubo.DIRETORIO_CUBO.with_name("cubo.trava")):
+            cubo.salvar(cubo.construir_dos_csvs())
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Atualiza dados/ a partir do Vitibrasil")
+    parser.add_argument("--fluxo", choices=sorted(FONTES), action="append",
+                        help="fluxo a atualizar (padrão: todos)")
+    parser.add_argument("--url-base", default=None,
+                        help="servidor alternativo com os mesmos nomes de arquivo")
+    parser.add_argument("--dados", type=Path, default=None, help="diretório dos CSVs")
+    args = parser.parse_args(argv)
+
+    sessao = requests.Session()
+    resultados = [
+        atualizar(fluxo, args.url_base, sessao, args.dados)
+        for fluxo in (args.fluxo or sorted(FONTES))
+    ]
+    for r in resultados:
+        print(f"{r.fluxo}: {r.status} ({r.linhas_novas} linhas novas)")
+    if any(r.linhas_novas for r in resultados):
+        atualizar_derivados(args.dados)
+
+
+if __name__ == "__main__":
+    main()
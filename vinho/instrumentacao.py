@@ -0,0 +1,322 @@
+"""Medições do painel: início a frio e etapas de cada rerun.
+
+O ``aplicativo.py`` importa este módulo antes de qualquer outro, importa as
+bibliotecas pesadas por ``importar()``/``tardio()`` (que cronometram a
+primeira importação de cada uma) e chama ``marcar_primeira_pintura()`` logo
+após o primeiro elemento desenhado. ``relatorio_inicio()`` junta esses
+números e os compara com o orçamento de início a frio
+(``VINHO_ORCAMENTO_INICIO``, em segundos).
+
+No modo instrumentado (``VINHO_INSTRUMENTAR=1`` para o processo inteiro ou
+``?instrumentar=1`` para uma sessão) cada etapa de um rerun é cronometrada
+com ``etapa(tipo, nome)``: importações, leituras de CSV, nós de agregação,
+montagem de figuras e ``st.plotly_chart``; ``tamanho()`` registra o tamanho
+do JSON de cada figura. ``concluir_rerun()`` devolve as etapas do rerun (o
+painel de depuração do aplicativo as mostra) e as registra em log JSON;
+os totais do processo saem em formato de texto do Prometheus por
+``texto_prometheus()``, servido em ``/metricas`` pela API
+(``vinho.api``) ou, no processo do Streamlit, por ``servir_metricas()``
+(porta em ``VINHO_METRICAS_PORTA``).
+
+Para medir um início a frio em um interpretador novo::
+
+    python -m vinho.instrumentacao --pagina "Exportações"
+"""
+from __future__ import annotations
+
+import argparse
+import contextvars
+import importlib
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+
+logger = logging.getLogger(__name__)
+
+_T0 = time.perf_counter()
+
+ORCAMENTO_INICIO_S = float(os.environ.get("VINHO_ORCAMENTO_INICIO", "3.0"))
+
+# módulo -> segundos gastos na primeira importação feita por importar()
+TEMPOS_IMPORTACAO: dict[str, float] = {}
+_primeira_pintura: float | None = None
+
+# instrumentação de todos os reruns do processo, não só dos que pedirem
+ATIVO = os.environ.get("VINHO_INSTRUMENTAR", "") not in ("", "0")
+
+# contadores de eventos do processo (ex.: "figuras.acertos")
+_contadores: dict[str, int] = {}
+_trava_contadores = threading.Lock()
+
+
+def importar(nome: str) -> ModuleType:
+    """``importlib.import_module`` que registra quanto a importação custou."""
+    if nome in sys.modules:
+        return sys.modules[nome]
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(nome)
+    TEMPOS_IMPORTACAO[nome] = time.perf_counter() - inicio
+    registrar_etapa("importacao", nome, TEMPOS_IMPORTACAO[nome])
+    return modulo
+
+
+class ModuloTardio:
+    """Representa um módulo que só é importado no primeiro acesso a um atributo."""
+
+    def __init__(self, nome: str):
+        self._nome = nome
+        self._modulo: ModuleType | None = None
+
+    def __getattr__(self, atributo: str):
+        if self._modulo is None:
+            self._modulo = importar(self._nome)
+        return getattr(self._modulo, atributo)
+
+    def __repr__(self) -> str:
+        estado = "importado" if self._modulo is not None else "não importado"
+        return f"<ModuloTardio {self._nome!r} ({estado})>"
+
+
+def tardio(nome: str) -> ModuloTardio:
+    return ModuloTardio(nome)
+
+
+def contar(nome: str, n: int = 1) -> None:
+    with _trava_contadores:
+        _contadores[nome] = _contadores.get(nome, 0) + n
+
+
+def contadores() -> dict[str, int]:
+    with _trava_contadores:
+        return dict(_contadores)
+
+
+def marcar_primeira_pintura() -> None:
+    """Registra, uma vez por processo, o tempo até o primeiro elemento na tela."""
+    global _primeira_pintura
+    if _primeira_pintura is not None:
+        return
+    _primeira_pintura = time.perf_counter() - _T0
+    relatorio = relatorio_inicio()
+    if relatorio["dentro_do_orcamento"]:
+        logger.info("início do painel: %s", json.dumps(relatorio))
+    else:
+        logger.warning("início do painel acima do orçamento: %s", json.dumps(relatorio))
+
+
+def relatorio_inicio() -> dict:
+    """Tempos de importação e de primeira pintura deste processo."""
+    return {
+        "importacoes_s": {
+            nome: round(segundos, 4)
+            for nome, segundos in sorted(TEMPOS_IMPORTACAO.items(), key=lambda kv: -kv[1])
+        },
+        "primeira_pintura_s": None if _primeira_pintura is None else round(_primeira_pintura, 4),
+        "orcamento_s": ORCAMENTO_INICIO_S,
+        "dentro_do_orcamento": _primeira_pintura is None or _primeira_pintura <= ORCAMENTO_INICIO_S,
+        "contadores": contadores(),
+    }
+
+
+# -----------------------
+# Etapas de cada rerun
+# -----------------------
+# etapas do rerun em curso (None = rerun não instrumentado)
+_rerun: contextvars.ContextVar[list | None] = contextvars.ContextVar("vinho_rerun", default=None)
+_inicio_rerun: contextvars.ContextVar[float] = contextvars.ContextVar("vinho_inicio_rerun", default=0.0)
+
+# (tipo, nome) -> [quantidade, segundos] e (tipo, nome) -> bytes, do processo
+_etapas: dict[tuple[str, str], list] = {}
+_tamanhos: dict[tuple[str, str], int] = {}
+_trava_etapas = threading.Lock()
+
+
+def instrumentando() -> bool:
+    return ATIVO or _rerun.get() is not None
+
+
+def iniciar_rerun(instrumentar: bool = False) -> None:
+    """Começa a registrar as etapas do rerun atual (se ``instrumentar`` ou ``ATIVO``)."""
+    _rerun.set([] if instrumentar or ATIVO else None)
+    _inicio_rerun.set(time.perf_counter())
+
+
+def concluir_rerun(pagina: str = "") -> list[dict] | None:
+    """Etapas registradas desde ``iniciar_rerun()``, com o total em ``tipo="rerun"``."""
+    etapas = _rerun.get()
+    if etapas is None:
+        return None
+    registrar_etapa("rerun", pagina, time.perf_counter() - _inicio_rerun.get())
+    _rerun.set(None)
+    logger.info("rerun: %s", json.dumps(etapas, ensure_ascii=False))
+    return etapas
+
+
+def registrar_etapa(tipo: str, nome: str, segundos: float) -> None:
+    if not instrumentando():
+        return
+    with _trava_etapas:
+        total = _etapas.setdefault((tipo, nome), [0, 0.0])
+        total[0] += 1
+        total[1] += segundos
+    etapas = _rerun.get()
+    if etapas is not None:
+        etapas.append({"tipo": tipo, "nome": nome, "ms": round(segundos * 1000, 3)})
+
+
+@contextmanager
+def etapa(tipo: str, nome: str):
+    """Cronometra o bloco como uma etapa do rerun (sem custo fora do modo instrumentado)."""
+    if not instrumentando():
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_etapa(tipo, nome, time.perf_counter() - inicio)
+
+
+def tamanho(tipo: str, nome: str, n_bytes: int) -> None:
+    """Registra o tamanho de um conteúdo enviado ao navegador (ex.: JSON de figura)."""
+    if not instrumentando():
+        return
+    with _trava_etapas:
+        _tamanhos[(tipo, nome)] = n_bytes
+    etapas = _rerun.get()
+    if etapas is not None:
+        etapas.append({"tipo": tipo, "nome": nome, "bytes": n_bytes})
+
+
+def _rotulo(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def texto_prometheus() -> str:
+    """Totais do processo no formato de texto de exposição do Prometheus."""
+    with _trava_etapas:
+        etapas = sorted(_etapas.items())
+        tamanhos = sorted(_tamanhos.items())
+    linhas = [
+        "# HELP vinho_etapa_segundos Tempo gasto por etapa dos reruns.",
+        "# TYPE vinho_etapa_segundos summary",
+    ]
+    for (tipo, nome), (quantidade, segundos) in etapas:
+        rotulos = f'tipo="{_rotulo(tipo)}",nome="{_rotulo(nome)}"'
+        linhas.append(f"vinho_etapa_segundos_sum{{{rotulos}}} {segundos:.6f}")
+        linhas.append(f"vinho_etapa_segundos_count{{{rotulos}}} {quantidade}")
+    linhas += [
+        "# HELP vinho_conteudo_bytes Tamanho do último conteúdo enviado ao navegador.",
+        "# TYPE vinho_conteudo_bytes gauge",
+    ]
+    for (tipo, nome), n_bytes in tamanhos:
+        linhas.append(f'vinho_conteudo_bytes{{tipo="{_rotulo(tipo)}",nome="{_rotulo(nome)}"}} {n_bytes}')
+    linhas += [
+        "# HELP vinho_eventos_total Contadores de eventos do processo.",
+        "# TYPE vinho_eventos_total counter",
+    ]
+    for nome, valor in sorted(contadores().items()):
+        linhas.append(f'vinho_eventos_total{{nome="{_rotulo(nome)}"}} {valor}')
+    if _primeira_pintura is not None:
+        linhas += [
+            "# HELP vinho_primeira_pintura_segundos Tempo do início do processo até a primeira pintura.",
+            "# TYPE vinho_primeira_pintura_segundos gauge",
+            f"vinho_primeira_pintura_segundos {_primeira_pintura:.6f}",
+        ]
+    return "\n".join(linhas) + "\n"
+
+
+PORTA_METRICAS = int(os.environ.get("VINHO_METRICAS_PORTA") or 0)
+_servidor_metricas = None
+
+
+def servir_metricas(porta: int, host: str = "127.0.0.1"):
+    """Serve ``texto_prometheus()`` em ``/metricas`` numa thread (uma vez por processo)."""
+    global _servidor_metricas
+    # importado aqui para não pesar no início do painel
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    with _trava_etapas:
+        if _servidor_metricas is not None:
+            return _servidor_metricas
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metricas":
+                    self.send_error(404)
+                    return
+                corpo = texto_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        _servidor_metricas = ThreadingHTTPServer((host, porta), Manipulador)
+        threading.Thread(target=_servidor_metricas.serve_forever, daemon=True).start()
+        return _servidor_metricas
+
+
+# -----------------------
+# Medição de início a frio (linha de comando)
+# -----------------------
+_APLICATIVO = Path(__file__).resolve().parent.parent / "aplicativo.py"
+
+_SCRIPT_FILHO = """
+import json, sys
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.query_params["pagina"] = sys.argv[2]
+at.run()
+from vinho import instrumentacao
+print(json.dumps(instrumentacao.relatorio_inicio()))
+"""
+
+_LINHA_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def medir_inicio(pagina: str, top: int = 15) -> dict:
+    """Roda o painel num interpretador novo e devolve o relatório de início.
+
+    Além dos tempos registrados pelo próprio painel, inclui os módulos de
+    maior custo cumulativo segundo ``python -X importtime``.
+    """
+    processo = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SCRIPT_FILHO, str(_APLICATIVO), pagina],
+        capture_output=True, text=True, check=True, cwd=_APLICATIVO.parent,
+    )
+    relatorio = json.loads(processo.stdout.strip().splitlines()[-1])
+    cumulativos = []
+    for linha in processo.stderr.splitlines():
+        m = _LINHA_IMPORTTIME.match(linha)
+        if m and len(m.group(3)) == 1:  # só importações de primeiro nível
+            cumulativos.append((m.group(4), int(m.group(2)) / 1e6))
+    cumulativos.sort(key=lambda kv: -kv[1])
+    relatorio["pagina"] = pagina
+    relatorio["importtime_top_s"] = {nome: round(s, 4) for nome, s in cumulativos[:top]}
+    return relatorio
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mede o início a frio do painel")
+    parser.add_argument("--pagina", default="Geral")
+    parser.add_argument("--top", type=int, default=15, help="módulos listados do -X importtime")
+    args = parser.parse_args(argv)
+    relatorio = medir_inicio(args.pagina, args.top)
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    return 0 if relatorio["dentro_do_orcamento"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
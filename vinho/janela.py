@@ -0,0 +1,62 @@
+"""Janela de análise (intervalo de anos) e índice ano → faixa de linhas.
+
+A janela é um par ``(inicio, fim)`` de anos, inclusivo, escolhido pelo
+usuário; o padrão são os últimos ``ANOS_PADRAO`` anos dos dados. As tabelas
+de fluxo chegam ordenadas por ano (``binario.compactar``), então as linhas de
+cada ano formam uma faixa contígua: ``IndiceAnos`` guarda onde cada faixa
+começa e ``fatia(janela)`` acha as bordas por busca binária, sem percorrer a
+coluna ``ano`` nem copiar linhas.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+ANOS_PADRAO = 15
+
+
+def ultimos(anos, n: int = ANOS_PADRAO) -> tuple[int, int]:
+    """Janela com os ``n`` últimos anos de ``anos`` (crescentes)."""
+    anos = np.asarray(anos)
+    if len(anos) == 0:
+        raise ValueError("não há anos nos dados")
+    return int(anos[-min(n, len(anos))]), int(anos[-1])
+
+
+def validar(janela) -> tuple[int, int]:
+    """``janela`` como par de inteiros, com início <= fim."""
+    try:
+        inicio, fim = (int(a) for a in janela)
+    except (TypeError, ValueError):
+        raise ValueError(f"janela inválida: {janela!r} (use (início, fim))") from None
+    if inicio > fim:
+        raise ValueError(f"janela inválida: início {inicio} depois do fim {fim}")
+    return inicio, fim
+
+
+@dataclass(frozen=True)
+class IndiceAnos:
+    """Linhas do ano ``anos[i]``: ``limites[i]:limites[i + 1]``."""
+
+    anos: np.ndarray
+    limites: np.ndarray
+
+    def fatia(self, janela: tuple[int, int]) -> slice:
+        """Faixa de linhas dos anos da janela (vazia se nenhum estiver nos dados)."""
+        i = np.searchsorted(self.anos, janela[0], side="left")
+        j = np.searchsorted(self.anos, janela[1], side="right")
+        return slice(int(self.limites[i]), int(self.limites[j]))
+
+
+def indexar(ano) -> IndiceAnos:
+    """Índice de uma coluna ``ano`` já ordenada."""
+    ano = np.asarray(ano)
+    if len(ano) and np.any(ano[1:] < ano[:-1]):
+        raise ValueError("a coluna ano precisa estar ordenada para ser indexada")
+    inicios = np.flatnonzero(np.diff(ano)) + 1
+    inicios = np.concatenate(([0], inicios)) if len(ano) else inicios
+    return IndiceAnos(
+        anos=ano[inicios].astype("int64"),
+        limites=np.append(inicios, len(ano)).astype("int64"),
+    )
@@ -0,0 +1,169 @@
+"""Modo multi-processo: N processos do Streamlit atrás de uma só porta.
+
+Para testes de carga::
+
+    python -m vinho.lancador --processos 4 --porta 8501
+
+Antes de abrir os processos, o lançador gera a conversão binária e o cubo em
+``dados/`` (mapeados em memória por todos) e aponta ``VINHO_CACHE`` para um
+backend compartilhado (``vinho.compartilhado``; por padrão um diretório em
+``/dev/shm`` quando ele existe), para que agregações e figuras calculadas
+num processo sirvam aos outros. Cada processo escuta numa porta interna
+(``--porta + 1 + i``) e um proxy TCP em asyncio distribui as conexões na
+porta pública, sempre para o processo com menos conexões abertas. Como a
+sessão do Streamlit vive num único websocket, ela fica inteira num processo.
+
+Os processos sobem por ``vinho.aquecimento``, que aquece dados, agregações e
+figuras de todas as páginas ao iniciar e responde ``/pronto`` numa porta de
+saúde (``--porta-saude + 1 + i``) quando está aquecido e com o Streamlit no
+ar; o proxy só abre a porta pública depois que todos estão prontos, e um
+balanceador externo pode checar a mesma rota.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+TEMPO_PRONTO_S = 300
+TAMANHO_BLOCO = 64 * 1024
+
+
+def cache_padrao() -> str:
+    base = Path("/dev/shm") if Path("/dev/shm").is_dir() else Path(tempfile.gettempdir())
+    return f"disco:{base / 'vinho-cache'}"
+
+
+def preparar_dados() -> None:
+    """Gera a conversão binária e o cubo uma vez, antes dos processos."""
+    from vinho import binario, cubo
+
+    binario.main([])
+    cubo.main([])
+
+
+def iniciar_processo(porta: int, ambiente: dict, porta_saude: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "vinho.aquecimento",
+         "--porta-saude", str(porta_saude),
+         "--server.port", str(porta),
+         "--server.address", "127.0.0.1",
+         "--server.headless", "true",
+         "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        cwd=RAIZ, env=ambiente,
+    )
+
+
+def esperar_pronto(portas: list[int], tempo_s: float = TEMPO_PRONTO_S) -> None:
+    """Espera ``/pronto`` de cada processo (porta de saúde) responder 200."""
+    limite = time.monotonic() + tempo_s
+    for porta in portas:
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{porta}/pronto", timeout=1):
+                    break
+            except OSError:
+                if time.monotonic() > limite:
+                    raise RuntimeError(f"o processo da porta {porta} não ficou pronto") from None
+                time.sleep(0.2)
+
+
+# -----------------------
+# Proxy TCP
+# -----------------------
+async def _copiar(leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+    try:
+        while bloco := await leitor.read(TAMANHO_BLOCO):
+            escritor.write(bloco)
+            await escritor.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir_proxy(host: str, porta: int, destinos: list[int]) -> asyncio.AbstractServer:
+    """Repassa cada conexão para o destino com menos conexões abertas."""
+    abertas = dict.fromkeys(destinos, 0)
+
+    async def atender(leitor, escritor):
+        destino = min(abertas, key=abertas.get)
+        abertas[destino] += 1
+        try:
+            leitor_destino, escritor_destino = await asyncio.open_connection("127.0.0.1", destino)
+        except OSError:
+            abertas[destino] -= 1
+            escritor.close()
+            return
+        try:
+            await asyncio.gather(
+                _copiar(leitor, escritor_destino),
+                _copiar(leitor_destino, escritor),
+            )
+        finally:
+            abertas[destino] -= 1
+
+    return await asyncio.start_server(atender, host, porta)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="N processos do painel atrás de uma porta")
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8501)
+    parser.add_argument("--porta-saude", type=int, default=None,
+                        help="base das portas de /saude e /pronto (padrão: --porta + 100)")
+    parser.add_argument("--cache", default=None,
+                        help="backend compartilhado (VINHO_CACHE); padrão: disco em /dev/shm")
+    parser.add_argument("--sem-preparo", action="store_true",
+                        help="não gera a conversão binária e o cubo antes de começar")
+    args = parser.parse_args(argv)
+
+    ambiente = {**os.environ, "VINHO_CACHE": args.cache or os.environ.get("VINHO_CACHE") or cache_padrao()}
+    os.environ["VINHO_CACHE"] = ambiente["VINHO_CACHE"]
+    if not args.sem_preparo:
+        preparar_dados()
+
+    portas = [args.porta + 1 + i for i in range(args.processos)]
+    base_saude = args.porta + 100 if args.porta_saude is None else args.porta_saude
+    portas_saude = [base_saude + 1 + i for i in range(args.processos)]
+    metricas = os.environ.get("VINHO_METRICAS_PORTA")
+    processos = []
+    for i, porta in enumerate(portas):
+        # cada processo com sua própria porta de métricas, se pedidas
+        extra = {"VINHO_METRICAS_PORTA": str(int(metricas) + i)} if metricas else {}
+        processos.append(iniciar_processo(porta, {**ambiente, **extra}, portas_saude[i]))
+
+    async def rodar():
+        await asyncio.to_thread(esperar_pronto, portas_saude)
+        proxy = await servir_proxy(args.host, args.porta, portas)
+        print(f"{len(portas)} processos (portas {portas[0]}–{portas[-1]}) em "
+              f"http://{args.host}:{args.porta} · /pronto nas portas {portas_saude[0]}–{portas_saude[-1]} · VINHO_CACHE={ambiente['VINHO_CACHE']} (Ctrl+C para sair)")
+        async with proxy:
+            await proxy.serve_forever()
+
+    # SIGTERM encerra como Ctrl+C, derrubando os processos junto
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(rodar())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for processo in processos:
+            processo.terminate()
+        for processo in processos:
+            processo.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""Leitura dos CSVs de ``dados/`` em blocos, com esquema declarado e memória limitada.
+
+``pd.read_csv`` do arquivo inteiro guarda todas as linhas antes de qualquer
+filtro. Aqui o arquivo passa por uma cadeia de geradores, um bloco por vez::
+
+    blocos -> validar (esquema) -> filtrar (anos, produtos) -> compactar (tipos, poda) -> agregar
+
+As colunas e seus tipos vêm de ``ESQUEMA``, sem inferência: com o pyarrow
+instalado, o CSV é lido pelo leitor multithread dele já nos tipos
+declarados; sem ele (ou com ``VINHO_MOTOR_CSV=pandas``), o pandas lê o
+texto e ``validar`` converte. Um valor que o pyarrow não consegue converter
+faz o arquivo ser relido pelo pandas, que aponta as linhas. ``validar``
+aplica a política de nulos de cada coluna e registra num ``Relatorio`` as
+linhas rejeitadas e os valores coagidos; ``ler_validado`` devolve o
+relatório junto com os dados, e ``python -m vinho.leitura`` o imprime. Os
+dois fluxos saem com os mesmos tipos, como ``quantidade_dolar`` em ``Int64``
+mesmo quando um arquivo tem ``nan`` e o outro não.
+
+``agregar`` soma as linhas de cada (país, ano) à medida que os blocos chegam,
+então o pico de memória é um bloco mais o resultado agregado (no máximo
+países × anos com comércio), qualquer que seja o tamanho do arquivo. Planilhas
+com vários produtos por país e ano (coluna ``produto``) viram um total por
+país e ano, opcionalmente só dos ``produtos`` pedidos. O resultado tem o
+formato de ``binario.compactar``, em ordem de ano e país.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+from vinho import binario
+
+LINHAS_POR_BLOCO = int(os.environ.get("VINHO_LINHAS_POR_BLOCO", "200000"))
+# "pyarrow", "pandas" ou "auto" (pyarrow quando instalado)
+MOTOR = os.environ.get("VINHO_MOTOR_CSV", "auto")
+# piso do block_size do pyarrow (em bytes): blocos muito pequenos só custam
+BLOCO_MINIMO_PYARROW = 1 << 20
+COLUNA_PRODUTO = "produto"
+# textos lidos como nulos (o CSV de importação traz "nan")
+NULOS = ["", "nan", "NaN", "NA", "null"]
+EXEMPLOS = 10
+
+
+@dataclass(frozen=True)
+class Coluna:
+    """Coluna do CSV: tipo lido, tipo guardado e política de nulos.
+
+    ``nulo``: "rejeitar" descarta a linha, "zero" troca por 0 e "manter"
+    guarda o nulo (valor desconhecido).
+    """
+
+    nome: str
+    leitura: str
+    tipo: str
+    nulo: str
+
+
+ESQUEMA = (
+    # categoria (dicionário): o nome de cada país é convertido uma vez por bloco
+    Coluna("pais", "category", "category", nulo="rejeitar"),
+    Coluna("ano", "int16", "int16", nulo="rejeitar"),
+    Coluna("quantidade_kg", "int64", "int64", nulo="zero"),
+    # US$ é inteiro, mas o CSV de importação o grava como "30498.0"
+    Coluna("quantidade_dolar", "float64", "Int64", nulo="manter"),
+)
+COLUNAS = tuple(c.nome for c in ESQUEMA)
+_TIPOS = {c.nome: c.tipo for c in ESQUEMA}
+
+
+@dataclass
+class Relatorio:
+    """Resultado da validação de um arquivo."""
+
+    arquivo: str
+    motor: str
+    linhas: int = 0
+    aceitas: int = 0
+    # motivo -> linhas descartadas
+    rejeitadas: Counter = field(default_factory=Counter)
+    # regra -> valores trocados
+    coagidos: Counter = field(default_factory=Counter)
+    # coluna -> nulos mantidos (política "manter")
+    nulos: Counter = field(default_factory=Counter)
+    # (linha do arquivo, motivo) das primeiras rejeições
+    exemplos: list = field(default_factory=list)
+    # por que o motor pedido não foi usado, se for o caso
+    aviso: str = ""
+
+    def resumo(self) -> str:
+        partes = [f"{self.arquivo} ({self.motor}): {self.linhas} linhas, {self.aceitas} aceitas"]
+        partes += [f"{n} rejeitadas por {motivo}" for motivo, n in sorted(self.rejeitadas.items())]
+        partes += [f"{n} coagidos ({regra})" for regra, n in sorted(self.coagidos.items())]
+        partes += [f"{n} nulos mantidos em {coluna}" for coluna, n in sorted(self.nulos.items())]
+        if self.aviso:
+            partes.append(self.aviso)
+        return "; ".join(partes)
+
+    def para_dict(self) -> dict:
+        return {
+            "arquivo": self.arquivo, "motor": self.motor, "linhas": self.linhas, "aceitas": self.aceitas,
+            "rejeitadas": dict(self.rejeitadas), "coagidos": dict(self.coagidos), "nulos": dict(self.nulos),
+            "exemplos": [list(e) for e in self.exemplos], "aviso": self.aviso,
+        }
+
+
+class _ValorInvalido(Exception):
+    """O leitor do pyarrow não converteu um valor para o tipo declarado."""
+
+
+# -----------------------
+# Motores de leitura
+# -----------------------
+def _colunas(arquivo: Path) -> list[str]:
+    with open(arquivo, encoding="utf-8") as f:
+        cabecalho = f.readline().strip().lstrip("\ufeff").split(",")
+    faltando = [c for c in COLUNAS if c not in cabecalho]
+    if faltando:
+        raise ValueError(f"{arquivo}: colunas ausentes no CSV: {', '.join(faltando)}")
+    return [c for c in cabecalho if c in COLUNAS or c == COLUNA_PRODUTO]
+
+
+def _blocos_pandas(arquivo: Path, linhas: int) -> Iterator[pd.DataFrame]:
+    # texto puro: a conversão (e o registro do que não converteu) fica com validar
+    with pd.read_csv(arquivo, sep=",", chunksize=linhas, usecols=_colunas(arquivo), dtype=str,
+                     na_values=NULOS, keep_default_na=False) as leitor:
+        yield from leitor
+
+
+def _blocos_pyarrow(arquivo: Path, linhas: int) -> Iterator[pd.DataFrame]:
+    import pyarrow as pa
+    from pyarrow import csv
+
+    usadas = _colunas(arquivo)
+    tipos = {c.nome: (pa.dictionary(pa.int32(), pa.string()) if c.leitura == "category"
+                      else pa.type_for_alias(c.leitura)) for c in ESQUEMA}
+    if COLUNA_PRODUTO in usadas:
+        tipos[COLUNA_PRODUTO] = pa.string()
+    # nulos como tipos do pandas que os aceitam (Int64, Float64, string)
+    mapa = {pa.int16(): pd.Int64Dtype(), pa.int64(): pd.Int64Dtype(),
+            pa.float64(): pd.Float64Dtype(), pa.string(): pd.StringDtype()}
+    try:
+        # o primeiro bloco já é convertido na abertura
+        leitor = csv.open_csv(
+            arquivo,
+            read_options=csv.ReadOptions(use_threads=True, block_size=max(BLOCO_MINIMO_PYARROW, linhas * 64)),
+            convert_options=csv.ConvertOptions(column_types=tipos, include_columns=usadas,
+                                               null_values=NULOS, strings_can_be_null=True),
+        )
+        for lote in leitor:
+            yield lote.to_pandas(types_mapper=mapa.get)
+    except pa.ArrowInvalid as erro:
+        raise _ValorInvalido(str(erro)) from None
+
+
+def motor_padrao() -> str:
+    """Motor usado quando nenhum é pedido: ``MOTOR``, com "auto" resolvido."""
+    if MOTOR != "auto":
+        return MOTOR
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return "pandas"
+    return "pyarrow"
+
+
+def blocos(arquivo: Path, linhas: int = LINHAS_POR_BLOCO, motor: str | None = None) -> Iterator[pd.DataFrame]:
+    """Blocos do CSV com as colunas do esquema (e ``produto``, se houver)."""
+    motor = motor or motor_padrao()
+    if motor == "pyarrow":
+        return _blocos_pyarrow(Path(arquivo), linhas)
+    if motor == "pandas":
+        return _blocos_pandas(Path(arquivo), linhas)
+    raise ValueError(f"motor de CSV desconhecido: {motor!r} (use pyarrow, pandas ou auto)")
+
+
+# -----------------------
+# Validação
+# -----------------------
+def _inteiro(bruto: pd.Series, coluna: str, relatorio: Relatorio) -> tuple[pd.Series, pd.Series]:
+    """Coluna como Int64 e a máscara dos valores que não converteram.
+
+    Valores fracionários são arredondados e contados como coagidos.
+    """
+    valor = pd.to_numeric(bruto, errors="coerce").astype("Float64")
+    invalido = valor.isna() & bruto.notna()
+    fracionario = (valor.round() != valor).fillna(False)
+    if fracionario.any():
+        relatorio.coagidos[f"{coluna}_arredondado"] += int(fracionario.sum())
+        valor = valor.round()
+    return valor.astype("Int64"), invalido
+
+
+def _pais(bruto: pd.Series) -> pd.Series:
+    """Países como categoria, sem espaços nas pontas."""
+    pais = bruto.astype("category")
+    categorias = pais.cat.categories
+    limpas = categorias.astype(str).str.strip()
+    if limpas.equals(pd.Index(categorias.astype(str))):
+        return pais
+    # raro: nomes que só diferem nos espaços viram o mesmo país
+    return pais.astype(str).str.strip().astype("category")
+
+
+def validar(blocos: Iterable[pd.DataFrame], relatorio: Relatorio) -> Iterator[pd.DataFrame]:
+    """Aplica o esquema a cada bloco, registrando rejeições e coerções em ``relatorio``.
+
+    Saem só as linhas aceitas, nos tipos guardados do esquema (``Coluna.tipo``).
+    """
+    for bloco in blocos:
+        inicio = relatorio.linhas
+        relatorio.linhas += len(bloco)
+        pais = _pais(bloco["pais"])
+        ano, ano_invalido = _inteiro(bloco["ano"], "ano", relatorio)
+        kg, kg_invalido = _inteiro(bloco["quantidade_kg"], "quantidade_kg", relatorio)
+        dolar, dolar_invalido = _inteiro(bloco["quantidade_dolar"], "quantidade_dolar", relatorio)
+
+        motivos = {
+            "pais_vazio": (pais.isna() | (pais == "")).to_numpy(dtype=bool),
+            "ano_invalido": (ano.isna() | ano_invalido).to_numpy(dtype=bool),
+            "valor_negativo": ((kg < 0) | (dolar < 0)).fillna(False).to_numpy(dtype=bool),
+        }
+        rejeitar = np.zeros(len(bloco), dtype=bool)
+        for motivo, mascara in motivos.items():
+            novas = mascara & ~rejeitar
+            if novas.any():
+                relatorio.rejeitadas[motivo] += int(novas.sum())
+                vagas = EXEMPLOS - len(relatorio.exemplos)
+                # + 2: cabeçalho e numeração a partir de 1
+                relatorio.exemplos += [(inicio + int(i) + 2, motivo) for i in np.flatnonzero(novas)[:vagas]]
+            rejeitar |= mascara
+        manter = ~rejeitar
+
+        # política de nulos das colunas de valor (inválidos contam à parte)
+        kg_invalido = kg_invalido.to_numpy(dtype=bool) & manter
+        kg_nulo = kg.isna().to_numpy(dtype=bool) & manter & ~kg_invalido
+        dolar_invalido = dolar_invalido.to_numpy(dtype=bool) & manter
+        dolar_nulo = dolar.isna().to_numpy(dtype=bool) & manter & ~dolar_invalido
+        for contagem, chave, mascara in (
+            (relatorio.coagidos, "quantidade_kg_nulo_para_zero", kg_nulo),
+            (relatorio.coagidos, "quantidade_kg_invalido_para_zero", kg_invalido),
+            (relatorio.coagidos, "quantidade_dolar_invalido_para_nulo", dolar_invalido),
+            (relatorio.nulos, "quantidade_dolar", dolar_nulo),
+        ):
+            if mascara.any():
+                contagem[chave] += int(mascara.sum())
+
+        relatorio.aceitas += int(manter.sum())
+        limpo = pd.DataFrame({
+            "pais": pais[manter].reset_index(drop=True),
+            "ano": ano[manter].reset_index(drop=True),
+            "quantidade_kg": kg[manter].fillna(0).reset_index(drop=True),
+            "quantidade_dolar": dolar[manter].reset_index(drop=True),
+        }).astype(_TIPOS)
+        if COLUNA_PRODUTO in bloco:
+            limpo[COLUNA_PRODUTO] = bloco[COLUNA_PRODUTO][manter].to_numpy(dtype=object)
+        yield limpo
+
+
+def filtrar(blocos: Iterable[pd.DataFrame], anos: tuple[int, int] | None = None,
+            produtos: Iterable[str] | None = None) -> Iterator[pd.DataFrame]:
+    """Só as linhas dos anos ``(inicio, fim)`` e dos ``produtos`` pedidos."""
+    produtos = None if produtos is None else list(produtos)
+    for bloco in blocos:
+        if anos is not None:
+            bloco = bloco[bloco["ano"].between(*anos)]
+        if produtos is not None:
+            if COLUNA_PRODUTO not in bloco:
+                raise ValueError(f"filtro de produtos pedido, mas o CSV não tem a coluna {COLUNA_PRODUTO!r}")
+            bloco = bloco[bloco[COLUNA_PRODUTO].isin(produtos)]
+        yield bloco
+
+
+def compactar(blocos: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Cada bloco nos tipos compactos, sem as linhas ``0,0`` (``binario.compactar``)."""
+    for bloco in blocos:
+        yield binario.compactar(bloco)
+
+
+def _somar(partes: list[pd.DataFrame]) -> pd.DataFrame:
+    return (
+        pd.concat(partes, ignore_index=True)
+        .groupby(["ano", "pais"], sort=True)[["quantidade_kg", "quantidade_dolar"]]
+        # US$ nulo em todas as linhas do (país, ano) continua nulo
+        .sum(min_count=1)
+        .reset_index()
+    )
+
+
+def agregar(blocos: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Soma por (país, ano) de blocos já compactados, um bloco por vez.
+
+    Os blocos pendentes são somados ao acumulado quando passam do tamanho
+    dele (ou de um bloco), o que mantém a memória em torno de duas vezes o
+    resultado e o custo total proporcional ao arquivo. Países que só têm
+    linhas ``0,0`` continuam nas categorias de ``pais``.
+    """
+    paises: set[str] = set()
+    acumulado: pd.DataFrame | None = None
+    pendentes: list[pd.DataFrame] = []
+    linhas_pendentes = 0
+    for bloco in blocos:
+        paises.update(bloco["pais"].cat.categories)
+        pendentes.append(bloco.assign(pais=bloco["pais"].astype(str)))
+        linhas_pendentes += len(bloco)
+        if linhas_pendentes > max(LINHAS_POR_BLOCO, 0 if acumulado is None else len(acumulado)):
+            acumulado = _somar([p for p in (acumulado, *pendentes) if p is not None])
+            pendentes, linhas_pendentes = [], 0
+    partes = [p for p in (acumulado, *pendentes) if p is not None]
+    df = _somar(partes) if partes else pd.DataFrame({c: [] for c in COLUNAS})
+    return pd.DataFrame({
+        "pais": pd.Categorical(df["pais"], categories=sorted(paises)),
+        "ano": df["ano"].astype("int16"),
+        "quantidade_kg": df["quantidade_kg"].astype("int64"),
+        "quantidade_dolar": df["quantidade_dolar"].astype("Int64"),
+    })
+
+
+def _ler(arquivo: Path, anos, produtos, linhas: int, motor: str,
+         aviso: str = "") -> tuple[pd.DataFrame, Relatorio]:
+    relatorio = Relatorio(arquivo=str(arquivo), motor=motor, aviso=aviso)
+    df = agregar(compactar(filtrar(validar(blocos(arquivo, linhas, motor), relatorio), anos, produtos)))
+    return df, relatorio
+
+
+def ler_validado(arquivo: Path, anos: tuple[int, int] | None = None, produtos: Iterable[str] | None = None,
+                 linhas: int = LINHAS_POR_BLOCO, motor: str | None = None) -> tuple[pd.DataFrame, Relatorio]:
+    """CSV lido em blocos, validado, filtrado, compactado e somado por (país, ano).
+
+    Devolve também o ``Relatorio`` da validação. Se o pyarrow encontrar um
+    valor fora do tipo declarado, o arquivo é relido pelo pandas.
+    """
+    motor = motor or motor_padrao()
+    if motor == "pyarrow":
+        try:
+            return _ler(arquivo, anos, produtos, linhas, "pyarrow")
+        except _ValorInvalido as erro:
+            return _ler(arquivo, anos, produtos, linhas, "pandas", f"relido pelo pandas: {erro}")
+    return _ler(arquivo, anos, produtos, linhas, motor)
+
+
+def ler(arquivo: Path, anos: tuple[int, int] | None = None, produtos: Iterable[str] | None = None,
+        linhas: int = LINHAS_POR_BLOCO, motor: str | None = None) -> pd.DataFrame:
+    """Como ``ler_validado``, só com os dados."""
+    return ler_validado(arquivo, anos, produtos, linhas, motor)[0]
+
+
+def main(argv=None) -> None:
+    from vinho import dados
+
+    parser = argparse.ArgumentParser(description="Valida dados/*.csv contra o esquema declarado")
+    parser.add_argument("--dados", type=Path, default=None, help="diretório dos CSVs")
+    parser.add_argument("--motor", choices=["pyarrow", "pandas"], default=None)
+    parser.add_argument("--json", action="store_true", help="relatório completo em JSON")
+    args = parser.parse_args(argv)
+    relatorios = [ler_validado(dados.caminho(fluxo, args.dados), motor=args.motor)[1]
+                  for fluxo in dados.ARQUIVOS]
+    if args.json:
+        print(json.dumps([r.para_dict() for r in relatorios], ensure_ascii=False, indent=2))
+    else:
+        for r in relatorios:
+            print(r.resumo())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Métricas derivadas: preço unitário, crescimento, CAGR, participação e saldo.
+
+Funções vetorizadas sobre arrays (ou Series) de qualquer forma, com divisão
+segura: onde o denominador é zero ou ausente o resultado é ``NaN`` — vazio
+nas tabelas e lacuna nos gráficos —, nunca ``inf``. Os nós de
+``vinho.agregacoes`` as aplicam aos dois fluxos de uma vez, empilhados num
+bloco fluxo × ano ou fluxo × país × ano, e memorizam o resultado por versão
+dos dados e janela.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def _float(valores) -> np.ndarray:
+    """``valores`` em float64, com os nulos do pandas (``pd.NA``) como NaN."""
+    if isinstance(valores, (pd.Series, pd.Index, pd.api.extensions.ExtensionArray)):
+        return valores.to_numpy(dtype="float64", na_value=np.nan)
+    return np.asarray(valores, dtype="float64")
+
+
+def dividir(numerador, denominador) -> np.ndarray:
+    """``numerador / denominador``, com NaN onde o denominador é zero ou nulo."""
+    numerador, denominador = _float(numerador), _float(denominador)
+    resultado = np.full(np.broadcast_shapes(numerador.shape, denominador.shape), np.nan)
+    np.divide(numerador, denominador, out=resultado,
+              where=(denominador != 0) & ~np.isnan(denominador))
+    return resultado
+
+
+def preco_unitario(dolar, kg) -> np.ndarray:
+    """Preço médio em US$/kg."""
+    return dividir(dolar, kg)
+
+
+def crescimento(valores, eixo: int = -1) -> np.ndarray:
+    """Variação (%) sobre o período anterior ao longo de ``eixo``.
+
+    O primeiro período, e os que vêm depois de um zero, ficam NaN.
+    """
+    valores = np.moveaxis(_float(valores), eixo, -1)
+    resultado = np.full(valores.shape, np.nan)
+    resultado[..., 1:] = (dividir(valores[..., 1:], valores[..., :-1]) - 1) * 100
+    return np.moveaxis(resultado, -1, eixo)
+
+
+def cagr(inicial, final, periodos) -> np.ndarray:
+    """Taxa de crescimento anual composta (%) de ``inicial`` a ``final``.
+
+    NaN quando o valor inicial não é positivo, o final é negativo ou não há
+    ao menos um período.
+    """
+    inicial, final, periodos = _float(inicial), _float(final), _float(periodos)
+    razao = dividir(final, np.where(inicial > 0, inicial, 0))
+    expoente = dividir(1, np.where(periodos >= 1, periodos, 0))
+    with np.errstate(invalid="ignore"):
+        resultado = (np.power(razao, expoente) - 1) * 100
+    return np.where(razao >= 0, resultado, np.nan)
+
+
+def participacao(valores, eixo: int = -1) -> np.ndarray:
+    """Participação (%) de cada valor no total ao longo de ``eixo``."""
+    valores = _float(valores)
+    return dividir(valores, np.nansum(valores, axis=eixo, keepdims=True)) * 100
+
+
+def saldo(exportacao, importacao) -> np.ndarray:
+    """Exportação menos importação (mantém inteiros quando ambos são)."""
+    return np.asarray(exportacao) - np.asarray(importacao)
+
+
+def com_preco(df: pd.DataFrame) -> pd.DataFrame:
+    """``df`` (formato dos CSVs) com a coluna ``preco_kg``, sem copiar as demais."""
+    colunas = {coluna: df[coluna] for coluna in df.columns}
+    colunas["preco_kg"] = preco_unitario(df["quantidade_dolar"], df["quantidade_kg"])
+    return pd.DataFrame(colunas, copy=False)
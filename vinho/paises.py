@@ -0,0 +1,56 @@
+"""Dimensão canônica de países (``dados/paises.csv``).
+
+Uma linha por identificador usado nos arquivos de dados (``pais``, como
+"africa_do_sul"), com chave inteira (``codigo``), nome de exibição, código
+ISO 3166-1 alfa-3 e continente. Identificadores que não são países ("outros",
+"nao_declarados") ficam sem ISO e no continente "Desconhecido", o mesmo
+usado para qualquer identificador ausente da tabela.
+
+A junção com os dados é feita por códigos inteiros: as poucas categorias da
+coluna ``pais`` são resolvidas uma vez contra a dimensão e o resultado é
+aplicado a todas as linhas com um único ``take`` vetorizado.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from vinho import dados
+
+DESCONHECIDO = "Desconhecido"
+
+
+def carregar() -> pd.DataFrame:
+    """A dimensão, indexada pelo identificador ``pais`` e lida uma vez por versão."""
+    return dados.em_cache(dados.ARQUIVO_PAISES, _ler)
+
+
+def _ler() -> pd.DataFrame:
+    return pd.read_csv(
+        dados.ARQUIVO_PAISES,
+        dtype={"codigo": "int32", "pais": str, "nome": str, "iso3": str, "continente": str},
+        keep_default_na=False,
+    ).set_index("pais")
+
+
+def codigos(pais) -> np.ndarray:
+    """Chave da dimensão para cada valor de ``pais`` (-1 se não estiver nela)."""
+    categorico = pd.Categorical(pais)
+    por_categoria = (
+        carregar()["codigo"].reindex(categorico.categories).fillna(-1).to_numpy("int32")
+    )
+    # o código -1 do pandas (valor nulo) indexa a última posição, também -1
+    return np.append(por_categoria, np.int32(-1))[categorico.codes]
+
+
+def atributo(pais, coluna: str, padrao: str = DESCONHECIDO) -> np.ndarray:
+    """Valor de ``coluna`` da dimensão para cada valor de ``pais``."""
+    tabela = carregar().set_index("codigo")[coluna]
+    # posição = código; a última posição atende o código -1
+    valores = np.full(int(tabela.index.max()) + 2, padrao, dtype=object)
+    valores[tabela.index.to_numpy()] = tabela.to_numpy(dtype=object)
+    return valores[codigos(pais)]
+
+
+def continente(pais) -> np.ndarray:
+    return atributo(pais, "continente")
@@ -0,0 +1,208 @@
+"""Previsões em lote para todas as séries país × ano de uma vez.
+
+Cada linha da matriz ``Y`` (séries × anos) recebe dois modelos, ajustados
+para todas as linhas juntas com operações vetorizadas, sem laço por país:
+
+* Holt (suavização exponencial com tendência), com ``alfa`` e ``beta``
+  escolhidos por busca em grade: a grade inteira roda em paralelo como uma
+  dimensão a mais dos arrays, e o laço é só sobre os anos;
+* tendência log-linear, por mínimos quadrados em ``log(1 + y)`` nos anos
+  com valor positivo (fórmula fechada; ano zerado é ano sem comércio, não
+  um ponto da tendência).
+
+Fica, por série, o modelo de menor AIC, com os dois modelos avaliados nos
+mesmos resíduos: os erros de previsão um passo à frente do terceiro ano em
+diante. Os dados são anuais, então não há componente sazonal. As faixas de
+confiança (``NIVEL_CONFIANCA``) vêm da variância de previsão h passos à
+frente de cada modelo e não descem abaixo de zero. Séries intermitentes (um
+pico antigo e zeros) dão previsões sem sentido; ``elegivel`` separa as que
+têm histórico suficiente para rankings. ``ajustar`` devolve os parâmetros;
+``prever`` só os aplica, então os nós de ``vinho.agregacoes`` memorizam os
+parâmetros por versão dos dados e janela.
+"""
+from __future__ import annotations
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+HORIZONTE = 5
+NIVEL_CONFIANCA = 0.95
+_Z = NormalDist().inv_cdf(0.5 + NIVEL_CONFIANCA / 2)
+
+# grade de alfa × beta da busca do Holt
+GRADE = np.linspace(0.05, 0.95, 10)
+# séries por bloco na busca em grade (limita a memória: grade × bloco floats)
+BLOCO = 20_000
+# mínimo de anos para ajustar
+ANOS_MINIMOS = 3
+# para entrar em rankings: anos com valor positivo na janela e anos finais
+# seguidos com valor positivo
+ANOS_ATIVOS_MINIMOS = 5
+ANOS_RECENTES = 5
+
+_PARAMETROS = [
+    "modelo", "n", "ultimo_ano", "ultimo_valor",
+    "alfa", "beta", "nivel", "tendencia", "sigma",
+    "intercepto", "inclinacao", "sigma_log", "n_log", "x_medio", "sxx",
+    "aic_holt", "aic_log", "anos_ativos", "anos_finais_ativos",
+]
+
+
+def _aic(sse: np.ndarray, n: int, k: int) -> np.ndarray:
+    return n * np.log(np.maximum(sse, 1e-12) / n) + 2 * k
+
+
+def holt(Y: np.ndarray) -> dict[str, np.ndarray]:
+    """Holt para cada linha de ``Y``, com a melhor combinação da grade."""
+    series, anos = Y.shape
+    alfa_grade, beta_grade = (g.ravel()[:, None] for g in np.meshgrid(GRADE, GRADE, indexing="ij"))
+    saida = {nome: np.empty(series) for nome in ("alfa", "beta", "nivel", "tendencia", "sse")}
+    for inicio in range(0, series, BLOCO):
+        y = Y[inicio:inicio + BLOCO]
+        nivel = np.broadcast_to(y[:, 0], (len(alfa_grade), len(y))).copy()
+        tendencia = np.broadcast_to(y[:, 1] - y[:, 0], nivel.shape).copy()
+        sse = np.zeros(nivel.shape)
+        for t in range(1, anos):
+            previsto = nivel + tendencia
+            erro = y[:, t] - previsto
+            sse += erro ** 2
+            novo_nivel = previsto + alfa_grade * erro
+            tendencia = beta_grade * (novo_nivel - nivel) + (1 - beta_grade) * tendencia
+            nivel = novo_nivel
+        melhor = np.argmin(sse, axis=0)
+        colunas = np.arange(len(y))
+        fatia = slice(inicio, inicio + len(y))
+        saida["alfa"][fatia] = alfa_grade[melhor, 0]
+        saida["beta"][fatia] = beta_grade[melhor, 0]
+        saida["nivel"][fatia] = nivel[melhor, colunas]
+        saida["tendencia"][fatia] = tendencia[melhor, colunas]
+        saida["sse"][fatia] = sse[melhor, colunas]
+    # erros de um passo: anos - 1, menos os dois parâmetros de suavização
+    saida["sigma"] = np.sqrt(saida["sse"] / max(anos - 3, 1))
+    return saida
+
+
+def _retas(peso: np.ndarray, x: np.ndarray, z: np.ndarray) -> dict[str, np.ndarray]:
+    """Mínimos quadrados ponderados de ``z`` contra ``x`` em cada prefixo das linhas.
+
+    Cada array de saída tem a forma de ``z``: a coluna ``t`` é a reta dos anos
+    ``0..t``. Sem variação em x (menos de dois anos com peso) a reta é horizontal.
+    """
+    soma = lambda a: np.cumsum(a, axis=1)
+    n = soma(peso)
+    n_seguro = np.maximum(n, 1)
+    x_medio = soma(peso * x) / n_seguro
+    z_medio = soma(peso * z) / n_seguro
+    sxx = soma(peso * x * x) - n * x_medio ** 2
+    sxz = soma(peso * x * z) - n * x_medio * z_medio
+    # tolerância para o cancelamento numérico das somas acumuladas
+    variacao = sxx > 1e-9
+    inclinacao = np.divide(sxz, sxx, out=np.zeros_like(z), where=variacao)
+    return {
+        "n": n,
+        "x_medio": x_medio,
+        "sxx": np.where(variacao, sxx, np.inf),
+        "inclinacao": inclinacao,
+        "intercepto": z_medio - inclinacao * x_medio,
+    }
+
+
+def log_linear(Y: np.ndarray) -> dict[str, np.ndarray]:
+    """Reta de ``log(1 + y)`` contra o ano nos anos positivos de cada linha de ``Y``.
+
+    ``sse`` soma os erros de um passo à frente (reta dos anos anteriores a
+    cada ano, do terceiro em diante), comparáveis aos do Holt.
+    """
+    anos = Y.shape[1]
+    x = np.arange(anos, dtype="float64")
+    peso = (Y > 0).astype("float64")
+    z = np.log1p(np.maximum(Y, 0))
+    retas = _retas(peso, x, z)
+    previsto = retas["intercepto"][:, 1:-1] + retas["inclinacao"][:, 1:-1] * x[2:]
+    final = {nome: valor[:, -1] for nome, valor in retas.items()}
+    ajustado = final["intercepto"][:, None] + final["inclinacao"][:, None] * x
+    residuo_log = (peso * (z - ajustado) ** 2).sum(axis=1)
+    return {
+        "intercepto": final["intercepto"],
+        "inclinacao": final["inclinacao"],
+        "sigma_log": np.sqrt(residuo_log / np.maximum(final["n"] - 2, 1)),
+        "n_log": final["n"],
+        "x_medio": final["x_medio"],
+        "sxx": final["sxx"],
+        "sse": ((Y[:, 2:] - np.expm1(previsto)) ** 2).sum(axis=1),
+    }
+
+
+def ajustar(Y, ultimo_ano: int) -> pd.DataFrame:
+    """Parâmetros dos modelos de cada linha de ``Y`` (séries × anos).
+
+    Com menos de ``ANOS_MINIMOS`` anos não há ajuste: o resultado fica vazio.
+    """
+    Y = np.nan_to_num(np.asarray(Y, dtype="float64"))
+    series, anos = Y.shape
+    if anos < ANOS_MINIMOS or series == 0:
+        return pd.DataFrame({c: pd.Series(dtype=object if c == "modelo" else "float64") for c in _PARAMETROS})
+    h, ll = holt(Y), log_linear(Y)
+    # mesmos resíduos nos dois: erros de um passo do terceiro ano em diante
+    # (o erro do segundo ano do Holt é sempre zero, pela tendência inicial)
+    aic_holt = _aic(h["sse"], anos - 2, 4)
+    aic_log = _aic(ll["sse"], anos - 2, 2)
+    positivos = Y > 0
+    # anos seguidos com valor positivo, contados do último para trás
+    finais = np.where(positivos.all(axis=1), anos, np.argmin(positivos[:, ::-1], axis=1))
+    return pd.DataFrame({
+        "modelo": np.where(aic_log < aic_holt, "log_linear", "holt"),
+        "n": anos,
+        "ultimo_ano": ultimo_ano,
+        "ultimo_valor": Y[:, -1],
+        "alfa": h["alfa"], "beta": h["beta"], "nivel": h["nivel"],
+        "tendencia": h["tendencia"], "sigma": h["sigma"],
+        "intercepto": ll["intercepto"], "inclinacao": ll["inclinacao"],
+        "sigma_log": ll["sigma_log"], "n_log": ll["n_log"],
+        "x_medio": ll["x_medio"], "sxx": ll["sxx"],
+        "aic_holt": aic_holt, "aic_log": aic_log,
+        "anos_ativos": positivos.sum(axis=1), "anos_finais_ativos": finais,
+    })
+
+
+def elegivel(parametros: pd.DataFrame) -> pd.Series:
+    """Séries com atividade regular e recente, cuja previsão cabe num ranking."""
+    return ((parametros["anos_ativos"] >= ANOS_ATIVOS_MINIMOS)
+            & (parametros["anos_finais_ativos"] >= ANOS_RECENTES))
+
+
+def prever(parametros: pd.DataFrame, horizonte: int = HORIZONTE) -> pd.DataFrame:
+    """Previsão e faixa de confiança de cada série, ``horizonte`` anos à frente.
+
+    Formato longo: uma linha por (série, ano), com ``serie`` = posição da
+    série em ``parametros``, e colunas ``previsao``, ``inferior``, ``superior``.
+    """
+    p = {coluna: parametros[coluna].to_numpy(dtype="float64")[:, None]
+         for coluna in _PARAMETROS if coluna != "modelo"}
+    h = np.arange(1, horizonte + 1, dtype="float64")
+
+    # Holt: l + h·b; variância σ²·(1 + Σ_{j<h} (α(1 + jβ))²)
+    previsao_holt = p["nivel"] + h * p["tendencia"]
+    c = p["alfa"] * (1 + np.arange(horizonte) * p["beta"])
+    c[:, 0] = 0  # o passo 1 só tem o erro do próprio ano
+    erro_holt = p["sigma"] * np.sqrt(1 + np.cumsum(c ** 2, axis=1))
+
+    # log-linear: intervalo de predição da regressão, na escala do log
+    x = p["n"] - 1 + h
+    z = p["intercepto"] + p["inclinacao"] * x
+    erro_log = p["sigma_log"] * np.sqrt(1 + 1 / np.maximum(p["n_log"], 1) + (x - p["x_medio"]) ** 2 / p["sxx"])
+
+    usa_log = (parametros["modelo"].to_numpy() == "log_linear")[:, None]
+    previsao = np.where(usa_log, np.expm1(z), previsao_holt)
+    inferior = np.where(usa_log, np.expm1(z - _Z * erro_log), previsao_holt - _Z * erro_holt)
+    superior = np.where(usa_log, np.expm1(z + _Z * erro_log), previsao_holt + _Z * erro_holt)
+
+    return pd.DataFrame({
+        "serie": np.repeat(np.arange(len(parametros)), horizonte),
+        "ano": (p["ultimo_ano"] + h).astype("int64").ravel(),
+        "previsao": np.maximum(previsao, 0).ravel(),
+        "inferior": np.maximum(inferior, 0).ravel(),
+        "superior": np.maximum(superior, 0).ravel(),
+    })
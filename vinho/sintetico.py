@@ -0,0 +1,180 @@
+"""Gerador de dados sintéticos no formato de ``dados/`` para testes de escala.
+
+Produz os dois CSVs (``pais, ano, quantidade_kg, quantidade_dolar``) e uma
+dimensão ``paises.csv`` compatível, com a mesma forma dos arquivos reais:
+
+- grade completa país × ano, com a maior parte das linhas zerada (cerca de
+  80% na exportação e 75% na importação);
+- cada país alterna períodos com e sem comércio (cadeia de Markov por ano),
+  com frequência de atividade sorteada por país;
+- quantidades log-normais com tendência por país e preço por kg estável
+  dentro de cada país;
+- ``quantidade_dolar`` nula em parte das linhas zeradas da importação, como
+  no arquivo real; a exportação não tem nulos.
+
+``fator`` multiplica o número de países dos arquivos reais (137 na
+exportação e 68 na importação)::
+
+    python -m vinho.sintetico /tmp/vinho-x100 --fator 100
+    VINHO_DADOS=/tmp/vinho-x100 streamlit run aplicativo.py
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from vinho import dados
+
+ANOS = (1970, 2023)
+
+# países nos arquivos reais, por fluxo
+PAISES_REAIS = {"exportacao": 137, "importacao": 68}
+
+# proporção de continentes de dados/paises.csv
+CONTINENTES = {
+    "Europe": 0.265,
+    "Asia": 0.21,
+    "North America": 0.195,
+    "Africa": 0.17,
+    "South America": 0.085,
+    "Oceania": 0.055,
+    "Desconhecido": 0.02,
+}
+
+
+@dataclass(frozen=True)
+class Perfil:
+    """Parâmetros de um fluxo, ajustados aos arquivos reais."""
+    atividade_a: float       # Beta(a, b): fração de anos com comércio por país
+    atividade_b: float
+    persistencia: float      # P(comércio no ano t+1 | comércio no ano t)
+    kg_mediana: float        # mediana de kg entre linhas não zeradas
+    kg_sigma_pais: float     # dispersão (log) do porte de cada país
+    kg_sigma_ano: float      # dispersão (log) ano a ano
+    preco_mediana: float     # US$/kg
+    preco_sigma_pais: float
+    preco_sigma_ano: float
+    taxa_nulos: float        # fração das linhas zeradas com quantidade_dolar nula
+    dolar_decimal: bool      # o arquivo real grava o valor como float ("123.0")
+
+
+PERFIS = {
+    "exportacao": Perfil(0.55, 2.4, 0.8, 4_300, 2.4, 1.0, 2.2, 0.8, 0.4, 0.0, False),
+    "importacao": Perfil(0.35, 0.9, 0.85, 94_000, 2.4, 1.0, 2.8, 0.7, 0.4, 0.0005, True),
+}
+
+
+def nomes(n: int) -> np.ndarray:
+    """Identificadores sintéticos: "pais_000001", "pais_000002"..."""
+    return np.char.add("pais_", np.char.zfill(np.arange(1, n + 1).astype(str), 6))
+
+
+def gerar_fluxo(
+    fluxo: str,
+    paises: np.ndarray,
+    anos: tuple[int, int] = ANOS,
+    rng: np.random.Generator | None = None,
+) -> pd.DataFrame:
+    """Tabela longa de um fluxo, ordenada por ano e país como os CSVs reais."""
+    perfil = PERFIS[fluxo]
+    rng = rng or np.random.default_rng()
+    n = len(paises)
+    anos_arr = np.arange(anos[0], anos[1] + 1)
+
+    # atividade: cadeia de Markov por país com estacionária = fração sorteada
+    fracao = rng.beta(perfil.atividade_a, perfil.atividade_b, n).clip(1e-3, 0.999)
+    p11 = np.maximum(perfil.persistencia, fracao)
+    p01 = fracao * (1 - p11) / (1 - fracao)
+    ativo = np.empty((len(anos_arr), n), dtype=bool)
+    ativo[0] = rng.random(n) < fracao
+    for t in range(1, len(anos_arr)):
+        sorteio = rng.random(n)
+        ativo[t] = np.where(ativo[t - 1], sorteio < p11, sorteio < p01)
+
+    # porte, tendência e preço por país; ruído por ano
+    centro = (anos_arr - anos_arr.mean())[:, None]
+    log_kg = (
+        np.log(perfil.kg_mediana)
+        + rng.normal(0, perfil.kg_sigma_pais, n)
+        + rng.normal(0.03, 0.05, n) * centro
+        + rng.normal(0, perfil.kg_sigma_ano, (len(anos_arr), n))
+    )
+    kg = np.where(ativo, np.maximum(np.rint(np.exp(log_kg)), 1), 0).astype("int64")
+    log_preco = (
+        np.log(perfil.preco_mediana)
+        + rng.normal(0, perfil.preco_sigma_pais, n)
+        + rng.normal(0, perfil.preco_sigma_ano, (len(anos_arr), n))
+    )
+    dolar = pd.array(np.rint(kg * np.exp(log_preco)).astype("int64").ravel(), dtype="Int64")
+    nulos = (kg.ravel() == 0) & (rng.random(kg.size) < perfil.taxa_nulos)
+    dolar[nulos] = pd.NA
+
+    return pd.DataFrame({
+        "pais": np.tile(paises, len(anos_arr)),
+        "ano": np.repeat(anos_arr, n),
+        "quantidade_kg": kg.ravel(),
+        "quantidade_dolar": dolar,
+    })
+
+
+def gerar_dimensao(paises: np.ndarray, rng: np.random.Generator | None = None) -> pd.DataFrame:
+    """``paises.csv`` para os identificadores sintéticos."""
+    rng = rng or np.random.default_rng()
+    continentes = rng.choice(list(CONTINENTES), len(paises), p=list(CONTINENTES.values()))
+    return pd.DataFrame({
+        "codigo": np.arange(1, len(paises) + 1),
+        "pais": paises,
+        "nome": np.char.replace(paises, "pais_", "País "),
+        "iso3": "",
+        "continente": continentes,
+    })
+
+
+def _gravar(df: pd.DataFrame, arquivo: Path, dolar_decimal: bool) -> None:
+    if dolar_decimal:
+        df = df.assign(quantidade_dolar=df["quantidade_dolar"].astype("float64"))
+    df.to_csv(arquivo, index=False, na_rep="nan")
+
+
+def gerar_diretorio(
+    destino: Path,
+    fator: float = 1,
+    semente: int = 0,
+    anos: tuple[int, int] = ANOS,
+) -> Path:
+    """Grava em ``destino`` um conjunto completo (dois fluxos + dimensão)."""
+    rng = np.random.default_rng(semente)
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    quantos = {f: max(1, round(n * fator)) for f, n in PAISES_REAIS.items()}
+    todos = nomes(max(quantos.values()))
+    gerar_dimensao(todos, rng).to_csv(destino / "paises.csv", index=False)
+    for fluxo, n in quantos.items():
+        # os parceiros de importação são um subconjunto dos de exportação
+        paises = np.sort(rng.choice(todos, n, replace=False)) if n < len(todos) else todos
+        df = gerar_fluxo(fluxo, paises, anos, rng)
+        _gravar(df, dados.caminho(fluxo, destino), PERFIS[fluxo].dolar_decimal)
+    return destino
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no formato de dados/")
+    parser.add_argument("destino", type=Path)
+    parser.add_argument("--fator", type=float, default=1,
+                        help="multiplica o número de países dos arquivos reais")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--anos", default=f"{ANOS[0]}-{ANOS[1]}", help="intervalo, ex.: 1970-2023")
+    args = parser.parse_args(argv)
+    inicio, fim = (int(a) for a in args.anos.split("-"))
+    destino = gerar_diretorio(args.destino, args.fator, args.semente, (inicio, fim))
+    for fluxo in dados.ARQUIVOS:
+        arquivo = dados.caminho(fluxo, destino)
+        print(f"{fluxo}: {arquivo} ({arquivo.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
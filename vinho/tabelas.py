@@ -0,0 +1,118 @@
+"""Paginação, ordenação e filtro das tabelas de dados no servidor.
+
+As tabelas brutas (``export_janela``, ``imp_janela``) ficam nos nós de
+``vinho.agregacoes``; ao navegador vai só a página visível. A permutação de
+cada ordenação é calculada uma vez por (versão dos dados, tabela, coluna,
+sentido) e reaproveitada entre páginas, filtros e sessões. ``tabela`` é a
+identidade de ``df`` nessa chave: para os nós por janela, o par (nó, janela).
+Como a janela é livre, só ficam na memória as permutações das
+``TABELAS_EM_MEMORIA`` tabelas usadas mais recentemente, na mesma medida do
+limite de janelas de ``vinho.agregacoes``.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable
+
+import numpy as np
+import pandas as pd
+
+from vinho import agregacoes, dados, paises
+
+TAMANHO_PAGINA = 50
+TAMANHO_MAXIMO = 1000
+# duas tabelas (exportação e importação) por janela que as agregações lembram
+TABELAS_EM_MEMORIA = 2 * agregacoes.JANELAS_EM_MEMORIA
+
+# tabela -> (coluna, crescente) -> permutação, da tabela menos para a mais recente
+_ordens: OrderedDict[Hashable, dict[tuple, np.ndarray]] = OrderedDict()
+_versao: str | None = None
+_trava = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Pagina:
+    linhas: pd.DataFrame
+    numero: int    # 1-based, já limitado ao intervalo válido
+    paginas: int
+    total: int     # linhas que passaram pelo filtro
+    inicio: int    # posição (1-based) da primeira linha da página no total
+
+
+def ordem(tabela: Hashable, df: pd.DataFrame, coluna: str | None, crescente: bool = True) -> np.ndarray:
+    """Posições das linhas de ``df`` na ordem pedida (nulos por último)."""
+    global _versao
+    if coluna is None:
+        return np.arange(len(df))
+    if coluna not in df.columns:
+        raise ValueError(f"coluna desconhecida: {coluna!r}")
+    versao = dados.versao()
+    chave = (coluna, crescente)
+    with _trava:
+        if versao != _versao:
+            _ordens.clear()
+            _versao = versao
+        ordens = _ordens.setdefault(tabela, {})
+        _ordens.move_to_end(tabela)
+        while len(_ordens) > TABELAS_EM_MEMORIA:
+            _ordens.popitem(last=False)
+        if chave not in ordens:
+            ordens[chave] = (
+                df[coluna].reset_index(drop=True)
+                .sort_values(ascending=crescente, kind="stable", na_position="last")
+                .index.to_numpy()
+            )
+        return ordens[chave]
+
+
+def filtrar(df: pd.DataFrame, pais: str = "", anos: tuple[int, int] | None = None) -> np.ndarray:
+    """Máscara das linhas cujo ``pais`` contém o texto e cujo ``ano`` está em ``anos``."""
+    mascara = np.ones(len(df), dtype=bool)
+    texto = pais.strip().lower().replace(" ", "_")
+    if texto:
+        # o teste de texto roda nas categorias, não em cada linha
+        categorico = pd.Categorical(df["pais"])
+        aceitas = np.append(categorico.categories.str.contains(texto, regex=False), False)
+        mascara &= aceitas[categorico.codes]
+    if anos is not None:
+        ano = df["ano"].to_numpy()
+        mascara &= (ano >= anos[0]) & (ano <= anos[1])
+    return mascara
+
+
+def paginar(
+    tabela: Hashable,
+    df: pd.DataFrame,
+    *,
+    ordenar_por: str | None = None,
+    crescente: bool = True,
+    pais: str = "",
+    anos: tuple[int, int] | None = None,
+    pagina: int = 1,
+    tamanho: int = TAMANHO_PAGINA,
+    continente: bool = False,
+) -> Pagina:
+    """Uma página de ``df`` ordenada e filtrada; ``continente`` acrescenta a coluna só nela.
+
+    ``tamanho`` vai de 1 a ``TAMANHO_MAXIMO`` (``ValueError`` fora disso).
+    """
+    if not 1 <= tamanho <= TAMANHO_MAXIMO:
+        raise ValueError(f"tamanho deve estar entre 1 e {TAMANHO_MAXIMO}")
+    posicoes = ordem(tabela, df, ordenar_por, crescente)
+    posicoes = posicoes[filtrar(df, pais, anos)[posicoes]]
+    total = len(posicoes)
+    paginas = max(1, math.ceil(total / tamanho))
+    numero = min(max(1, int(pagina)), paginas)
+    inicio = (numero - 1) * tamanho
+    linhas = df.iloc[posicoes[inicio:inicio + tamanho]].copy()
+    if continente:
+        linhas["continente"] = paises.continente(linhas["pais"])
+    return Pagina(linhas, numero, paginas, total, inicio + 1 if total else 0)
+
+
+def limpar() -> None:
+    with _trava:
+        _ordens.clear()